@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import os
+import re
+import sys
+import time
+import yaml
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2: the peak memory is not measured.
+    tracemalloc = None
+
+from unitex import init_log_system, UnitexConstants
+from unitex.config import UnitexConfig
+from unitex.io import UnitexFile
+from unitex.processor import UnitexProcessor
+
+
+
+def whole(processor, grammar):
+    # The previous 'UnitexProcessor.iter' implementation: Locate stores
+    # the index, which is read at once, split into lines and parsed with
+    # a regex.
+    index = processor._locate(grammar, UnitexConstants.MATCH_MODE_LONGEST, UnitexConstants.OUTPUT_MODE_MERGE)
+
+    f = UnitexFile()
+    f.open(index, "r")
+    content = f.read()
+    f.close()
+
+    ind = re.compile(r"([^\s]+) ([^\s]+)(?: (.*))?")
+
+    lines = content.split("\n")
+    for line in lines[1:]:
+        line = line.rstrip()
+        if not line:
+            continue
+        start, end, output = ind.search(line).groups()
+        yield {"offsets": (start, end), "match": output}
+
+def streamed(processor, grammar):
+    # The current implementation: the index is captured and parsed while
+    # Locate is running (cf. 'UnitexProcessor.iter').
+    for match in processor.iter(grammar):
+        yield match
+
+def measure(function, processor, grammar):
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    start = time.time()
+    first = None
+
+    count = 0
+    for match in function(processor, grammar):
+        if first is None:
+            first = time.time() - start
+        count += 1
+
+    elapsed = time.time() - start
+
+    peak = None
+    if tracemalloc is not None:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return count, first, elapsed, peak
+
+
+
+if __name__ == "__main__":
+    def usage():
+        sys.stderr.write("Index -- compares 'UnitexProcessor.iter' with the previous (whole index) implementation\n\n")
+        sys.stderr.write("  $ index [OPTIONS] <file1(, file2, ...)>\n\n")
+        sys.stderr.write("Options:\n")
+        sys.stderr.write("  [ -h, --help    = this help message                    ]\n")
+        sys.stderr.write("    -c, --config  = the Unitex config file\n")
+        sys.stderr.write("    -g, --grammar = the fst2 grammar to use\n")
+        sys.stderr.write("  [ -r, --repeat  = number of runs per file (default: 3) ]\n\n")
+        sys.stderr.write("Example:\n")
+        sys.stderr.write("  $ index -c unitex.yaml -g grammar.fst2 corpus.txt\n")
+        sys.exit(1)
+
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hc:g:r:", ["help", "config=", "grammar=", "repeat="])
+    except getopt.GetoptError:
+        usage()
+
+    if len(opts) == 0 and len(args) == 0:
+        usage()
+
+    config_file = None
+    grammar = None
+    repeat = 3
+
+    for o, a in opts :
+        if o == "-h" or o == "--help":
+            usage()
+        elif o == "-c" or o == "--config":
+            config_file = a
+        elif o == "-g" or o == "--grammar":
+            grammar = a
+        elif o == "-r" or o == "--repeat":
+            repeat = int(a)
+        else:
+            sys.stderr.write("Wrong option '%s'.\n" % o)
+            usage()
+
+    if config_file is None:
+        sys.stderr.write("You must provide the config file.\n")
+        usage()
+
+    if grammar is None:
+        sys.stderr.write("You must provide the grammar.\n")
+        usage()
+
+    files = [f for f in args if os.path.isfile(f)]
+    if not files:
+        sys.stderr.write("You must provide at least one file to process.\n")
+        usage()
+
+    config = None
+    with open(config_file, "r") as f:
+        config = yaml.load(f)
+    options = UnitexConfig(config)
+
+    init_log_system(options["verbose"], options["debug"], options["log"])
+
+    # No match cache: each run applies the grammar.
+    processor = UnitexProcessor(options)
+    processor.preload()
+
+    sys.stdout.write("%-20s %10s %10s %12s %10s %12s\n" % ("file", "parser", "matches", "first (ms)", "seconds", "peak (MB)"))
+    for path in files:
+        processor.open(path, mode="srtl", tagged=False)
+
+        name = os.path.basename(path)
+        for i in range(repeat):
+            for label, function in (("whole", whole), ("streamed", streamed)):
+                matches, first, elapsed, peak = measure(function, processor, grammar)
+
+                first = first * 1000 if first is not None else 0.0
+                peak = "%12.1f" % (peak / 1048576.0) if peak is not None else "%12s" % "-"
+
+                sys.stdout.write("%-20s %10s %10d %12.2f %10.3f %s\n" % (name, label, matches, first, elapsed, peak))
+
+        processor.close(clean=True, free=False)
+
+    processor.close(clean=False, free=True)
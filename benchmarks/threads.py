@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import os
+import sys
+import time
+import yaml
+
+# Python 3 (or the 'futures' backport for Python 2)
+from concurrent.futures import ThreadPoolExecutor
+
+from unitex import init_log_system, UnitexConstants
+from unitex.config import UnitexConfig
+from unitex.io import cp, ls, rm
+from unitex.resources import *
+from unitex.tools import dico, fst2txt, locate, normalize, tokenize
+
+
+
+def process(number, path, grammar, options):
+    # Each document gets its own virtual name so that the threads never
+    # share a '*_snt' workspace.
+    directory = "%sbench-threads" % UnitexConstants.VFS_PREFIX
+
+    txt = "%s/document-%d.txt" % (directory, number)
+    snt = "%s/document-%d.snt" % (directory, number)
+    snt_dir = "%s/document-%d_snt/" % (directory, number)
+
+    cp(path, txt)
+
+    alphabet = options["resources"]["alphabet"]
+
+    normalize(txt, **options["tools"]["normalize"])
+
+    if options["resources"]["sentence"] is not None:
+        kwargs = {}
+        kwargs["start_on_space"] = options["tools"]["fst2txt"]["start_on_space"]
+        kwargs["char_by_char"] = options["tools"]["fst2txt"]["char_by_char"]
+        kwargs["merge"] = True
+
+        fst2txt(options["resources"]["sentence"], snt, alphabet, **kwargs)
+
+    tokenize(snt, alphabet, **options["tools"]["tokenize"])
+
+    if options["resources"]["dictionaries"] is not None:
+        dico(options["resources"]["dictionaries"], snt, alphabet, **options["tools"]["dico"])
+
+    ret = locate(grammar, snt, alphabet, **options["tools"]["locate"])
+
+    for vf in ls(snt_dir):
+        rm(vf)
+    rm(snt)
+    rm(txt)
+
+    return ret
+
+def run(files, grammar, options, threads, repeat):
+    documents = [f for f in files for _ in range(repeat)]
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(process, i, f, grammar, options) for i, f in enumerate(documents)]
+        for future in futures:
+            future.result()
+    elapsed = time.time() - start
+
+    return len(documents), elapsed
+
+
+
+if __name__ == "__main__":
+    def usage():
+        sys.stderr.write("Threads -- measures how the Unitex tools throughput scales with threads\n\n")
+        sys.stderr.write("  $ threads [OPTIONS] <file1(, file2, ...)>\n\n")
+        sys.stderr.write("Options:\n")
+        sys.stderr.write("  [ -h, --help    = this help message                           ]\n")
+        sys.stderr.write("    -c, --config  = the Unitex config file\n")
+        sys.stderr.write("    -g, --grammar = the fst2 grammar to use\n")
+        sys.stderr.write("  [ -t, --threads = comma separated thread counts (default: 1,2,4,8) ]\n")
+        sys.stderr.write("  [ -r, --repeat  = number of times each file is processed (default: 10) ]\n\n")
+        sys.stderr.write("Example:\n")
+        sys.stderr.write("  $ threads -c unitex.yaml -g grammar.fst2 -t 1,2,4 *.txt\n")
+        sys.exit(1)
+
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hc:g:t:r:", ["help", "config=", "grammar=", "threads=", "repeat="])
+    except getopt.GetoptError:
+        usage()
+
+    if len(opts) == 0 and len(args) == 0:
+        usage()
+
+    config_file = None
+    grammar = None
+    threads = [1, 2, 4, 8]
+    repeat = 10
+
+    for o, a in opts :
+        if o == "-h" or o == "--help":
+            usage()
+        elif o == "-c" or o == "--config":
+            config_file = a
+        elif o == "-g" or o == "--grammar":
+            grammar = a
+        elif o == "-t" or o == "--threads":
+            threads = [int(t) for t in a.split(",")]
+        elif o == "-r" or o == "--repeat":
+            repeat = int(a)
+        else:
+            sys.stderr.write("Wrong option '%s'.\n" % o)
+            usage()
+
+    if config_file is None:
+        sys.stderr.write("You must provide the config file.\n")
+        usage()
+
+    if grammar is None:
+        sys.stderr.write("You must provide the grammar.\n")
+        usage()
+
+    files = [f for f in args if os.path.isfile(f)]
+    if not files:
+        sys.stderr.write("You must provide at least one file to process.\n")
+        usage()
+
+    config = None
+    with open(config_file, "r") as f:
+        config = yaml.load(f)
+    options = UnitexConfig(config)
+
+    init_log_system(options["verbose"], options["debug"], options["log"])
+
+    # The resources are persisted once and shared by all the threads.
+    grammar = load_persistent_fst2(grammar)
+    options["resources"]["alphabet"] = load_persistent_alphabet(options["resources"]["alphabet"])
+    if options["resources"]["sentence"] is not None:
+        options["resources"]["sentence"] = load_persistent_fst2(options["resources"]["sentence"])
+    if options["resources"]["dictionaries"] is not None:
+        options["resources"]["dictionaries"] = [load_persistent_dictionary(d) for d in options["resources"]["dictionaries"]]
+
+    baseline = None
+
+    sys.stdout.write("%8s %10s %10s %10s %8s\n" % ("threads", "documents", "seconds", "docs/s", "speedup"))
+    for count in threads:
+        documents, elapsed = run(files, grammar, options, count, repeat)
+
+        throughput = documents / elapsed
+        if baseline is None:
+            baseline = throughput
+
+        sys.stdout.write("%8d %10d %10.3f %10.1f %8.2f\n" % (count, documents, elapsed, throughput, throughput / baseline))
+
+    free_persistent_fst2(grammar)
+    free_persistent_alphabet(options["resources"]["alphabet"])
+    if options["resources"]["sentence"] is not None:
+        free_persistent_fst2(options["resources"]["sentence"])
+    if options["resources"]["dictionaries"] is not None:
+        for dictionary in options["resources"]["dictionaries"]:
+            free_persistent_dictionary(dictionary)
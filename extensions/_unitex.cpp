@@ -3,9 +3,11 @@
  *       which is included in the Unitex source distribution.
  *
  */
+#define PY_SSIZE_T_CLEAN
 #include <Python.h>
 
 #include "AbstractFilePlugCallback.h"
+#include "Af_stdio.h"
 #include "UnitexTool.h"
 #include "UnitexLibIO.h"
 
@@ -31,6 +33,10 @@ library.\
 /* 'unitex_tool' function */
 static char unitex_tool_docstring[] = "\
 This function launches an Unitex command.\n\n\
+The GIL is released while the command is running. Several commands\n\
+can therefore run concurrently (from different threads) as long as\n\
+they do not work on the same files (i.e. the same text, '*_snt'\n\
+directory or output file).\n\n\
 *Positional arguments (length: 1):*\n\n\
 - **0 [str]** -- the Unitex command.\n\n\
 *Return [bool]:*\n\n\
@@ -44,12 +50,81 @@ PyObject *unitex_tool(PyObject *self, PyObject *args) {
         return NULL;
 
     unsigned int ret;
+
+    Py_BEGIN_ALLOW_THREADS
     ret = UnitexTool_public_run_string(command);
+    Py_END_ALLOW_THREADS
 
     return Py_BuildValue("O", ret ? Py_False: Py_True);
 }
 
 
+/* 'unitex_tool_argv' function */
+static char unitex_tool_argv_docstring[] = "\
+This function launches an Unitex command given as an argument list.\n\
+Unlike 'unitex_tool', the arguments are passed as is to Unitex (i.e.\n\
+they are not joined and re-tokenized) so they can contain spaces.\n\n\
+The GIL is released while the command is running (cf. 'unitex_tool').\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [list(str)]** -- the Unitex command (e.g. ['UnitexTool',\n\
+  'Normalize', 'corpus.txt', '-qutf8-no-bom']).\n\n\
+*Return [bool]:*\n\n\
+  **True** if the command succeeds, **False** otherwise.\
+";
+static PyObject *unitex_tool_argv(PyObject *self, PyObject *args);
+
+PyObject *unitex_tool_argv(PyObject *self, PyObject *args) {
+    PyObject *arguments;
+    if (!PyArg_ParseTuple(args, "O", &arguments))
+        return NULL;
+
+    PyObject *sequence = PySequence_Fast(arguments, "The Unitex command must be a list of strings.");
+    if (sequence == NULL)
+        return NULL;
+
+    Py_ssize_t argc = PySequence_Fast_GET_SIZE(sequence);
+
+    char **argv = (char**)calloc(argc+1, sizeof(char*));
+    if (argv == NULL) {
+        Py_DECREF(sequence);
+        return PyErr_NoMemory();
+    }
+
+    /* The arguments are copied since the list may be modified by
+       another thread while the GIL is released. */
+    Py_ssize_t i;
+    for (i = 0; i != argc; ++i) {
+        char *argument;
+        if (!PyArg_Parse(PySequence_Fast_GET_ITEM(sequence, i), "s", &argument))
+            break;
+
+        argv[i] = strdup(argument);
+        if (argv[i] == NULL) {
+            PyErr_NoMemory();
+            break;
+        }
+    }
+    Py_DECREF(sequence);
+
+    unsigned int ret = 1;
+
+    if (i == argc) {
+        Py_BEGIN_ALLOW_THREADS
+        ret = UnitexTool_public_run((int)argc, argv, NULL, NULL);
+        Py_END_ALLOW_THREADS
+    }
+
+    for (Py_ssize_t j = 0; j != argc; ++j) {
+        free(argv[j]);
+    }
+    free(argv);
+
+    if (i != argc)
+        return NULL;
+
+    return Py_BuildValue("O", ret ? Py_False: Py_True);
+}
+
 
 /*************************
  * PERSISTENCE FUNCTIONS *
@@ -80,8 +155,16 @@ PyObject *unitex_load_persistent_dictionary(PyObject *self, PyObject *args) {
         return NULL;
     }
 
-    if (persistence_public_load_dictionary(path, persistent_path, length)) {
+    /* Loading may take a while: the other threads keep running. */
+    int ret;
+    Py_BEGIN_ALLOW_THREADS
+    ret = persistence_public_load_dictionary(path, persistent_path, length);
+    Py_END_ALLOW_THREADS
+
+    if (ret) {
         result = Py_BuildValue("s", persistent_path);
+    } else {
+        PyErr_Format(PyExc_IOError, "unable to load dictionary '%s'", path);
     }
     free(persistent_path);
 
@@ -113,8 +196,16 @@ PyObject *unitex_load_persistent_fst2(PyObject *self, PyObject *args) {
         return NULL;
     }
 
-    if (persistence_public_load_fst2(path, persistent_path, length)) {
+    /* Loading may take a while: the other threads keep running. */
+    int ret;
+    Py_BEGIN_ALLOW_THREADS
+    ret = persistence_public_load_fst2(path, persistent_path, length);
+    Py_END_ALLOW_THREADS
+
+    if (ret) {
         result = Py_BuildValue("s", persistent_path);
+    } else {
+        PyErr_Format(PyExc_IOError, "unable to load fst2 '%s'", path);
     }
     free(persistent_path);
 
@@ -146,8 +237,16 @@ PyObject *unitex_load_persistent_alphabet(PyObject *self, PyObject *args) {
         return NULL;
     }
 
-    if (persistence_public_load_alphabet(path, persistent_path, length)) {
+    /* Loading may take a while: the other threads keep running. */
+    int ret;
+    Py_BEGIN_ALLOW_THREADS
+    ret = persistence_public_load_alphabet(path, persistent_path, length);
+    Py_END_ALLOW_THREADS
+
+    if (ret) {
         result = Py_BuildValue("s", persistent_path);
+    } else {
+        PyErr_Format(PyExc_IOError, "unable to load alphabet '%s'", path);
     }
     free(persistent_path);
 
@@ -290,6 +389,184 @@ PyObject *unitex_is_persistent_alphabet(PyObject *self, PyObject *args) {
  * I/O FUNCTIONS *
  *****************/
 
+/* UTF-8 bom detection */
+static size_t unitex_bom_size(const char *buffer, size_t size) {
+    const unsigned char* bufchar = (const unsigned char*)buffer;
+    if (size>2) {
+        if (((*(bufchar))==0xef) && ((*(bufchar+1))==0xbb) && ((*(bufchar+2))==0xbf)) {
+            return 3;
+        }
+    }
+    return 0;
+}
+
+/* 'UnitexBuffer' type (read-only view of a mapped file) */
+typedef struct {
+    PyObject_HEAD
+    UNITEXFILEMAPPED *amf;
+    const void *buffer;
+    size_t file_size;
+    size_t bom_size;
+    Py_ssize_t exports;
+} UnitexBufferObject;
+
+static char unitex_buffer_docstring[] = "\
+Read-only view of a file mapped from the disk or from the virtual\n\
+filesystem (cf. 'unitex_read_buffer').\
+";
+
+static PyTypeObject UnitexBufferType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+};
+
+static char empty_buffer[1] = { '\0' };
+
+static int unitex_buffer_getbuffer(PyObject *obj, Py_buffer *view, int flags) {
+    UnitexBufferObject *self = (UnitexBufferObject*)obj;
+    if (self->amf == NULL) {
+        PyErr_SetString(PyExc_ValueError, "Operation on a released buffer.");
+        view->obj = NULL;
+        return -1;
+    }
+
+    void *data = empty_buffer;
+    if (self->buffer != NULL)
+        data = (void*)((const char*)self->buffer+self->bom_size);
+
+    if (PyBuffer_FillInfo(view, obj, data, (Py_ssize_t)(self->file_size-self->bom_size), 1, flags) != 0)
+        return -1;
+    self->exports++;
+
+    return 0;
+}
+
+static void unitex_buffer_releasebuffer(PyObject *obj, Py_buffer *view) {
+    UnitexBufferObject *self = (UnitexBufferObject*)obj;
+    self->exports--;
+}
+
+static void unitex_buffer_unmap(UnitexBufferObject *self) {
+    if (self->amf != NULL) {
+        CloseUnitexFileReadBuffer(self->amf, self->buffer, self->file_size);
+        self->amf = NULL;
+        self->buffer = NULL;
+        self->file_size = 0;
+        self->bom_size = 0;
+    }
+}
+
+static void unitex_buffer_dealloc(PyObject *obj) {
+    unitex_buffer_unmap((UnitexBufferObject*)obj);
+    PyObject_Del(obj);
+}
+
+static PyObject *unitex_buffer_release(PyObject *obj, PyObject *noarg) {
+    UnitexBufferObject *self = (UnitexBufferObject*)obj;
+    if (self->exports > 0) {
+        PyErr_SetString(PyExc_BufferError, "The buffer is still exported (release the memoryviews first).");
+        return NULL;
+    }
+    unitex_buffer_unmap(self);
+
+    Py_RETURN_NONE;
+}
+
+static Py_ssize_t unitex_buffer_length(PyObject *obj) {
+    UnitexBufferObject *self = (UnitexBufferObject*)obj;
+    return (Py_ssize_t)(self->file_size-self->bom_size);
+}
+
+static PyBufferProcs unitex_buffer_as_buffer;
+static PySequenceMethods unitex_buffer_as_sequence;
+
+static PyMethodDef unitex_buffer_methods[] = {
+    {"release", unitex_buffer_release, METH_NOARGS, "Unmaps the file (the buffer must not be exported anymore)."},
+    {NULL, NULL, 0, NULL}
+};
+
+static int unitex_buffer_type_ready(void) {
+    unitex_buffer_as_buffer.bf_getbuffer = unitex_buffer_getbuffer;
+    unitex_buffer_as_buffer.bf_releasebuffer = unitex_buffer_releasebuffer;
+
+    unitex_buffer_as_sequence.sq_length = unitex_buffer_length;
+
+    UnitexBufferType.tp_name = "_unitex.UnitexBuffer";
+    UnitexBufferType.tp_basicsize = sizeof(UnitexBufferObject);
+    UnitexBufferType.tp_dealloc = unitex_buffer_dealloc;
+    UnitexBufferType.tp_as_sequence = &unitex_buffer_as_sequence;
+    UnitexBufferType.tp_as_buffer = &unitex_buffer_as_buffer;
+#if PY_MAJOR_VERSION >= 3
+    UnitexBufferType.tp_flags = Py_TPFLAGS_DEFAULT;
+#else
+    UnitexBufferType.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_NEWBUFFER;
+#endif
+    UnitexBufferType.tp_doc = unitex_buffer_docstring;
+    UnitexBufferType.tp_methods = unitex_buffer_methods;
+
+    return PyType_Ready(&UnitexBufferType);
+}
+
+/*
+ * Python callables receiving the Unitex standard and error outputs
+ * (cf. 'unitex_redirect_stdout' and 'unitex_redirect_stderr').
+ */
+static PyObject *unitex_std_callbacks[2] = { NULL, NULL };
+
+#if PY_MAJOR_VERSION >= 3
+#define UNITEX_BYTES_FORMAT "y#"
+#else
+#define UNITEX_BYTES_FORMAT "s#"
+#endif
+
+static size_t ABSTRACT_CALLBACK_UNITEX unitex_std_write(const void *buffer, size_t size, void *private_ptr) {
+    /* The tools may run without the GIL (cf. 'unitex_tool'). */
+    PyGILState_STATE state = PyGILState_Ensure();
+
+    /*
+     * 'private_ptr' is the callback slot, not the callback: the callback
+     * may be replaced (and freed) by another thread while a tool is
+     * running. A strong reference is taken under the GIL for the call.
+     */
+    PyObject *callback = *(PyObject**)private_ptr;
+    Py_XINCREF(callback);
+
+    if (callback != NULL) {
+        PyObject *result = PyObject_CallFunction(callback, UNITEX_BYTES_FORMAT, (const char*)buffer, (Py_ssize_t)size);
+        if (result == NULL)
+            PyErr_WriteUnraisable(callback);
+        Py_XDECREF(result);
+    }
+
+    Py_XDECREF(callback);
+
+    PyGILState_Release(state);
+
+    return size;
+}
+
+static int unitex_std_redirect(enum stdwrite_kind swk, int trash_output, PyObject *callback) {
+    PyObject *previous = unitex_std_callbacks[swk];
+
+    /* The slot is updated first: the writers read it under the GIL. */
+    Py_XINCREF(callback);
+    unitex_std_callbacks[swk] = callback;
+
+    int ret;
+    if (callback == NULL)
+        ret = SetStdWriteCB(swk, trash_output, NULL, NULL);
+    else
+        ret = SetStdWriteCB(swk, 0, unitex_std_write, &unitex_std_callbacks[swk]);
+
+    if (ret) {
+        Py_XDECREF(previous);
+    } else {
+        unitex_std_callbacks[swk] = previous;
+        Py_XDECREF(callback);
+    }
+
+    return ret;
+}
+
 /* 'unitex_enable_stdout' function */
 static char unitex_enable_stdout_docstring[] = "\
 This function enables Unitex standard output. This is the default\n\
@@ -304,7 +581,7 @@ PyObject *unitex_enable_stdout(PyObject *self, PyObject *noarg) {
     enum stdwrite_kind swk = stdwrite_kind_out;
 
     unsigned int ret;
-    ret = SetStdWriteCB(swk, 0, NULL, NULL);
+    ret = unitex_std_redirect(swk, 0, NULL);
 
     return Py_BuildValue("O", ret ? Py_True: Py_False);
 }
@@ -323,7 +600,7 @@ PyObject *unitex_enable_stderr(PyObject *self, PyObject *noarg) {
     enum stdwrite_kind swk = stdwrite_kind_err;
 
     unsigned int ret;
-    ret = SetStdWriteCB(swk, 0, NULL, NULL);
+    ret = unitex_std_redirect(swk, 0, NULL);
 
     return Py_BuildValue("O", ret ? Py_True: Py_False);
 }
@@ -343,7 +620,7 @@ PyObject *unitex_disable_stdout(PyObject *self, PyObject *noarg) {
     enum stdwrite_kind swk = stdwrite_kind_out;
 
     unsigned int ret;
-    ret = SetStdWriteCB(swk, 1, NULL, NULL);
+    ret = unitex_std_redirect(swk, 1, NULL);
 
     return Py_BuildValue("O", ret ? Py_True: Py_False);
 }
@@ -363,11 +640,276 @@ PyObject *unitex_disable_stderr(PyObject *self, PyObject *noarg) {
     enum stdwrite_kind swk = stdwrite_kind_err;
 
     unsigned int ret;
-    ret = SetStdWriteCB(swk, 1, NULL, NULL);
+    ret = unitex_std_redirect(swk, 1, NULL);
 
     return Py_BuildValue("O", ret ? Py_True: Py_False);
 }
 
+/* 'unitex_redirect_stdout' function */
+static char unitex_redirect_stdout_docstring[] = "\
+This function redirects the Unitex standard output to a Python\n\
+callable. The callable is called with the raw (bytes) output chunks,\n\
+from the thread running the Unitex tool.\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [callable]** -- the output callback.\n\n\
+*Return [bool]:*\n\n\
+  **True** if it succeeds, **False** otherwise.\
+";
+static PyObject *unitex_redirect_stdout(PyObject *self, PyObject *args);
+
+PyObject *unitex_redirect_stdout(PyObject *self, PyObject *args) {
+    PyObject *callback;
+    if (!PyArg_ParseTuple(args, "O", &callback))
+        return NULL;
+
+    if (!PyCallable_Check(callback)) {
+        PyErr_SetString(PyExc_TypeError, "the argument must be callable");
+        return NULL;
+    }
+
+    unsigned int ret;
+    ret = unitex_std_redirect(stdwrite_kind_out, 0, callback);
+
+    return Py_BuildValue("O", ret ? Py_True: Py_False);
+}
+
+/* 'unitex_redirect_stderr' function */
+static char unitex_redirect_stderr_docstring[] = "\
+This function redirects the Unitex error output to a Python callable.\n\
+The callable is called with the raw (bytes) output chunks, from the\n\
+thread running the Unitex tool.\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [callable]** -- the output callback.\n\n\
+*Return [bool]:*\n\n\
+  **True** if it succeeds, **False** otherwise.\
+";
+static PyObject *unitex_redirect_stderr(PyObject *self, PyObject *args);
+
+PyObject *unitex_redirect_stderr(PyObject *self, PyObject *args) {
+    PyObject *callback;
+    if (!PyArg_ParseTuple(args, "O", &callback))
+        return NULL;
+
+    if (!PyCallable_Check(callback)) {
+        PyErr_SetString(PyExc_TypeError, "the argument must be callable");
+        return NULL;
+    }
+
+    unsigned int ret;
+    ret = unitex_std_redirect(stdwrite_kind_err, 0, callback);
+
+    return Py_BuildValue("O", ret ? Py_True: Py_False);
+}
+
+/*
+ * Output capture: a file space, plugged in Unitex with the abstract
+ * file interface, which catches a single (output) path and forwards
+ * the written chunks to a Python callable instead of storing them.
+ */
+typedef struct {
+    char *path;
+    PyObject *callback;
+    afs_size_type size;
+} UnitexCapture;
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_is_filename_object(const char *name, void *private_ptr) {
+    return strcmp(name, ((UnitexCapture*)private_ptr)->path) == 0;
+}
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_init(void *private_ptr) {
+    return 1;
+}
+
+static void ABSTRACT_CALLBACK_UNITEX unitex_capture_uninit(void *private_ptr) {
+}
+
+static ABSTRACTFILE_PTR ABSTRACT_CALLBACK_UNITEX unitex_capture_open(const char *name, TYPEOPEN_MF type_open, void *private_ptr) {
+    return (ABSTRACTFILE_PTR)private_ptr;
+}
+
+static long ABSTRACT_CALLBACK_UNITEX unitex_capture_write(ABSTRACTFILE_PTR file, const void *buffer, size_t size, void *private_ptr) {
+    UnitexCapture *capture = (UnitexCapture*)private_ptr;
+
+    /* The tools may run without the GIL (cf. 'unitex_tool'). */
+    PyGILState_STATE state = PyGILState_Ensure();
+
+    PyObject *result = PyObject_CallFunction(capture->callback, UNITEX_BYTES_FORMAT, (const char*)buffer, (Py_ssize_t)size);
+    if (result == NULL)
+        PyErr_WriteUnraisable(capture->callback);
+    Py_XDECREF(result);
+
+    PyGILState_Release(state);
+
+    capture->size += size;
+
+    return (long)size;
+}
+
+static long ABSTRACT_CALLBACK_UNITEX unitex_capture_read(ABSTRACTFILE_PTR file, void *buffer, size_t size, void *private_ptr) {
+    /* The captured content is not stored. */
+    return 0;
+}
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_seek(ABSTRACTFILE_PTR file, afs_size_type position, int type_seek, void *private_ptr) {
+    UnitexCapture *capture = (UnitexCapture*)private_ptr;
+
+    /* The output can only be written sequentially. */
+    if (type_seek == SEEK_CUR)
+        position += capture->size;
+    else if (type_seek == SEEK_END)
+        position += capture->size;
+
+    return position == capture->size ? 0 : -1;
+}
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_tell(ABSTRACTFILE_PTR file, afs_size_type *position, void *private_ptr) {
+    *position = ((UnitexCapture*)private_ptr)->size;
+    return 0;
+}
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_close(ABSTRACTFILE_PTR file, void *private_ptr) {
+    return 0;
+}
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_reserve(ABSTRACTFILE_PTR file, afs_size_type size, void *private_ptr) {
+    return 0;
+}
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_truncate(ABSTRACTFILE_PTR file, afs_size_type size, void *private_ptr) {
+    return size == ((UnitexCapture*)private_ptr)->size ? 0 : -1;
+}
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_remove(const char *name, void *private_ptr) {
+    return 0;
+}
+
+static int ABSTRACT_CALLBACK_UNITEX unitex_capture_rename(const char *old_name, const char *new_name, void *private_ptr) {
+    return -1;
+}
+
+static const t_fileio_func_array unitex_capture_functions = {
+    sizeof(t_fileio_func_array),
+    unitex_capture_is_filename_object,
+    unitex_capture_init,
+    unitex_capture_uninit,
+    unitex_capture_open,
+    unitex_capture_write,
+    unitex_capture_read,
+    unitex_capture_seek,
+    unitex_capture_tell,
+    unitex_capture_tell,
+    unitex_capture_close,
+    unitex_capture_reserve,
+    unitex_capture_truncate,
+    unitex_capture_remove,
+    unitex_capture_rename
+};
+
+#define UNITEX_CAPTURE_NAME "_unitex.UnitexCapture"
+
+static void unitex_capture_release(UnitexCapture *capture) {
+    if (capture->path == NULL)
+        return;
+
+    RemoveAbstractFileSpace(&unitex_capture_functions, capture);
+
+    free(capture->path);
+    capture->path = NULL;
+
+    Py_CLEAR(capture->callback);
+}
+
+static void unitex_capture_destructor(PyObject *capsule) {
+    UnitexCapture *capture = (UnitexCapture*)PyCapsule_GetPointer(capsule, UNITEX_CAPTURE_NAME);
+    if (capture == NULL)
+        return;
+
+    unitex_capture_release(capture);
+    free(capture);
+}
+
+/* 'unitex_capture_start' function */
+static char unitex_capture_start_docstring[] = "\
+This function redirects an output file (e.g. the 'concord.ind' file\n\
+produced by Locate) to a Python callable. The file is not stored:\n\
+the callable is called with the raw (bytes) chunks as soon as they\n\
+are written, from the thread running the Unitex tool.\n\
+**WARNING: the captured file can't be read back by Unitex.**\n\n\
+*Positional arguments (length: 2):*\n\n\
+- **0 [str]** -- the file path (as used by the Unitex tool).\n\
+- **1 [callable]** -- the output callback.\n\n\
+*Return [object]:*\n\n\
+  The capture handle (cf. 'unitex_capture_stop').\
+";
+static PyObject *unitex_capture_start(PyObject *self, PyObject *args);
+
+PyObject *unitex_capture_start(PyObject *self, PyObject *args) {
+    char *path;
+    PyObject *callback;
+    if (!PyArg_ParseTuple(args, "sO", &path, &callback))
+        return NULL;
+
+    if (!PyCallable_Check(callback)) {
+        PyErr_SetString(PyExc_TypeError, "the second argument must be callable");
+        return NULL;
+    }
+
+    UnitexCapture *capture = (UnitexCapture*)malloc(sizeof(UnitexCapture));
+    if (capture == NULL)
+        return PyErr_NoMemory();
+
+    capture->path = strdup(path);
+    if (capture->path == NULL) {
+        free(capture);
+        return PyErr_NoMemory();
+    }
+    capture->callback = callback;
+    capture->size = 0;
+
+    Py_INCREF(callback);
+
+    if (!AddAbstractFileSpace(&unitex_capture_functions, capture)) {
+        Py_DECREF(callback);
+        free(capture->path);
+        free(capture);
+
+        PyErr_Format(PyExc_IOError, "unable to capture file '%s'", path);
+        return NULL;
+    }
+
+    PyObject *capsule = PyCapsule_New(capture, UNITEX_CAPTURE_NAME, unitex_capture_destructor);
+    if (capsule == NULL) {
+        unitex_capture_release(capture);
+        free(capture);
+    }
+
+    return capsule;
+}
+
+/* 'unitex_capture_stop' function */
+static char unitex_capture_stop_docstring[] = "\
+This function removes an output capture.\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [object]** -- the capture handle (cf. 'unitex_capture_start').\n\n\
+*Return [int]:*\n\n\
+  The number of bytes captured.\
+";
+static PyObject *unitex_capture_stop(PyObject *self, PyObject *args);
+
+PyObject *unitex_capture_stop(PyObject *self, PyObject *args) {
+    PyObject *capsule;
+    if (!PyArg_ParseTuple(args, "O", &capsule))
+        return NULL;
+
+    UnitexCapture *capture = (UnitexCapture*)PyCapsule_GetPointer(capsule, UNITEX_CAPTURE_NAME);
+    if (capture == NULL)
+        return NULL;
+
+    unitex_capture_release(capture);
+
+    return Py_BuildValue("L", (PY_LONG_LONG)capture->size);
+}
+
 /* 'unitex_cp' function */
 static char unitex_cp_docstring[] = "\
 This function copies a file. Both pathes can be on the virtual\n\
@@ -521,6 +1063,391 @@ PyObject *unitex_ls(PyObject *self, PyObject *args) {
     return file_list;
 }
 
+/*
+ * Size of a file (bom included) or -1 if it doesn't exist. The file is
+ * only opened (never mapped nor read): metadata lookup.
+ */
+static long unitex_file_size(const char *path) {
+    ABSTRACTFILE *f = af_fopen(path, "rb");
+    if (f == NULL)
+        return -1;
+
+    long size = -1;
+    if (af_fseek(f, 0, SEEK_END) == 0)
+        size = af_ftell(f);
+    af_fclose(f);
+
+    return size;
+}
+
+/* 'unitex_exists' function */
+static char unitex_exists_docstring[] = "\
+This function checks if a file exists (on the disk or on the virtual\n\
+filesystem) with a single lookup (i.e. without listing the directory\n\
+nor reading the file).\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [str]** -- the file path.\n\n\
+*Return [bool]:*\n\n\
+  **True** if the file exists, **False** otherwise.\
+";
+static PyObject *unitex_exists(PyObject *self, PyObject *args);
+
+PyObject *unitex_exists(PyObject *self, PyObject *args) {
+    char *path;
+    if (!PyArg_ParseTuple(args, "s", &path))
+        return NULL;
+
+    ABSTRACTFILE *f = af_fopen(path, "rb");
+    if (f == NULL)
+        return Py_BuildValue("O", Py_False);
+
+    af_fclose(f);
+
+    return Py_BuildValue("O", Py_True);
+}
+
+/* 'unitex_stat' function */
+static char unitex_stat_docstring[] = "\
+This function returns the status of a file (on the disk or on the\n\
+virtual filesystem) with a single lookup (the file is not read).\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [str]** -- the file path.\n\n\
+*Return [dict]:*\n\n\
+  The function returns a dictionary with the keys 'size' (the file\n\
+  size in bytes, bom included) and 'virtual' (**True** if the file is\n\
+  stored in a virtual filesystem) or **None** if the file doesn't\n\
+  exist.\
+";
+static PyObject *unitex_stat(PyObject *self, PyObject *args);
+
+PyObject *unitex_stat(PyObject *self, PyObject *args) {
+    char *path;
+    if (!PyArg_ParseTuple(args, "s", &path))
+        return NULL;
+
+    long file_size = unitex_file_size(path);
+    if (file_size < 0)
+        Py_RETURN_NONE;
+
+    return Py_BuildValue("{s:n,s:O}",
+                         "size", (Py_ssize_t)file_size,
+                         "virtual", UnitexAbstractPathExists(path) ? Py_True : Py_False);
+}
+
+/* 'unitex_usage' function */
+static char unitex_usage_docstring[] = "\
+This function computes the space used by the files whose path starts\n\
+with the given prefix (e.g. '$:' for the whole virtual filesystem).\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [str]** -- the path prefix.\n\n\
+*Return [dict]:*\n\n\
+  The function returns a dictionary with the keys 'files' (the number\n\
+  of files) and 'bytes' (their total size).\
+";
+static PyObject *unitex_usage(PyObject *self, PyObject *args);
+
+PyObject *unitex_usage(PyObject *self, PyObject *args) {
+    char *prefix;
+    if (!PyArg_ParseTuple(args, "s", &prefix))
+        return NULL;
+
+    Py_ssize_t files = 0;
+    unsigned long long bytes = 0;
+
+    char **_file_list = GetUnitexFileList(prefix);
+    if (_file_list!=NULL) {
+        size_t length = strlen(prefix);
+
+        char **_file_list_walk=_file_list;
+        while ((*_file_list_walk)!=NULL) {
+            if (strncmp(*_file_list_walk, prefix, length) == 0) {
+                UNITEXFILEMAPPED *amf;
+                const void *buffer;
+                size_t file_size;
+
+                GetUnitexFileReadBuffer(*_file_list_walk, &amf, &buffer, &file_size);
+                if (amf != NULL) {
+                    files ++;
+                    bytes += file_size;
+
+                    CloseUnitexFileReadBuffer(amf, buffer, file_size);
+                }
+            }
+            free(*_file_list_walk);
+            _file_list_walk++;
+        }
+        free(_file_list);
+    }
+
+    return Py_BuildValue("{s:n,s:K}", "files", files, "bytes", bytes);
+}
+
+/* 'unitex_rm_prefix' function */
+static char unitex_rm_prefix_docstring[] = "\
+This function removes, in a single call, all the virtual files whose\n\
+path starts with the given prefix (e.g. a '*_snt/' directory).\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [str]** -- the path prefix (virtual filesystem).\n\n\
+*Return [int]:*\n\n\
+  The number of files removed.\
+";
+static PyObject *unitex_rm_prefix(PyObject *self, PyObject *args);
+
+PyObject *unitex_rm_prefix(PyObject *self, PyObject *args) {
+    char *prefix;
+    if (!PyArg_ParseTuple(args, "s", &prefix))
+        return NULL;
+
+    Py_ssize_t removed = 0;
+
+    char **_file_list = GetUnitexFileList(prefix);
+    if (_file_list==NULL)
+        return Py_BuildValue("n", removed);
+
+    size_t length = strlen(prefix);
+
+    char **_file_list_walk=_file_list;
+    while ((*_file_list_walk)!=NULL) {
+        /* Only the virtual filesystem returns full paths. */
+        if (strncmp(*_file_list_walk, prefix, length) == 0) {
+            if (RemoveUnitexFile(*_file_list_walk) == 0)
+                removed ++;
+        }
+        free(*_file_list_walk);
+        _file_list_walk++;
+    }
+    free(_file_list);
+
+    return Py_BuildValue("n", removed);
+}
+
+/* 'unitex_cp_many' function */
+static char unitex_cp_many_docstring[] = "\
+This function copies a list of files in a single call. Both pathes\n\
+can be on the virtual filesystem or the disk filesystem (cf.\n\
+'unitex_cp').\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [list(tuple(str, str))]** -- the (source, target) file pathes.\n\n\
+*Return [bool]:*\n\n\
+  **True** if all the copies succeed, **False** otherwise.\
+";
+static PyObject *unitex_cp_many(PyObject *self, PyObject *args);
+
+PyObject *unitex_cp_many(PyObject *self, PyObject *args) {
+    PyObject *list;
+    if (!PyArg_ParseTuple(args, "O", &list))
+        return NULL;
+
+    PyObject *sequence = PySequence_Fast(list, "the argument must be a list of (source, target) pathes");
+    if (sequence == NULL)
+        return NULL;
+
+    Py_ssize_t size = PySequence_Fast_GET_SIZE(sequence);
+
+    unsigned int ret = 0;
+    for (Py_ssize_t i = 0; i != size; ++i) {
+        char *source_path;
+        char *target_path;
+
+        if (!PyArg_ParseTuple(PySequence_Fast_GET_ITEM(sequence, i), "ss", &source_path, &target_path)) {
+            Py_DECREF(sequence);
+            return NULL;
+        }
+
+        if (CopyUnitexFile(source_path, target_path))
+            ret = 1;
+    }
+
+    Py_DECREF(sequence);
+
+    return Py_BuildValue("O", ret ? Py_False: Py_True);
+}
+
+/*
+ * Archive format used by 'unitex_export_files'/'unitex_import_files':
+ * the magic string followed, for each file, by the path length (4
+ * bytes), the UTF-8 path, the content length (8 bytes) and the raw
+ * content. Integers are little-endian.
+ */
+static const char UNITEX_ARCHIVE_MAGIC[8] = { 'U','N','X','V','F','S','0','1' };
+
+static void unitex_archive_put(char **cursor, unsigned long long value, int width) {
+    for (int i = 0; i != width; ++i) {
+        *((*cursor)++) = (char)((value >> (8 * i)) & 0xff);
+    }
+}
+
+static int unitex_archive_get(const unsigned char **cursor, const unsigned char *end, unsigned long long *value, int width) {
+    if (end - *cursor < width)
+        return -1;
+
+    *value = 0;
+    for (int i = 0; i != width; ++i) {
+        *value |= ((unsigned long long)*((*cursor)++)) << (8 * i);
+    }
+    return 0;
+}
+
+/* 'unitex_export_files' function */
+static char unitex_export_files_docstring[] = "\
+This function packs a list of files (virtual or not) into a single\n\
+archive blob which can be restored with 'unitex_import_files'.\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [list(str)]** -- the file pathes.\n\n\
+*Return [bytes]:*\n\n\
+  The archive content.\
+";
+static PyObject *unitex_export_files(PyObject *self, PyObject *args);
+
+PyObject *unitex_export_files(PyObject *self, PyObject *args) {
+    PyObject *list;
+    if (!PyArg_ParseTuple(args, "O", &list))
+        return NULL;
+
+    PyObject *sequence = PySequence_Fast(list, "the argument must be a list of pathes");
+    if (sequence == NULL)
+        return NULL;
+
+    Py_ssize_t size = PySequence_Fast_GET_SIZE(sequence);
+
+    char **paths = (char**)calloc(size + 1, sizeof(char*));
+    UNITEXFILEMAPPED **amfs = (UNITEXFILEMAPPED**)calloc(size + 1, sizeof(UNITEXFILEMAPPED*));
+    const void **buffers = (const void**)calloc(size + 1, sizeof(const void*));
+    size_t *file_sizes = (size_t*)calloc(size + 1, sizeof(size_t));
+
+    PyObject *archive = NULL;
+    size_t total = sizeof(UNITEX_ARCHIVE_MAGIC);
+
+    Py_ssize_t mapped = 0;
+    if (paths == NULL || amfs == NULL || buffers == NULL || file_sizes == NULL) {
+        PyErr_NoMemory();
+        goto cleanup;
+    }
+
+    for (; mapped != size; ++mapped) {
+        if (!PyArg_Parse(PySequence_Fast_GET_ITEM(sequence, mapped), "s", &paths[mapped]))
+            goto cleanup;
+
+        GetUnitexFileReadBuffer(paths[mapped], &amfs[mapped], &buffers[mapped], &file_sizes[mapped]);
+        if (amfs[mapped] == NULL) {
+            PyErr_Format(PyExc_IOError, "unable to read file '%s'", paths[mapped]);
+            goto cleanup;
+        }
+
+        total += 4 + strlen(paths[mapped]) + 8 + file_sizes[mapped];
+    }
+
+    archive = PyBytes_FromStringAndSize(NULL, (Py_ssize_t)total);
+    if (archive != NULL) {
+        char *cursor = PyBytes_AS_STRING(archive);
+
+        memcpy(cursor, UNITEX_ARCHIVE_MAGIC, sizeof(UNITEX_ARCHIVE_MAGIC));
+        cursor += sizeof(UNITEX_ARCHIVE_MAGIC);
+
+        for (Py_ssize_t i = 0; i != size; ++i) {
+            size_t length = strlen(paths[i]);
+
+            unitex_archive_put(&cursor, length, 4);
+            memcpy(cursor, paths[i], length);
+            cursor += length;
+
+            unitex_archive_put(&cursor, file_sizes[i], 8);
+            if (file_sizes[i] != 0)
+                memcpy(cursor, buffers[i], file_sizes[i]);
+            cursor += file_sizes[i];
+        }
+    }
+
+cleanup:
+    for (Py_ssize_t i = 0; i != mapped; ++i) {
+        if (amfs[i] != NULL)
+            CloseUnitexFileReadBuffer(amfs[i], buffers[i], file_sizes[i]);
+    }
+
+    free(file_sizes);
+    free(buffers);
+    free(amfs);
+    free(paths);
+
+    Py_DECREF(sequence);
+
+    return archive;
+}
+
+/* 'unitex_import_files' function */
+static char unitex_import_files_docstring[] = "\
+This function restores the files packed by 'unitex_export_files'\n\
+(the files are written to their original pathes).\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [bytes-like]** -- the archive content.\n\n\
+*Return [int]:*\n\n\
+  The number of files written.\
+";
+static PyObject *unitex_import_files(PyObject *self, PyObject *args);
+
+PyObject *unitex_import_files(PyObject *self, PyObject *args) {
+    Py_buffer view;
+    if (!PyArg_ParseTuple(args, "s*", &view))
+        return NULL;
+
+    const unsigned char *cursor = (const unsigned char*)view.buf;
+    const unsigned char *end = cursor + view.len;
+
+    Py_ssize_t written = 0;
+
+    if (view.len < (Py_ssize_t)sizeof(UNITEX_ARCHIVE_MAGIC) ||
+        memcmp(cursor, UNITEX_ARCHIVE_MAGIC, sizeof(UNITEX_ARCHIVE_MAGIC)) != 0) {
+        PyBuffer_Release(&view);
+        PyErr_SetString(PyExc_ValueError, "invalid archive (wrong magic string)");
+        return NULL;
+    }
+    cursor += sizeof(UNITEX_ARCHIVE_MAGIC);
+
+    while (cursor != end) {
+        unsigned long long length;
+        unsigned long long file_size;
+
+        if (unitex_archive_get(&cursor, end, &length, 4) < 0 || (unsigned long long)(end - cursor) < length)
+            break;
+
+        char *path = (char*)malloc(length + 1);
+        if (path == NULL) {
+            PyBuffer_Release(&view);
+            return PyErr_NoMemory();
+        }
+        memcpy(path, cursor, length);
+        path[length] = '\0';
+        cursor += length;
+
+        if (unitex_archive_get(&cursor, end, &file_size, 8) < 0 || (unsigned long long)(end - cursor) < file_size) {
+            free(path);
+            break;
+        }
+
+        unsigned int ret;
+        ret = WriteUnitexFile(path, NULL, 0, cursor, (size_t)file_size);
+        free(path);
+
+        if (ret) {
+            PyBuffer_Release(&view);
+            PyErr_SetString(PyExc_IOError, "unable to write an archived file");
+            return NULL;
+        }
+
+        cursor += file_size;
+        written ++;
+    }
+
+    PyBuffer_Release(&view);
+
+    if (cursor != end) {
+        PyErr_SetString(PyExc_ValueError, "invalid archive (truncated content)");
+        return NULL;
+    }
+
+    return Py_BuildValue("n", written);
+}
+
 /* 'unitex_read_file' function (UTF-8 encoding only)*/
 static char unitex_read_file_docstring[] = "\
 This function read a file from the disk or from the virtual filesystem.\n\
@@ -543,22 +1470,12 @@ PyObject *unitex_read_file(PyObject *self, PyObject *args) {
     size_t file_size;
 
     GetUnitexFileReadBuffer(path, &amf, &buffer, &file_size);
-    const unsigned char* bufchar = (const unsigned char*)buffer;
+    const char* bufchar = buffer != NULL ? (const char*)buffer : empty_buffer;
 
-    size_t bom_size = 0;
-    if (file_size>2) {
-        if (((*(bufchar))==0xef) && ((*(bufchar+1))==0xbb) && ((*(bufchar+2))==0xbf)) {
-            bom_size = 3;
-        }
-    }
+    size_t bom_size = unitex_bom_size(bufchar, file_size);
 
-    char* _content = (char*)malloc(file_size+1);
-    memcpy(_content, bufchar+bom_size, file_size-bom_size);
-
-    *(_content+file_size-bom_size) = '\0';
-
-    content = PyUnicode_FromString(_content);
-    free(_content);
+    /* The string is decoded directly from the mapped buffer. */
+    content = PyUnicode_DecodeUTF8(bufchar+bom_size, file_size-bom_size, NULL);
 
     CloseUnitexFileReadBuffer(amf, buffer, file_size);
 
@@ -571,7 +1488,7 @@ This function read a binary file from the disk or from the virtual filesystem.\n
 **WARNING: The file must be encoded in UTF-8.**\n\n\
 *Positional arguments (length: 1):*\n\n\
 - **0 [str]** -- the file path.\n\n\
-*Return [str]:*\n\n\
+*Return [bytes]:*\n\n\
   The function returns an byte array.\
 ";
 static PyObject *unitex_read_binary_file(PyObject *self, PyObject *args);
@@ -587,27 +1504,90 @@ PyObject *unitex_read_binary_file(PyObject *self, PyObject *args) {
     size_t file_size;
 
     GetUnitexFileReadBuffer(path, &amf, &buffer, &file_size);
-    const unsigned char* bufchar = (const unsigned char*)buffer;
+    const char* bufchar = buffer != NULL ? (const char*)buffer : empty_buffer;
 
-    size_t bom_size = 0;
-    if (file_size>2) {
-        if (((*(bufchar))==0xef) && ((*(bufchar+1))==0xbb) && ((*(bufchar+2))==0xbf)) {
-            bom_size = 3;
-        }
+    size_t bom_size = unitex_bom_size(bufchar, file_size);
+
+    /* bytes on Python 3 ('y#'), str on Python 2 ('s#'). */
+    content = Py_BuildValue(UNITEX_BYTES_FORMAT, bufchar+bom_size, (Py_ssize_t)(file_size-bom_size));
+
+    CloseUnitexFileReadBuffer(amf, buffer, file_size);
+
+    return content;
+}
+
+/* 'unitex_read_buffer' function */
+static char unitex_read_buffer_docstring[] = "\
+This function maps a file from the disk or from the virtual filesystem\n\
+and returns an object supporting the buffer protocol (i.e. usable with\n\
+'memoryview'). The content is not copied: the buffer points directly to\n\
+the mapped file (without the UTF-8 bom). The file is unmapped when the\n\
+object is released (cf. the 'release' method) or destroyed.\n\n\
+*Positional arguments (length: 1):*\n\n\
+- **0 [str]** -- the file path.\n\n\
+*Return [UnitexBuffer]:*\n\n\
+  The read-only buffer.\
+";
+static PyObject *unitex_read_buffer(PyObject *self, PyObject *args);
+
+PyObject *unitex_read_buffer(PyObject *self, PyObject *args) {
+    char *path;
+    if (!PyArg_ParseTuple(args, "s", &path))
+        return NULL;
+
+    UNITEXFILEMAPPED *amf = NULL;
+    const void *buffer = NULL;
+    size_t file_size = 0;
+
+    GetUnitexFileReadBuffer(path, &amf, &buffer, &file_size);
+    if (amf == NULL) {
+        PyErr_Format(PyExc_IOError, "Unable to map file '%s'.", path);
+        return NULL;
+    }
+
+    UnitexBufferObject *object = PyObject_New(UnitexBufferObject, &UnitexBufferType);
+    if (object == NULL) {
+        CloseUnitexFileReadBuffer(amf, buffer, file_size);
+        return NULL;
     }
 
-    char* _content = (char*)malloc(file_size+1);
-    memcpy(_content, bufchar+bom_size, file_size-bom_size);
+    object->amf = amf;
+    object->buffer = buffer;
+    object->file_size = file_size;
+    object->bom_size = unitex_bom_size((const char*)buffer, file_size);
+    object->exports = 0;
 
-    *(_content+file_size-bom_size) = '\0';
+    return (PyObject*)object;
+}
 
-    /* y# doesn't seem to work in ptyhon 2.X */
-    //content = Py_BuildValue("y#", _content, file_size);
-    content = Py_BuildValue("s#", _content, file_size);
+/*
+ * Gives access to the UTF-8 bytes of a file content. Unicode strings
+ * are encoded (the encoded copy is kept in 'encoded' and must be
+ * released by the caller), any other object must support the buffer
+ * protocol (bytes, bytearray, memoryview, mmap...) and is used as is.
+ */
+static int unitex_content_get(PyObject *content, Py_buffer *view, PyObject **encoded) {
+    *encoded = NULL;
+
+    if (PyUnicode_Check(content)) {
+        *encoded = PyUnicode_AsUTF8String(content);
+        if (*encoded == NULL)
+            return -1;
+        content = *encoded;
+    }
 
-    CloseUnitexFileReadBuffer(amf, buffer, file_size);
+    if (PyObject_GetBuffer(content, view, PyBUF_SIMPLE) < 0) {
+        Py_XDECREF(*encoded);
+        *encoded = NULL;
+        return -1;
+    }
 
-    return content;
+    return 0;
+}
+
+static void unitex_content_release(Py_buffer *view, PyObject *encoded) {
+    PyBuffer_Release(view);
+    Py_XDECREF(encoded);
 }
 
 /* 'unitex_write_file' function (UTF-8 encoding only)*/
@@ -616,7 +1596,9 @@ This function writes a file on the disk or on the virtual filesystem.\n\
 **WARNING: The file will be encoded in UTF-8.**\n\n\
 *Positional arguments (length: 3):*\n\n\
 - **0 [str]** -- the file path.\n\
-- **1 [unicode]** -- the file content.\n\
+- **1 [unicode|bytes-like]** -- the file content. Unicode strings are\n\
+  encoded in UTF-8, any object supporting the buffer protocol (bytes,\n\
+  bytearray, memoryview, mmap...) is written as is (it must be UTF-8).\n\
 - **2 [int]** -- 1 to writes the UTF-8 bom, 0 otherwise.\n\n\
 *Return [bool]:*\n\n\
   **True** if the function succeeds, **False** otherwise.\
@@ -625,22 +1607,23 @@ static PyObject *unitex_write_file(PyObject *self, PyObject *args);
 
 PyObject *unitex_write_file(PyObject *self, PyObject *args) {
     char *path;
-    PyObject *ustring;
-    int *use_bom;
-    if (!PyArg_ParseTuple(args, "sUi", &path, &ustring, &use_bom))
+    PyObject *content;
+    int use_bom;
+    if (!PyArg_ParseTuple(args, "sOi", &path, &content, &use_bom))
         return NULL;
 
-    PyObject *bytes;
-    char *content;
-    Py_ssize_t length;
+    Py_buffer view;
+    PyObject *encoded;
 
-    bytes = PyUnicode_AsUTF8String(ustring);
-    PyBytes_AsStringAndSize(bytes, &content, &length);
+    if (unitex_content_get(content, &view, &encoded) < 0)
+        return NULL;
 
     const unsigned char UTF8BOM[3] = { 0xef,0xbb,0xbf };
 
     unsigned int ret;
-    ret = WriteUnitexFile(path, UTF8BOM, use_bom ? 3:0, content, length);
+    ret = WriteUnitexFile(path, UTF8BOM, use_bom ? 3:0, view.buf, (size_t)view.len);
+
+    unitex_content_release(&view, encoded);
 
     return Py_BuildValue("O", ret ? Py_False: Py_True);
 }
@@ -651,7 +1634,9 @@ This function writes at the end of an existing file (virtual or not).\n\
 **WARNING: The file must be encoded in UTF-8.**\n\n\
 *Positional arguments (length: 2):*\n\n\
 - **0 [str]** -- the file path.\n\
-- **1 [unicode]** -- the file content.\n\n\
+- **1 [unicode|bytes-like]** -- the file content. Unicode strings are\n\
+  encoded in UTF-8, any object supporting the buffer protocol (bytes,\n\
+  bytearray, memoryview, mmap...) is written as is (it must be UTF-8).\n\n\
 *Return [bool]:*\n\n\
   **True** if the function succeeds, **False** otherwise.\
 ";
@@ -659,19 +1644,20 @@ static PyObject *unitex_append_to_file(PyObject *self, PyObject *args);
 
 PyObject *unitex_append_to_file(PyObject *self, PyObject *args) {
     char *path;
-    PyObject *ustring;
-    if (!PyArg_ParseTuple(args, "sU", &path, &ustring))
+    PyObject *content;
+    if (!PyArg_ParseTuple(args, "sO", &path, &content))
         return NULL;
 
-    PyObject *bytes;
-    char *content;
-    Py_ssize_t length;
+    Py_buffer view;
+    PyObject *encoded;
 
-    bytes = PyUnicode_AsUTF8String(ustring);
-    PyBytes_AsStringAndSize(bytes, &content, &length);
+    if (unitex_content_get(content, &view, &encoded) < 0)
+        return NULL;
 
     unsigned int ret;
-    ret = AppendUnitexFile(path, content, length);
+    ret = AppendUnitexFile(path, view.buf, (size_t)view.len);
+
+    unitex_content_release(&view, encoded);
 
     return Py_BuildValue("O", ret ? Py_False: Py_True);
 }
@@ -681,6 +1667,7 @@ PyObject *unitex_append_to_file(PyObject *self, PyObject *args) {
 static PyMethodDef unitex_methods[] = {
     /* Unitex Tool function */
     {"unitex_tool", unitex_tool, METH_VARARGS, unitex_tool_docstring},
+    {"unitex_tool_argv", unitex_tool_argv, METH_VARARGS, unitex_tool_argv_docstring},
 
     /* Persistence functions */
     {"unitex_load_persistent_dictionary", unitex_load_persistent_dictionary, METH_VARARGS, unitex_load_persistent_dictionary_docstring},
@@ -700,6 +1687,10 @@ static PyMethodDef unitex_methods[] = {
     {"unitex_disable_stdout", unitex_disable_stdout, METH_NOARGS, unitex_disable_stdout_docstring},
     {"unitex_enable_stderr", unitex_enable_stderr, METH_NOARGS, unitex_enable_stderr_docstring},
     {"unitex_disable_stderr", unitex_disable_stderr, METH_NOARGS, unitex_disable_stderr_docstring},
+    {"unitex_redirect_stdout", unitex_redirect_stdout, METH_VARARGS, unitex_redirect_stdout_docstring},
+    {"unitex_redirect_stderr", unitex_redirect_stderr, METH_VARARGS, unitex_redirect_stderr_docstring},
+    {"unitex_capture_start", unitex_capture_start, METH_VARARGS, unitex_capture_start_docstring},
+    {"unitex_capture_stop", unitex_capture_stop, METH_VARARGS, unitex_capture_stop_docstring},
 
     {"unitex_cp", unitex_cp, METH_VARARGS, unitex_cp_docstring},
     {"unitex_rm", unitex_rm, METH_VARARGS, unitex_rm_docstring},
@@ -707,9 +1698,17 @@ static PyMethodDef unitex_methods[] = {
     {"unitex_mkdir", unitex_mkdir, METH_VARARGS, unitex_mkdir_docstring},
     {"unitex_rmdir", unitex_rmdir, METH_VARARGS, unitex_rmdir_docstring},
     {"unitex_ls", unitex_ls, METH_VARARGS, unitex_ls_docstring},
+    {"unitex_exists", unitex_exists, METH_VARARGS, unitex_exists_docstring},
+    {"unitex_stat", unitex_stat, METH_VARARGS, unitex_stat_docstring},
+    {"unitex_usage", unitex_usage, METH_VARARGS, unitex_usage_docstring},
+    {"unitex_rm_prefix", unitex_rm_prefix, METH_VARARGS, unitex_rm_prefix_docstring},
+    {"unitex_cp_many", unitex_cp_many, METH_VARARGS, unitex_cp_many_docstring},
+    {"unitex_export_files", unitex_export_files, METH_VARARGS, unitex_export_files_docstring},
+    {"unitex_import_files", unitex_import_files, METH_VARARGS, unitex_import_files_docstring},
 
     {"unitex_read_file", unitex_read_file, METH_VARARGS, unitex_read_file_docstring},
     {"unitex_read_binary_file", unitex_read_binary_file, METH_VARARGS, unitex_read_binary_file_docstring},
+    {"unitex_read_buffer", unitex_read_buffer, METH_VARARGS, unitex_read_buffer_docstring},
     {"unitex_write_file", unitex_write_file, METH_VARARGS, unitex_write_file_docstring},
     {"unitex_append_to_file", unitex_append_to_file, METH_VARARGS, unitex_append_to_file_docstring},
 
@@ -726,17 +1725,38 @@ static struct PyModuleDef unitex_module_def = {
 };
 
 PyMODINIT_FUNC PyInit__unitex(void) {
+#if PY_VERSION_HEX < 0x03070000
+    /* Needed to release the GIL in the tool functions. */
+    PyEval_InitThreads();
+#endif
+
+    if (unitex_buffer_type_ready() < 0)
+        return NULL;
+
     PyObject *module = PyModule_Create(&unitex_module_def);
 
     if (module == NULL)
         return NULL;
+
+    Py_INCREF(&UnitexBufferType);
+    PyModule_AddObject(module, "UnitexBuffer", (PyObject*)&UnitexBufferType);
+
     return module;
 }
 #else
 PyMODINIT_FUNC init_unitex(void) {
+    /* Needed to release the GIL in the tool functions. */
+    PyEval_InitThreads();
+
+    if (unitex_buffer_type_ready() < 0)
+        return;
+
     PyObject *module = Py_InitModule3("_unitex", unitex_methods, unitex_docstring);
 
     if (module == NULL)
         return;
+
+    Py_INCREF(&UnitexBufferType);
+    PyModule_AddObject(module, "UnitexBuffer", (PyObject*)&UnitexBufferType);
 }
 #endif
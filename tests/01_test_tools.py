@@ -3,6 +3,7 @@
 
 import os
 import shutil
+import threading
 import unittest
 
 from unitex import *
@@ -345,6 +346,77 @@ class TestUnitexTools(unittest.TestCase):
 
         self.assertTrue(ok, "Extract failed!")
 
+    def test_13_concurrent_locate(self):
+        grammar = self._arguments["fst"]
+        text = self._arguments["snt"]
+        alphabet = self._arguments["alphabet"]
+
+        kwargs = {}
+        kwargs["match_mode"] = UnitexConstants.MATCH_MODE_LONGEST
+        kwargs["output_mode"] = UnitexConstants.OUTPUT_MODE_MERGE
+
+        # The calls share the same workspace and must be serialized.
+        results = []
+        def run():
+            results.append(locate(grammar, text, alphabet, **kwargs))
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ok = len(results) == 4 and all(results)
+        ok = ok and os.path.exists(self._arguments["ind"])
+
+        self.assertTrue(ok, "Concurrent locate failed!")
+
+    def test_14_plan_locate(self):
+        grammar = self._arguments["fst"]
+        alphabet = self._arguments["alphabet"]
+
+        kwargs = {}
+        kwargs["match_mode"] = UnitexConstants.MATCH_MODE_LONGEST
+        kwargs["output_mode"] = UnitexConstants.OUTPUT_MODE_MERGE
+
+        plan = CommandPlan(locate, grammar, slot("text"), alphabet, **kwargs)
+
+        command = plan.command(text=self._arguments["snt"])
+
+        ok = plan.slots == ["text"]
+        ok = ok and "--text=%s" % self._arguments["snt"] in command
+        ok = ok and plan.run(text=self._arguments["snt"])
+        ok = ok and os.path.exists(self._arguments["ind"])
+
+        self.assertTrue(ok, "Locate (plan) failed!")
+
+    def test_15_redirect_stdout(self):
+        grammar = self._arguments["grf"]
+        alphabet = self._arguments["alphabet"]
+
+        lines = []
+
+        ret = redirect_stdout(lines.append)
+
+        kwargs = {}
+        kwargs["loop_check"] = False
+        kwargs["char_by_char"] = False
+        kwargs["pkgdir"] = None
+        kwargs["no_empty_graph_warning"] = False
+        kwargs["tfst_check"] = False
+        kwargs["silent_grf_name"] = False
+        kwargs["named_repositories"] = None
+        kwargs["debug"] = False
+        kwargs["check_variables"] = False
+
+        ok = ret and grf2fst2(grammar, alphabet, **kwargs)
+
+        disable_stdout()
+
+        ok = ok and len(lines) > 0
+
+        self.assertTrue(ok, "Standard output redirection failed!")
+
 
 if __name__ == '__main__':
     unittest.main()
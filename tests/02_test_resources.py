@@ -1,11 +1,11 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import os, unittest
+import os, shutil, unittest
 
 from unitex import UnitexConstants
 from unitex.resources import *
-from unitex.tools import compress
+from unitex.tools import compress, grf2fst2
 
 
 
@@ -21,6 +21,11 @@ class Arguments:
         self.__arguments["fst2"] = "data/Sentence.fst2" 
 
         self.__arguments["alphabet"] = "data/Alphabet.txt" 
+        self.__arguments["alphabet-reload"] = "data/Alphabet-reload.txt"
+        self.__arguments["alphabet-copy"] = "data/Alphabet-copy.txt"
+
+        self.__arguments["grf"] = "data/grammar.grf"
+        self.__arguments["grammar"] = "data/grammar.fst2"
 
     def __getitem__(self, key):
         if key not in self.__arguments:
@@ -47,6 +52,12 @@ class TestUnitexResources(unittest.TestCase):
             os.remove(self._arguments["bin"])
         if os.path.exists(self._arguments["inf"]):
             os.remove(self._arguments["inf"])
+        if os.path.exists(self._arguments["alphabet-reload"]):
+            os.remove(self._arguments["alphabet-reload"])
+        if os.path.exists(self._arguments["alphabet-copy"]):
+            os.remove(self._arguments["alphabet-copy"])
+        if os.path.exists(self._arguments["grammar"]):
+            os.remove(self._arguments["grammar"])
 
     def test_01_load_dictionary(self):
         kwargs = {}
@@ -110,6 +121,168 @@ class TestUnitexResources(unittest.TestCase):
 
         self.assertTrue(ok, "Alphabet freeing failed!")
 
+    def test_07_shared_alphabet(self):
+        path = self._arguments["alphabet"]
+
+        first = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, path)
+        second = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, os.path.abspath(path))
+
+        ok = first == second and is_persistent_alphabet(first)
+
+        ok = ok and release_persistent_resource(second) is False
+        ok = ok and is_persistent_alphabet(first)
+
+        ok = ok and release_persistent_resource(first) is True
+        ok = ok and not is_persistent_alphabet(first)
+
+        self.assertTrue(ok, "Alphabet sharing failed!")
+
+    def test_08_resource_cache(self):
+        alphabet = self._arguments["alphabet"]
+        fst2 = self._arguments["fst2"]
+
+        # The budget only fits one resource.
+        cache = ResourceCache(budget=os.path.getsize(fst2))
+
+        persistent_alphabet = cache.pin(UnitexConstants.RESOURCE_ALPHABET, alphabet)
+        persistent_fst2 = cache.get(UnitexConstants.RESOURCE_GRAMMAR, fst2)
+
+        ok = is_persistent_alphabet(persistent_alphabet)
+        ok = ok and is_persistent_fst2(persistent_fst2)
+
+        with cache.use(UnitexConstants.RESOURCE_GRAMMAR, fst2) as persistent:
+            ok = ok and persistent == persistent_fst2
+
+        cache.unpin(UnitexConstants.RESOURCE_ALPHABET, alphabet)
+        stats = cache.stats()
+
+        ok = ok and not is_persistent_alphabet(persistent_alphabet)
+        ok = ok and stats["hits"] == 1 and stats["misses"] == 2
+        ok = ok and stats["evictions"] == 1 and stats["resources"] == 1
+
+        cache.clear()
+
+        ok = ok and not is_persistent_fst2(persistent_fst2)
+
+        self.assertTrue(ok, "Resource cache failed!")
+
+    def test_09_preload(self):
+        resources = []
+        resources.append((UnitexConstants.RESOURCE_ALPHABET, self._arguments["alphabet"]))
+        resources.append((UnitexConstants.RESOURCE_GRAMMAR, self._arguments["fst2"]))
+
+        result = preload_persistent_resources(resources)
+        reports = result.get()
+
+        ok = result.ready() and len(reports) == len(resources)
+        ok = ok and all(r["error"] is None and r["time"] >= 0 for r in reports)
+        ok = ok and is_persistent_alphabet(reports[0]["persistent"])
+        ok = ok and is_persistent_fst2(reports[1]["persistent"])
+
+        for report in reports:
+            release_persistent_resource(report["persistent"])
+
+        self.assertTrue(ok, "Resource preloading failed!")
+
+    def test_10_resource_watcher(self):
+        path = self._arguments["alphabet-reload"]
+        shutil.copy(self._arguments["alphabet"], path)
+
+        old = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, path)
+        generation = persistent_generation()
+
+        watcher = ResourceWatcher(checksum=True)
+        watcher.watch(UnitexConstants.RESOURCE_ALPHABET, path)
+
+        ok = watcher.check() == []
+
+        with open(path, "a") as f:
+            f.write("\n")
+
+        ok = ok and watcher.check() == [path]
+        ok = ok and persistent_generation() == generation + 1
+
+        new = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, path)
+
+        ok = ok and new != old
+        ok = ok and is_persistent_alphabet(old) and is_persistent_alphabet(new)
+
+        # The old version is freed by its last user.
+        ok = ok and release_persistent_resource(old) is True
+        ok = ok and release_persistent_resource(new) is False
+
+        watcher.unwatch(UnitexConstants.RESOURCE_ALPHABET, path)
+        ok = ok and not is_persistent_alphabet(new)
+
+        self.assertTrue(ok, "Resource reloading failed!")
+
+    def test_11_deduplicated_alphabet(self):
+        path = self._arguments["alphabet"]
+
+        copy = self._arguments["alphabet-copy"]
+        shutil.copy(path, copy)
+
+        first = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, path)
+        second = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, copy)
+
+        ok = first == second
+
+        ok = ok and release_persistent_resource(second) is False
+        ok = ok and release_persistent_resource(first) is True
+
+        self.assertTrue(ok, "Alphabet deduplication failed!")
+
+    def test_12_persistent_stats(self):
+        path = self._arguments["alphabet"]
+
+        persistent = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, path)
+
+        kwargs = {}
+        kwargs["loop_check"] = False
+        kwargs["char_by_char"] = False
+        kwargs["pkgdir"] = None
+        kwargs["no_empty_graph_warning"] = False
+        kwargs["tfst_check"] = False
+        kwargs["silent_grf_name"] = False
+        kwargs["named_repositories"] = None
+        kwargs["debug"] = False
+        kwargs["check_variables"] = False
+
+        ret = grf2fst2(self._arguments["grf"], persistent, **kwargs)
+
+        stats = [s for s in persistent_stats() if s["persistent"] == persistent]
+
+        ok = ret and len(stats) == 1
+        ok = ok and stats[0]["bytes"] == os.path.getsize(path)
+        ok = ok and stats[0]["uses"] == 1 and stats[0]["users"] == 1
+
+        release_persistent_resource(persistent)
+
+        ok = ok and all(s["persistent"] != persistent for s in persistent_stats())
+
+        self.assertTrue(ok, "Persistent statistics failed!")
+
+    def test_13_modified_alphabet(self):
+        path = self._arguments["alphabet-reload"]
+        shutil.copy(self._arguments["alphabet"], path)
+
+        old = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, path)
+
+        with open(path, "a") as f:
+            f.write("\n")
+
+        # The new version is loaded next to the old one.
+        new = acquire_persistent_resource(UnitexConstants.RESOURCE_ALPHABET, path)
+
+        ok = new != old
+        ok = ok and is_persistent_alphabet(old) and is_persistent_alphabet(new)
+
+        ok = ok and release_persistent_resource(old) is True
+        ok = ok and is_persistent_alphabet(new)
+        ok = ok and release_persistent_resource(new) is True
+
+        self.assertTrue(ok, "Modified alphabet loading failed!")
+
 
 
 if __name__ == '__main__':
@@ -189,14 +189,67 @@ class TestUnitexIO(unittest.TestCase):
         uf = UnitexFile()
         uf.open(self._arguments["unitex_file_vfs"], "r")
         content = uf.read()
+        end = uf.read()
+        position = uf.tell()
         uf.close()
 
         ret = rm(self._arguments["unitex_file_vfs"])
 
         ok = original == content
+        ok = ok and end == ""
+        ok = ok and position == len(original.encode("utf-8"))
 
         self.assertTrue(ok, "UnitexFile VFS read failed!")
 
+    def test_11_01_03_unitex_file_readbuffer_vfs(self):
+        original = None
+        with open(self._arguments["file_source"], "r", encoding="utf-8") as rf:
+            original = rf.read()
+
+        ret = cp(self._arguments["file_source"], self._arguments["unitex_file_vfs"])
+
+        uf = UnitexFile()
+        uf.open(self._arguments["unitex_file_vfs"], "r")
+        buffer = uf.readbuffer()
+        content = buffer.tobytes().decode("utf-8")
+        buffer.release()
+        uf.close()
+
+        ret = rm(self._arguments["unitex_file_vfs"])
+
+        ok = original == content
+
+        self.assertTrue(ok, "UnitexFile VFS buffer read failed!")
+
+    def test_11_01_04_unitex_file_readline_vfs(self):
+        original = None
+        with open(self._arguments["file_source"], "r", encoding="utf-8") as rf:
+            original = rf.read()
+
+        ret = cp(self._arguments["file_source"], self._arguments["unitex_file_vfs"])
+
+        uf = UnitexFile()
+        uf.open(self._arguments["unitex_file_vfs"], "r")
+        lines = [line for line in uf]
+
+        uf.seek(0)
+        head = uf.read(10)
+        position = uf.tell()
+        tail = uf.read()
+
+        uf.seek(position)
+        again = uf.read()
+        uf.close()
+
+        ret = rm(self._arguments["unitex_file_vfs"])
+
+        ok = original == "".join(lines)
+        ok = ok and len(head) == 10
+        ok = ok and original == head + tail
+        ok = ok and tail == again
+
+        self.assertTrue(ok, "UnitexFile VFS chunked read failed!")
+
     def test_11_02_01_unitex_file_write_hdd(self):
         original = None
         with open(self._arguments["file_source"], "r", encoding="utf-8") as rf:
@@ -275,6 +328,66 @@ class TestUnitexIO(unittest.TestCase):
 
         self.assertTrue(ok, "UnitexFile VFS append failed!")
 
+    def test_11_04_01_unitex_file_buffered_write_vfs(self):
+        original = None
+        with open(self._arguments["file_source"], "r", encoding="utf-8") as rf:
+            original = rf.read()
+
+        lines = original.encode("utf-8").splitlines(True)
+
+        uf = UnitexFile()
+        uf.open(self._arguments["unitex_file_vfs"], "w", buffering=1024)
+        for line in lines:
+            uf.write(memoryview(line))
+        uf.close()
+
+        uf = UnitexFile()
+        uf.open(self._arguments["unitex_file_vfs"], "r")
+        content = uf.read()
+        uf.close()
+
+        ret = rm(self._arguments["unitex_file_vfs"])
+
+        ok = original == content
+
+        self.assertTrue(ok, "UnitexFile VFS buffered write failed!")
+
+    def test_12_exists_vfs(self):
+        ret = cp(self._arguments["file_source"], self._arguments["unitex_file_vfs"])
+
+        status = stat(self._arguments["unitex_file_vfs"])
+
+        ok = exists(self._arguments["unitex_file_vfs"])
+        ok = ok and status is not None and status["virtual"] is True
+        ok = ok and status["size"] == os.path.getsize(self._arguments["file_source"])
+
+        ret = rm(self._arguments["unitex_file_vfs"])
+
+        ok = ok and not exists(self._arguments["unitex_file_vfs"])
+        ok = ok and stat(self._arguments["unitex_file_vfs"]) is None
+
+        self.assertTrue(ok, "VFS file status failed!")
+
+    def test_13_bulk_vfs(self):
+        targets = ["%sbulk/corpus-%d.txt" % (self._arguments["vfs_root"], i) for i in range(3)]
+
+        ret = cp_many([(self._arguments["file_source"], target) for target in targets])
+
+        archive = export_files(targets)
+        removed = rm_prefix("%sbulk/" % self._arguments["vfs_root"])
+
+        ok = ret and removed == len(targets)
+        ok = ok and not any(exists(target) for target in targets)
+
+        restored = import_files(archive)
+
+        ok = ok and restored == len(targets)
+        ok = ok and all(exists(target) for target in targets)
+
+        rm_prefix("%sbulk/" % self._arguments["vfs_root"])
+
+        self.assertTrue(ok, "VFS bulk operations failed!")
+
 
 
 if __name__ == '__main__':
@@ -1,15 +1,21 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import shutil
+import tempfile
+import threading
 import unittest
 import yaml
 
-from unitex import UnitexConstants
+from unitex import UnitexConstants, UnitexException
+from unitex.cache import MatchCache, MemoryCacheBackend, PreprocessingCache, SQLiteCacheBackend
 from unitex.config import UnitexConfig
+from unitex.io import usage
+from unitex.resources import is_persistent_dictionary
 from unitex.tools import compress, grf2fst2
-from unitex.processor import UnitexProcessor
+from unitex.processor import RESOURCE_CACHES, UnitexProcessor
 
 
 
@@ -127,6 +133,348 @@ class TestUnitexIO(unittest.TestCase):
         processor.close(clean=True, free=True)
         self.assertTrue(ret, "Tagging process failed (xml format)!")
 
+    def test_03_processor_vfs_quota(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        # A one byte quota forces the processing on the disk.
+        options["global"]["vfs_quota"] = 1
+
+        config = UnitexConfig()
+        config.load(options)
+
+        processor = UnitexProcessor(config)
+        processor.open(self._arguments["txt"], mode="srtlf", tagged=False)
+
+        virtualized = processor.virtualized
+
+        kwargs = {}
+        kwargs["xml"] = False
+
+        ret = processor.tag(self._arguments["fst2"], self._arguments["tag"], **kwargs)
+
+        processor.close(clean=True, free=True)
+        self.assertTrue(ret and virtualized is False, "Tagging process failed (VFS quota)!")
+
+    def test_04_processor_iter(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        processor = UnitexProcessor(config)
+        processor.open(self._arguments["txt"], mode="srtlf", tagged=False)
+
+        matches = [match for match in processor.iter(self._arguments["fst2"])]
+
+        processor.close(clean=True, free=True)
+
+        ok = len(matches) > 0
+        ok = ok and all(len(match["offsets"]) == 2 for match in matches)
+
+        self.assertTrue(ok, "Match iteration failed!")
+
+    def test_05_processor_lazy_persistence(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        # Without lexicalization, the dictionaries are never persisted.
+        processor = UnitexProcessor(config)
+        processor.open(self._arguments["txt"], mode="srt", tagged=False)
+        processor.close(clean=True, free=False)
+
+        ok = not any(is_persistent_dictionary(d) for d in config["resources"]["dictionaries"] or [])
+
+        processor.preload()
+
+        kwargs = {}
+        kwargs["xml"] = False
+
+        processor.open(self._arguments["txt"], mode="srtl", tagged=False)
+        ok = ok and processor.tag(self._arguments["fst2"], self._arguments["tag"], **kwargs)
+        processor.close(clean=True, free=True)
+
+        self.assertTrue(ok, "Lazy persistence failed!")
+
+    def test_06_processor_open_text(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        text = None
+        with io.open(self._arguments["txt"], "r", encoding="utf-8") as f:
+            text = f.read()
+
+        processor = UnitexProcessor(config)
+
+        processor.open(self._arguments["txt"], mode="srtl", tagged=False)
+        expected = [match["offsets"] for match in processor.iter(self._arguments["fst2"])]
+        processor.close(clean=True, free=False)
+
+        processor.open_text(text, name="corpus", mode="srtl", tagged=False)
+        matches = [match["offsets"] for match in processor.iter(self._arguments["fst2"])]
+        processor.close(clean=True, free=True)
+
+        ok = len(matches) > 0 and matches == expected
+
+        self.assertTrue(ok, "In-memory text processing failed!")
+
+    def test_07_processor_sessions(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        results = {}
+
+        # Two processors working on the same file at the same time.
+        def run(key):
+            processor = UnitexProcessor(config)
+            with processor.session(self._arguments["txt"], mode="srtl") as p:
+                matches = [match["offsets"] for match in p.iter(self._arguments["fst2"])]
+                results[key] = (p.namespace, matches)
+            processor.close(clean=False, free=True)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ok = len(results) == 2
+        ok = ok and results[0][0] != results[1][0]
+        ok = ok and len(results[0][1]) > 0 and results[0][1] == results[1][1]
+
+        for namespace, matches in results.values():
+            ok = ok and usage("%s%s/" % (UnitexConstants.VFS_PREFIX, namespace))["files"] == 0
+
+        self.assertTrue(ok, "Session isolation failed!")
+
+    def test_08_processor_batch(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        texts = None
+        with io.open(self._arguments["txt"], "r", encoding="utf-8") as f:
+            texts = [line for line in f.read().split("\n") if line.strip()][:3]
+
+        processor = UnitexProcessor(config)
+
+        expected = []
+        for text in texts:
+            processor.open_text(text, mode="tl", tagged=False)
+            expected.append([match["offsets"] for match in processor.iter(self._arguments["fst2"])])
+            processor.close(clean=True, free=False)
+
+        processor.open_batch(texts, mode="tl", tagged=False)
+
+        matches = [[] for text in texts]
+        for match in processor.iter(self._arguments["fst2"]):
+            matches[match["document"]].append(match["offsets"])
+
+        processor.close(clean=True, free=True)
+
+        ok = any(len(m) > 0 for m in matches) and matches == expected
+
+        self.assertTrue(ok, "Batch processing failed!")
+
+    def test_09_processor_cache(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        cache = "%sunitex-cache" % UnitexConstants.VFS_PREFIX
+        options["global"]["cache"] = cache
+
+        config = UnitexConfig()
+        config.load(options)
+
+        processor = UnitexProcessor(config)
+
+        results = []
+        for i in range(2):
+            with processor.session(self._arguments["txt"], mode="srtl") as p:
+                results.append([match["offsets"] for match in p.iter(self._arguments["fst2"])])
+
+        entries = usage("%s/" % cache)["files"]
+
+        PreprocessingCache(cache).clear()
+        processor.close(clean=False, free=True)
+
+        ok = len(results[0]) > 0 and results[0] == results[1]
+        ok = ok and entries > 0 and usage("%s/" % cache)["files"] == 0
+
+        self.assertTrue(ok, "Preprocessing cache failed!")
+
+    def test_10_processor_match_cache(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        cache = MatchCache(MemoryCacheBackend(budget=1048576))
+        processor = UnitexProcessor(config, matches=cache)
+
+        results = []
+        for i in range(2):
+            with processor.session(self._arguments["txt"], mode="srtl") as p:
+                results.append(list(p.iter(self._arguments["fst2"])))
+
+        processor.close(clean=False, free=True)
+
+        stats = cache.stats()
+
+        ok = len(results[0]) > 0 and results[0] == results[1]
+        ok = ok and stats["hits"] == 1 and stats["misses"] == 1
+        ok = ok and stats["entries"] == 1 and stats["hit_rate"] == 0.5
+
+        self.assertTrue(ok, "Match cache failed!")
+
+    def test_11_processor_match_cache_sqlite(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        directory = tempfile.mkdtemp()
+
+        cache = MatchCache(SQLiteCacheBackend(os.path.join(directory, "matches.db")))
+        processor = UnitexProcessor(config, matches=cache)
+
+        kwargs = {}
+        kwargs["xml"] = False
+
+        outputs = []
+        for i in range(2):
+            with processor.session(self._arguments["txt"], mode="srtl") as p:
+                p.tag(self._arguments["fst2"], self._arguments["tag"], **kwargs)
+            with io.open(self._arguments["tag"], "r", encoding="utf-8") as f:
+                outputs.append(f.read())
+
+        processor.close(clean=False, free=True)
+
+        stats = cache.stats()
+        shutil.rmtree(directory)
+
+        ok = len(outputs[0]) > 0 and outputs[0] == outputs[1]
+        ok = ok and stats["hits"] == 1 and stats["misses"] == 1
+
+        self.assertTrue(ok, "Match cache (SQLite) failed!")
+
+    def test_12_processor_nested_iteration(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        processor = UnitexProcessor(config)
+        processor.open(self._arguments["txt"], mode="srtl", tagged=False)
+
+        kwargs = {}
+        kwargs["xml"] = False
+
+        ok = False
+        for match in processor.iter(self._arguments["fst2"]):
+            try:
+                processor.tag(self._arguments["fst2"], self._arguments["tag"], **kwargs)
+            except UnitexException:
+                ok = True
+            break
+
+        # The interrupted iteration doesn't block the next ones.
+        ok = ok and len(list(processor.iter(self._arguments["fst2"]))) > 0
+
+        processor.close(clean=True, free=True)
+
+        self.assertTrue(ok, "Nested iteration check failed!")
+
+    def test_13_processor_resource_budget(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        budget = 1099511627776
+
+        options["global"]["persistence"] = True
+        options["global"]["resource_budget"] = budget
+
+        config = UnitexConfig()
+        config.load(options)
+
+        processor = UnitexProcessor(config)
+
+        results = []
+        for i in range(2):
+            with processor.session(self._arguments["txt"], mode="srtl") as p:
+                results.append(list(p.iter(self._arguments["fst2"])))
+
+        # The resources are kept by the cache between the documents.
+        stats = RESOURCE_CACHES[budget].stats()
+
+        ok = len(results[0]) > 0 and results[0] == results[1]
+        ok = ok and stats["resources"] > 0 and stats["hits"] > 0
+        ok = ok and stats["bytes"] <= budget
+
+        processor.close(clean=False, free=True)
+        RESOURCE_CACHES[budget].clear()
+
+        ok = ok and RESOURCE_CACHES[budget].stats()["resources"] == 0
+
+        self.assertTrue(ok, "Resource budget failed!")
+
+    def test_14_processor_match_cache_tag_bytes(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        cache = MatchCache()
+        processor = UnitexProcessor(config, matches=cache)
+
+        kwargs = {}
+        kwargs["xml"] = False
+
+        # The first output is computed, the second restored from the cache.
+        outputs = []
+        for i in range(2):
+            with processor.session(self._arguments["txt"], mode="srtl") as p:
+                p.tag(self._arguments["fst2"], self._arguments["tag"], **kwargs)
+            with io.open(self._arguments["tag"], "rb") as f:
+                outputs.append(f.read())
+
+        processor.close(clean=False, free=True)
+
+        stats = cache.stats()
+
+        ok = len(outputs[0]) > 0 and outputs[0] == outputs[1]
+        ok = ok and stats["hits"] == 1 and stats["misses"] == 1
+
+        self.assertTrue(ok, "Match cache (tag bytes) failed!")
+
 
 
 if __name__ == '__main__':
@@ -98,5 +98,19 @@ class TestUnitexUtils(unittest.TestCase):
 
         self.assertTrue(good, "Dictionary (new format) lookup failed!")
 
+    def test_05_concord_index(self):
+        content = "#M\n0.0.0 1.0.0 <A>é</A>\n2.0.0 3.0.0\n4.0.0 5.1.0 <B>b</B>".encode("utf-8")
+
+        # One byte chunks: the lines and the UTF-8 sequences are split.
+        parser = ConcordIndexParser()
+        matches = list(parser.parse(content[i:i+1] for i in range(len(content))))
+
+        ok = len(matches) == 3
+        ok = ok and matches[0] == ("0.0.0", "1.0.0", "<A>é</A>")
+        ok = ok and matches[1] == ("2.0.0", "3.0.0", None)
+        ok = ok and matches[2] == ("4.0.0", "5.1.0", "<B>b</B>")
+
+        self.assertTrue(ok, "Concordance index parsing failed!")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import time
+import unittest
+import yaml
+
+from unitex import UnitexConstants
+from unitex.config import UnitexConfig
+from unitex.tools import compress, grf2fst2
+from unitex.pool import UnitexBatchProcessor, UnitexPool
+
+
+
+class Arguments:
+
+    def __init__(self, language=None):
+        self.__arguments = {}
+
+        self.__arguments["config"] = "data/unitex.yaml"
+
+        self.__arguments["dic"] = "data/dictionary.dic"
+        self.__arguments["bin"] = "data/dictionary.bin"
+        self.__arguments["inf"] = "data/dictionary.inf"
+
+        self.__arguments["alphabet"] = "data/Alphabet.txt"
+
+        self.__arguments["grf"] = "data/grammar.grf"
+        self.__arguments["fst2"] = "data/grammar.fst2"
+
+        self.__arguments["txt"] = "data/corpus.txt"
+        self.__arguments["copies"] = ["data/pool-corpus-%d.txt" % i for i in range(4)]
+
+    def __getitem__(self, key):
+        if key not in self.__arguments:
+            raise KeyError("Argument '%s' not found ..." % key)
+        return self.__arguments[key]
+
+
+
+def preprocess(processor, path):
+    processor.open(path, mode="srtl", tagged=False)
+    processor.close(clean=True, free=False)
+
+    return os.getpid()
+
+def die(processor):
+    os._exit(1)
+
+
+
+class TestUnitexPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        self._arguments = Arguments()
+
+        kwargs = {}
+        kwargs["output"] = None
+        kwargs["flip"] = False
+        kwargs["semitic"] = False
+        kwargs["version"] = UnitexConstants.DICTIONARY_VERSION_1
+
+        ret = compress(self._arguments["dic"], **kwargs)
+
+        kwargs = {}
+        kwargs["loop_check"] = False
+        kwargs["char_by_char"] = False
+        kwargs["pkgdir"] = None
+        kwargs["no_empty_graph_warning"] = False
+        kwargs["tfst_check"] = False
+        kwargs["silent_grf_name"] = False
+        kwargs["named_repositories"] = None
+        kwargs["debug"] = False
+        kwargs["check_variables"] = False
+
+        ret = grf2fst2(self._arguments["grf"], self._arguments["alphabet"], **kwargs)
+
+        for copy in self._arguments["copies"]:
+            shutil.copy(self._arguments["txt"], copy)
+
+    @classmethod
+    def tearDownClass(self):
+        if os.path.exists(self._arguments["bin"]):
+            os.remove(self._arguments["bin"])
+
+        if os.path.exists(self._arguments["inf"]):
+            os.remove(self._arguments["inf"])
+
+        if os.path.exists(self._arguments["fst2"]):
+            os.remove(self._arguments["fst2"])
+
+        for copy in self._arguments["copies"]:
+            if os.path.exists(copy):
+                os.remove(copy)
+
+    def test_01_pool_map(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        with UnitexPool(config, processes=2) as pool:
+            pids = pool.map(preprocess, self._arguments["copies"])
+
+        ok = len(pids) == len(self._arguments["copies"])
+        ok = ok and os.getpid() not in pids
+
+        self.assertTrue(ok, "Pool processing failed!")
+
+    def test_02_batch_iter(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        documents = list(self._arguments["copies"])
+        with open(self._arguments["txt"], "r") as f:
+            documents.append(("memory", f.read()))
+
+        with UnitexBatchProcessor(config, self._arguments["fst2"], processes=2, inflight=2) as batch:
+            results = list(batch.process(documents))
+            stats = batch.stats()
+
+        ok = [r["index"] for r in results] == list(range(len(documents)))
+        ok = ok and all(r["error"] is None for r in results)
+        ok = ok and all(len(r["matches"]) > 0 for r in results)
+        ok = ok and all(r["matches"] == results[0]["matches"] for r in results)
+        ok = ok and sum(s["documents"] for s in stats.values()) == len(documents)
+
+        self.assertTrue(ok, "Batch processing failed!")
+
+    def test_03_pool_lost_task(self):
+        options = None
+        with open(self._arguments["config"], "r") as f:
+            options = yaml.load(f)
+
+        config = UnitexConfig()
+        config.load(options)
+
+        with UnitexPool(config, processes=1) as pool:
+            task = pool.apply_async(die)
+
+            lost = []
+            for i in range(50):
+                lost = pool.lost()
+                if lost:
+                    break
+                time.sleep(0.1)
+
+            # The dead worker is replaced.
+            pid = pool.apply(preprocess, self._arguments["copies"][0])
+
+        ok = lost == [task]
+        ok = ok and task.ready() is False
+        ok = ok and pid != os.getpid()
+
+        self.assertTrue(ok, "Lost task detection failed!")
+
+
+
+if __name__ == '__main__':
+    unittest.main()
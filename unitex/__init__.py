@@ -3,9 +3,12 @@
 
 from __future__ import unicode_literals
 
+import codecs
 import logging
 import os
 import sys
+import threading
+import time
 
 import _unitex
 
@@ -126,6 +129,8 @@ def enable_stdout():
     ret = _unitex.unitex_enable_stdout()
     if ret is False:
         _LOGGER.error("Enabling standard output failed!")
+    else:
+        _redirect("stdout", None)
 
     return ret
 
@@ -145,6 +150,8 @@ def disable_stdout():
     ret = _unitex.unitex_disable_stdout()
     if ret is False:
         _LOGGER.error("Disabling standard output failed!")
+    else:
+        _redirect("stdout", None)
 
     return ret
 
@@ -163,6 +170,8 @@ def enable_stderr():
     ret = _unitex.unitex_enable_stderr()
     if ret is False:
         _LOGGER.error("Enabling error output failed!")
+    else:
+        _redirect("stderr", None)
 
     return ret
 
@@ -182,6 +191,183 @@ def disable_stderr():
     ret = _unitex.unitex_disable_stderr()
     if ret is False:
         _LOGGER.error("Disabling error output failed!")
+    else:
+        _redirect("stderr", None)
+
+    return ret
+
+
+
+class _OutputWriter(object):
+    """
+    Receives the raw Unitex output chunks and forwards complete lines to
+    a callable or a logger. Each thread has its own line buffer (the
+    tools write from the thread running them) and the number of lines
+    forwarded per second can be limited. The unterminated lines and the
+    number of dropped lines are flushed when a tool ends (cf.
+    '_flush_outputs') and when the redirection is removed.
+    """
+
+    def __init__(self, target, level, rate=None):
+        self.__target = target
+        self.__level = level
+
+        self.__rate = rate
+        self.__allowance = rate
+        self.__last = time.time()
+        self.__dropped = 0
+        self.__lock = threading.Lock()
+
+        # Line buffers (decoder and unterminated line) by thread.
+        self.__buffers = {}
+
+    def __allow(self):
+        if self.__rate is None:
+            return True, 0
+
+        with self.__lock:
+            now = time.time()
+            self.__allowance = min(self.__rate, self.__allowance + (now - self.__last) * self.__rate)
+            self.__last = now
+
+            if self.__allowance < 1:
+                self.__dropped += 1
+                return False, 0
+            self.__allowance -= 1
+
+            dropped, self.__dropped = self.__dropped, 0
+            return True, dropped
+
+    def __emit(self, line):
+        if isinstance(self.__target, logging.Logger):
+            self.__target.log(self.__level, line)
+        else:
+            self.__target(line)
+
+    def __call__(self, chunk):
+        ident = threading.current_thread().ident
+
+        with self.__lock:
+            buffer = self.__buffers.get(ident)
+            if buffer is None:
+                buffer = [codecs.getincrementaldecoder("utf-8")(errors="replace"), ""]
+                self.__buffers[ident] = buffer
+
+        lines = (buffer[1] + buffer[0].decode(chunk)).split("\n")
+        buffer[1] = lines.pop()
+
+        for line in lines:
+            allowed, dropped = self.__allow()
+            if allowed is False:
+                continue
+            if dropped != 0:
+                self.__emit("[%d lines dropped]" % dropped)
+            self.__emit(line.rstrip("\r"))
+
+    def flush(self, everything=False):
+        """
+        Forwards the dropped line count and the unterminated line of the
+        current thread (or of all the threads if 'everything' is True).
+        """
+        with self.__lock:
+            if everything is True:
+                buffers = list(self.__buffers.values())
+                self.__buffers.clear()
+            else:
+                buffer = self.__buffers.pop(threading.current_thread().ident, None)
+                buffers = [buffer] if buffer is not None else []
+
+            dropped, self.__dropped = self.__dropped, 0
+
+        if dropped != 0:
+            self.__emit("[%d lines dropped]" % dropped)
+
+        for decoder, pending in buffers:
+            line = pending + decoder.decode(b"", True)
+            if line:
+                self.__emit(line.rstrip("\r"))
+
+# The current output redirections (cf. 'redirect_stdout' and
+# 'redirect_stderr').
+_OUTPUTS = {"stdout": None, "stderr": None}
+
+def _redirect(output, writer):
+    previous, _OUTPUTS[output] = _OUTPUTS[output], writer
+    if previous is not None:
+        previous.flush(everything=True)
+
+def _flush_outputs():
+    """
+    This function flushes the redirected outputs written by the current
+    thread (cf. 'unitex.tools').
+    """
+    for writer in list(_OUTPUTS.values()):
+        if writer is not None:
+            writer.flush()
+
+
+
+def redirect_stdout(target, rate=None):
+    """
+    This function redirects the Unitex standard output to a Python
+    callable or a logger instead of the process standard output. The
+    output is forwarded line by line, from the thread running the
+    Unitex tool (i.e. a callable can use thread-local data to collect
+    the output of each document). Use 'enable_stdout' or
+    'disable_stdout' to remove the redirection.
+
+    *Arguments:*
+
+    - **target [callable|logging.Logger]** -- a callable receiving each
+      line (unicode string) or a logger (INFO level).
+
+    - **rate [int]** -- the maximum number of lines forwarded per
+      second. The exceeding lines are dropped and counted (default:
+      no limit).
+
+    *Return [bool]:*
+
+      **True** if it succeeds, **False** otherwise.
+    """
+    _LOGGER.info("Redirecting standard output...")
+    writer = _OutputWriter(target, logging.INFO, rate)
+
+    ret = _unitex.unitex_redirect_stdout(writer)
+    if ret is False:
+        _LOGGER.error("Redirecting standard output failed!")
+    else:
+        _redirect("stdout", writer)
+
+    return ret
+
+def redirect_stderr(target, rate=None):
+    """
+    This function redirects the Unitex error output to a Python callable
+    or a logger instead of the process error output (cf.
+    'redirect_stdout'). Use 'enable_stderr' or 'disable_stderr' to
+    remove the redirection.
+
+    *Arguments:*
+
+    - **target [callable|logging.Logger]** -- a callable receiving each
+      line (unicode string) or a logger (ERROR level).
+
+    - **rate [int]** -- the maximum number of lines forwarded per
+      second. The exceeding lines are dropped and counted (default:
+      no limit).
+
+    *Return [bool]:*
+
+      **True** if it succeeds, **False** otherwise.
+    """
+    _LOGGER.info("Redirecting error output...")
+    writer = _OutputWriter(target, logging.ERROR, rate)
+
+    ret = _unitex.unitex_redirect_stderr(writer)
+    if ret is False:
+        _LOGGER.error("Redirecting error output failed!")
+    else:
+        _redirect("stderr", writer)
 
     return ret
 
@@ -0,0 +1,410 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from unitex import *
+from unitex.io import UnitexFile, cp_many, exists, rm, rm_prefix
+
+_LOGGER = logging.getLogger(__name__)
+
+
+
+def text_key(text, resources, options):
+    """
+    This function computes the key of a preprocessed text (cf.
+    'PreprocessingCache' and 'MatchCache').
+
+    *Arguments:*
+
+    - **text [str]** -- the text file path (disk or virtual filesystem).
+
+    - **resources [list]** -- the fingerprint of the resources used by
+      the preprocessing (cf. 'unitex.resources.resource_fingerprint').
+
+    - **options [dict]** -- the preprocessing options (the stages and
+      the tools options). It must be JSON serializable.
+
+    *Return [str]:*
+
+      The key (SHA-1).
+    """
+    f = UnitexFile()
+    f.open(text, "b")
+    content = f.read()
+    f.close()
+
+    digest = hashlib.sha1()
+    digest.update(content)
+    digest.update(json.dumps([resources, options], sort_keys=True, default=str).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+
+class PreprocessingCache(object):
+    """
+    This class stores the preprocessed texts (i.e. the '.snt' file and
+    the content of the '*_snt' directory produced by the normalization,
+    segmentation, replacement, tokenization and lexicalization) in
+    order to restore them with a few file copies when the same text is
+    opened again (cf. the 'cache' global option of the configuration).
+
+    The entries are indexed by a key computed from the text content,
+    the resources and the preprocessing options (cf. 'text_key'). The cache
+    directory can be on the disk or on the virtual filesystem (e.g.
+    '$:unitex-cache'). The entries are never evicted (cf. 'clear').
+    """
+
+    # The preprocessing files of the '*_snt' directory.
+    FILES = ["tokens.txt", "text.cod", "enter.pos",
+             "tok_by_freq.txt", "tok_by_alph.txt", "stats.n",
+             "dlf", "dlf.n", "dlc", "dlc.n", "err", "err.n",
+             "tags_err", "tags_err.n", "tags.ind", "stat_dic.n"]
+
+    def __init__(self, directory):
+        """
+        *Argument:*
+
+        - **directory [str]** -- the cache directory (disk or virtual
+          filesystem).
+        """
+        self.__directory = directory
+
+        if self.__directory.startswith(UnitexConstants.VFS_PREFIX) is False:
+            if os.path.isdir(self.__directory) is False:
+                raise UnitexException("Cache directory '%s' doesn't exist..." % self.__directory)
+
+    def __path(self, key, name):
+        return os.path.join(self.__directory, "%s.%s" % (key, name))
+
+    def restore(self, key, snt, directory):
+        """
+        This function restores a preprocessed text.
+
+        *Arguments:*
+
+        - **key [str]** -- the cache key (cf. 'text_key').
+
+        - **snt [str]** -- the '.snt' file path to restore.
+
+        - **directory [str]** -- the '*_snt' directory path to restore
+          (with the virtual filesystem prefix if the text is
+          virtualized).
+
+        *Return [bool]:*
+
+          **True** if the text has been restored, **False** if it is not
+          in the cache.
+        """
+        # The marker is written last: the partial entries are ignored.
+        if exists(self.__path(key, "done")) is False:
+            return False
+
+        paths = [(self.__path(key, "snt"), snt)]
+        for name in self.FILES:
+            if exists(self.__path(key, name)) is True:
+                paths.append((self.__path(key, name), os.path.join(directory, name)))
+
+        if cp_many(paths) is False:
+            _LOGGER.warning("Unable to restore cache entry '%s'..." % key)
+            return False
+
+        _LOGGER.info("Preprocessing restored from cache entry '%s'." % key)
+        return True
+
+    def store(self, key, snt, directory):
+        """
+        This function stores a preprocessed text (cf. 'restore').
+
+        *Arguments:*
+
+        - **key [str]** -- the cache key (cf. 'text_key').
+
+        - **snt [str]** -- the '.snt' file path.
+
+        - **directory [str]** -- the '*_snt' directory path.
+
+        *Return [bool]:*
+
+          **True** if it succeeds, **False** otherwise.
+        """
+        paths = [(snt, self.__path(key, "snt"))]
+        for name in self.FILES:
+            path = os.path.join(directory, name)
+            if exists(path) is True:
+                paths.append((path, self.__path(key, name)))
+
+        if cp_many(paths) is False:
+            _LOGGER.warning("Unable to store cache entry '%s'..." % key)
+            return False
+
+        f = UnitexFile()
+        f.open(self.__path(key, "done"), "w")
+        f.write("")
+        f.close()
+
+        return True
+
+    def clear(self):
+        """
+        This function removes all the cache entries.
+
+        *No arguments.*
+
+        *No return.*
+        """
+        if self.__directory.startswith(UnitexConstants.VFS_PREFIX) is True:
+            rm_prefix(os.path.join(self.__directory, ""))
+            return
+
+        for name in os.listdir(self.__directory):
+            key, _, suffix = name.partition(".")
+            if len(key) == 40 and suffix in ["snt", "done"] + self.FILES:
+                rm(os.path.join(self.__directory, name))
+
+
+
+class MemoryCacheBackend(object):
+    """
+    This class stores the 'MatchCache' entries in memory. The least
+    recently used entries are evicted when the budget is exceeded.
+    """
+
+    def __init__(self, budget=None):
+        """
+        *Argument:*
+
+        - **budget [int]** -- the maximum size of the entries (in bytes).
+          If None (default), the entries are never evicted.
+        """
+        self.__budget = budget
+
+        self.__lock = threading.Lock()
+
+        self.__entries = collections.OrderedDict()
+        self.__size = 0
+
+    def get(self, key):
+        with self.__lock:
+            value = self.__entries.pop(key, None)
+            if value is not None:
+                self.__entries[key] = value
+            return value
+
+    def put(self, key, value):
+        with self.__lock:
+            previous = self.__entries.pop(key, None)
+            if previous is not None:
+                self.__size -= len(previous)
+
+            self.__entries[key] = value
+            self.__size += len(value)
+
+            evictions = 0
+            while self.__budget is not None and self.__size > self.__budget and len(self.__entries) > 1:
+                key, value = self.__entries.popitem(last=False)
+                self.__size -= len(value)
+                evictions += 1
+            return evictions
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def stats(self):
+        with self.__lock:
+            return {"entries": len(self.__entries), "bytes": self.__size}
+
+
+
+class SQLiteCacheBackend(object):
+    """
+    This class stores the 'MatchCache' entries in a local SQLite
+    database, which can be shared by several processes and kept between
+    two runs. The least recently used entries are evicted when the
+    budget is exceeded.
+    """
+
+    def __init__(self, path, budget=None):
+        """
+        *Arguments:*
+
+        - **path [str]** -- the database file path.
+
+        - **budget [int]** -- the maximum size of the entries (in bytes).
+          If None (default), the entries are never evicted.
+        """
+        self.__budget = budget
+
+        self.__lock = threading.Lock()
+
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__connection:
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS entries "
+                                      "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, used REAL)")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+
+    def get(self, key):
+        with self.__lock, self.__connection:
+            row = self.__connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.__connection.execute("UPDATE entries SET used = ? WHERE key = ?", (time.time(), key))
+            return bytes(row[0])
+
+    def put(self, key, value):
+        with self.__lock, self.__connection:
+            self.__connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                                      (key, sqlite3.Binary(value), len(value), time.time()))
+            if self.__budget is None:
+                return 0
+
+            evictions = 0
+            size = self.__connection.execute("SELECT TOTAL(size) FROM entries").fetchone()[0]
+            for old, length in self.__connection.execute("SELECT key, size FROM entries WHERE key != ? "
+                                                         "ORDER BY used", (key,)).fetchall():
+                if size <= self.__budget:
+                    break
+                self.__connection.execute("DELETE FROM entries WHERE key = ?", (old,))
+                size -= length
+                evictions += 1
+            return evictions
+
+    def clear(self):
+        with self.__lock, self.__connection:
+            self.__connection.execute("DELETE FROM entries")
+
+    def stats(self):
+        with self.__lock:
+            entries, size = self.__connection.execute("SELECT COUNT(*), TOTAL(size) FROM entries").fetchone()
+            return {"entries": entries, "bytes": int(size)}
+
+
+
+class MatchCache(object):
+    """
+    This class memoizes the grammar applications of the
+    'UnitexProcessor' ('iter' and 'tag' methods): when the same grammar
+    is applied again to the same preprocessed text with the same
+    options, the result is returned without running Unitex.
+
+    The entries are indexed by the text key (cf. 'text_key'), the
+    grammar and alphabet fingerprints and the locate options, and are
+    stored by a backend: 'MemoryCacheBackend' (default) or
+    'SQLiteCacheBackend' (any object with the same 'get', 'put',
+    'clear' and 'stats' methods can be used).
+    """
+
+    def __init__(self, backend=None):
+        """
+        *Argument:*
+
+        - **backend [object]** -- the entry storage (default: an
+          unbounded 'MemoryCacheBackend').
+        """
+        if backend is None:
+            backend = MemoryCacheBackend()
+        self.__backend = backend
+
+        self.__lock = threading.Lock()
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def key(self, *parts):
+        """
+        This function computes the key of a grammar application.
+
+        *Arguments:*
+
+          The key parts (text key, fingerprints and options). They must
+          be JSON serializable.
+
+        *Return [str]:*
+
+          The key (SHA-1).
+        """
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        This function returns a cached result.
+
+        *Argument:*
+
+        - **key [str]** -- the entry key (cf. 'key').
+
+        *Return [bytes]:*
+
+          The result or None if it's not in the cache.
+        """
+        value = self.__backend.get(key)
+
+        with self.__lock:
+            if value is None:
+                self.__misses += 1
+            else:
+                self.__hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        This function stores a result.
+
+        *Arguments:*
+
+        - **key [str]** -- the entry key (cf. 'key').
+
+        - **value [bytes]** -- the result.
+
+        *No return.*
+        """
+        evictions = self.__backend.put(key, value)
+
+        with self.__lock:
+            self.__evictions += evictions
+
+    def clear(self):
+        """
+        This function removes all the cache entries.
+
+        *No arguments.*
+
+        *No return.*
+        """
+        self.__backend.clear()
+
+    def stats(self):
+        """
+        This function returns the cache statistics.
+
+        *No arguments.*
+
+        *Return [dict]:*
+
+          The number of 'hits', 'misses' and 'evictions', the 'hit_rate'
+          and the number of 'entries' and their size ('bytes').
+        """
+        stats = self.__backend.stats()
+
+        with self.__lock:
+            stats["hits"] = self.__hits
+            stats["misses"] = self.__misses
+            stats["evictions"] = self.__evictions
+
+        requests = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = float(stats["hits"]) / requests if requests else 0.0
+
+        return stats
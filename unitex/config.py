@@ -687,6 +687,32 @@ class UnitexConfig(Options):
             raise UnitexException("Wrong value for the 'virtualization' global option. Boolean required.")
         self["virtualization"] = bool(virtualization)
 
+        resource_budget = options.get("resource_budget", None)
+        if resource_budget is not None and (isinstance(resource_budget, bool) or isinstance(resource_budget, int) is False or resource_budget <= 0):
+            raise UnitexException("Wrong value for the 'resource_budget' global option. Positive integer (bytes) required.")
+        self["resource_budget"] = resource_budget
+
+        vfs_quota = options.get("vfs_quota", None)
+        if vfs_quota is not None and (isinstance(vfs_quota, bool) or isinstance(vfs_quota, int) is False or vfs_quota <= 0):
+            raise UnitexException("Wrong value for the 'vfs_quota' global option. Positive integer (bytes) required.")
+        self["vfs_quota"] = vfs_quota
+
+        scratch = options.get("scratch", None)
+        if scratch is not None:
+            if isinstance(scratch, str) is False:
+                raise UnitexException("Wrong value for the 'scratch' global option. String required.")
+            if os.path.isdir(scratch) is False:
+                raise UnitexException("Scratch directory '%s' doesn't exist." % scratch)
+        self["scratch"] = scratch
+
+        cache = options.get("cache", None)
+        if cache is not None:
+            if isinstance(cache, str) is False:
+                raise UnitexException("Wrong value for the 'cache' global option. String required.")
+            if cache.startswith(UnitexConstants.VFS_PREFIX) is False and os.path.isdir(cache) is False:
+                raise UnitexException("Cache directory '%s' doesn't exist." % cache)
+        self["cache"] = cache
+
         self["resources"] = ResourcesOptions(settings.get("resources", {}))
 
         tools = settings.get("tools", {})
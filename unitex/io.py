@@ -3,9 +3,12 @@
 
 from __future__ import unicode_literals
 
+import codecs
 import logging
 import os
 
+from contextlib import contextmanager
+
 import _unitex
 
 from unitex import *
@@ -146,7 +149,184 @@ def exists(path):
     """
     if path.startswith(UnitexConstants.VFS_PREFIX) is False:
         return os.path.exists(path)
-    return path in ls(path)
+    return _unitex.unitex_exists(path)
+
+def stat(path):
+    """
+    This function returns the status of a file (on disk or virtual
+    filesystem).
+
+    *Argument:*
+
+    - **path [str]** -- file path
+
+    *Return [dict]:*
+
+      A dictionary with the keys 'size' (the file size in bytes) and
+      'virtual' (**True** if the file is stored in the virtual
+      filesystem) or **None** if the file doesn't exist.
+    """
+    if path.startswith(UnitexConstants.VFS_PREFIX) is False:
+        if os.path.isfile(path) is False:
+            return None
+        return {"size": os.path.getsize(path), "virtual": False}
+    return _unitex.unitex_stat(path)
+
+def usage(prefix=None):
+    """
+    This function computes the space used by the virtual files (e.g.
+    to monitor the memory used by the intermediate files when the
+    virtualization is activated).
+
+    *Argument:*
+
+    - **prefix [str]** -- virtual path prefix (default: the whole
+      virtual filesystem)
+
+    *Return [dict]:*
+
+      A dictionary with the keys 'files' (the number of files) and
+      'bytes' (their total size).
+    """
+    if prefix is None:
+        prefix = UnitexConstants.VFS_PREFIX
+    if prefix.startswith(UnitexConstants.VFS_PREFIX) is False:
+        raise UnitexException("Usage is only available on the virtual filesystem ('%s')..." % prefix)
+
+    return _unitex.unitex_usage(prefix)
+
+def rm_prefix(prefix):
+    """
+    This function removes, in a single call, all the virtual files
+    whose path starts with the given prefix (e.g. the '*_snt/'
+    directory of a processed text).
+
+    *Argument:*
+
+    - **prefix [str]** -- virtual path prefix
+
+    *Return [int]:*
+
+      The number of files removed.
+    """
+    if prefix.startswith(UnitexConstants.VFS_PREFIX) is False:
+        raise UnitexException("Prefix removal is only available on the virtual filesystem ('%s')..." % prefix)
+
+    _LOGGER.info("Removing files '%s*'..." % prefix)
+    return _unitex.unitex_rm_prefix(prefix)
+
+def cp_many(paths):
+    """
+    This function copies a list of files in a single call (cf. 'cp').
+
+    *Argument:*
+
+    - **paths [list(tuple(str, str))]** -- (source, target) file paths
+
+    *Return [bool]:*
+
+      **True** if all the copies succeed, **False** otherwise.
+    """
+    _LOGGER.info("Copying %d files..." % len(paths))
+    ret = _unitex.unitex_cp_many(paths)
+    if ret is False:
+        _LOGGER.info("[FAILED!]")
+
+    return ret
+
+def virtualize(directory, prefix=None):
+    """
+    This function copies all the files of a disk directory to the
+    virtual filesystem in a single call (e.g. to virtualize the
+    resources of a worker at startup).
+
+    *Arguments:*
+
+    - **directory [str]** -- disk directory path
+
+    - **prefix [str]** -- virtual directory (default:
+      '$:<directory>')
+
+    *Return [list(str)]:*
+
+      The virtual paths of the copied files.
+    """
+    if prefix is None:
+        prefix = "%s%s" % (UnitexConstants.VFS_PREFIX, directory)
+
+    paths = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) is False:
+            continue
+        paths.append((path, os.path.join(prefix, name)))
+
+    if cp_many(paths) is False:
+        raise UnitexException("Unable to virtualize directory '%s'..." % directory)
+
+    return [target for source, target in paths]
+
+@contextmanager
+def capture(path, callback):
+    """
+    This function (context manager) redirects an output file of the
+    Unitex tools to a Python callable: the file is not stored and the
+    callable receives the raw (UTF-8 bytes) chunks as soon as they are
+    written, from the thread running the tool. It avoids the store/read
+    round trip for the outputs consumed in Python (e.g. the
+    'concord.ind' file produced by 'locate').
+
+    **WARNING: the captured file can't be read back by the tools.**
+
+    *Arguments:*
+
+    - **path [str]** -- file path (exactly as used by the tool)
+
+    - **callback [callable]** -- function receiving the chunks
+
+    *Return [object]:*
+
+      The capture handle (the capture stops when the context exits).
+    """
+    _LOGGER.info("Capturing file '%s'..." % path)
+    handle = _unitex.unitex_capture_start(path, callback)
+    try:
+        yield handle
+    finally:
+        size = _unitex.unitex_capture_stop(handle)
+        _LOGGER.info("%d bytes captured from '%s'." % (size, path))
+
+def export_files(paths):
+    """
+    This function packs a list of files (disk or virtual filesystem)
+    into a single archive which can be restored with 'import_files'.
+
+    *Argument:*
+
+    - **paths [list(str)]** -- file paths
+
+    *Return [bytes]:*
+
+      The archive content.
+    """
+    _LOGGER.info("Exporting %d files..." % len(paths))
+    return _unitex.unitex_export_files(paths)
+
+def import_files(archive):
+    """
+    This function restores the files packed by 'export_files' to their
+    original paths.
+
+    *Argument:*
+
+    - **archive [bytes-like]** -- archive content
+
+    *Return [int]:*
+
+      The number of files restored.
+    """
+    _LOGGER.info("Importing archive...")
+    return _unitex.unitex_import_files(archive)
 
 
 
@@ -157,17 +337,34 @@ class UnitexFile(object):
     mainly useful to read files from virtual filesystem whithout having
     to copy them to the disk.
 
+    In read mode, the file is mapped by Unitex and read by chunks so
+    that large files (concordance indexes, text automata, ...) can be
+    processed with a bounded memory usage (cf. 'read', 'readline',
+    'seek', 'tell' and the line iteration).
+
     **WARNING: the encoding must be UTF-8 and the data Unicode
     strings.**
     """
 
+    CHUNK_SIZE = 65536
+
     def __init__(self):
         self.__use_bom = None
 
         self.__path = None
         self.__mode = None
 
-    def open(self, file, mode=None, use_bom=False):
+        self.__buffering = 0
+        self.__pending_writes = None
+        self.__written = False
+
+        self.__buffer = None
+        self.__position = 0
+        self.__decoder = None
+        self.__pending = None
+        self.__offset = 0
+
+    def open(self, file, mode=None, use_bom=False, buffering=0):
         """
         This function opens a file from the disk or from the virtual
         filesystem.
@@ -189,6 +386,13 @@ class UnitexFile(object):
         - **use_bom [int]** -- 1 to writes the UTF-8 bom ('w' mode only,
           0 otherwise.
 
+        - **buffering [int]** -- 'w' and 'a' modes only. If greater than
+          0, the written data are kept in memory and sent to Unitex by
+          blocks of (at least) 'buffering' bytes (cf. 'flush'). In 'w'
+          mode, the first block replaces the file content and the next
+          ones are appended. Otherwise (default), each 'write' call is
+          sent directly to Unitex.
+
         *No return.*
         """
 
@@ -202,16 +406,233 @@ class UnitexFile(object):
             mode = "r"
         self.__mode = mode
 
+        self.__buffering = buffering
+        self.__pending_writes = bytearray()
+        self.__written = False
+
+        self.__reset()
+
     def close(self):
         """
         This function close the opened file and reset all the internal
-        parameters.
+        parameters. The buffered data, if any, are written before.
         """
         if self.__path is None:
             raise UnitexException("There is no file to close...")
+
+        if self.__mode in ("w", "a") and self.__buffering > 0:
+            self.__flush()
+        self.__pending_writes = None
+        self.__unmap()
+
         self.__path = None
         self.__mode = None
 
+    def __iter__(self):
+        line = self.readline()
+        while line:
+            yield line
+            line = self.readline()
+
+    def __check_read(self):
+        if self.__path is None:
+            raise UnitexException("You must open a file before reading...")
+        if self.__mode not in ["r", "b"]:
+            raise UnitexException("File '%s' is opened in write/append mode..." % self.__path)
+
+    def __map(self):
+        if self.__buffer is None:
+            self.__buffer = memoryview(_unitex.unitex_read_buffer(self.__path))
+        return self.__buffer
+
+    def __unmap(self):
+        if self.__buffer is not None:
+            # Python 2 memoryviews can't be released explicitly.
+            if hasattr(self.__buffer, "release"):
+                self.__buffer.release()
+            self.__buffer = None
+        self.__reset()
+
+    def __reset(self, position=0):
+        self.__position = position
+        if self.__mode == "r":
+            self.__decoder = codecs.getincrementaldecoder("utf-8")()
+            self.__pending = ""
+        else:
+            self.__decoder = None
+            self.__pending = b""
+        self.__offset = 0
+
+    def __available(self):
+        return len(self.__pending) - self.__offset
+
+    def __fill(self):
+        """
+        Reads (and decodes in 'r' mode) the next chunk of the mapped
+        file. Returns False at the end of file.
+        """
+        # The whole file has been read (cf. 'read').
+        if self.__position is None:
+            return False
+
+        buffer = self.__map()
+        if self.__position >= len(buffer):
+            return False
+
+        chunk = buffer[self.__position:self.__position+self.CHUNK_SIZE].tobytes()
+        self.__position += len(chunk)
+
+        if self.__decoder is not None:
+            chunk = self.__decoder.decode(chunk, self.__position >= len(buffer))
+
+        self.__pending = self.__pending[self.__offset:] + chunk
+        self.__offset = 0
+
+        return True
+
+    def __consume(self, size):
+        data = self.__pending[self.__offset:self.__offset+size]
+        self.__offset += len(data)
+        return data
+
+    def read(self, size=-1):
+        """
+        This function reads data from the opened file. The file must be
+        opened in 'r' or 'b' mode.
+
+        *Argument:*
+
+        - **size [int]** -- the maximum number of characters ('r' mode)
+          or bytes ('b' mode) to read. If negative or omitted, the data
+          are read until the end of file.
+
+        *Return [unicode|bytes]:*
+
+          The data read are returned as a unicode string ('r' mode) or
+          as a byte string ('b' mode). An empty string is returned at
+          the end of file.
+        """
+        self.__check_read()
+
+        if size is None or size < 0:
+            # Whole file: Unitex decodes the mapped file directly.
+            if self.__mode == "r" and self.__buffer is None and self.__position == 0:
+                content = _unitex.unitex_read_file(self.__path)
+                # End of file: its size is only needed (and the file
+                # mapped) by 'tell' and 'seek'.
+                self.__reset(None)
+                return content
+
+            chunks = [self.__consume(self.__available())]
+            while self.__fill():
+                chunks.append(self.__consume(self.__available()))
+            return chunks[0][:0].join(chunks)
+
+        while self.__available() < size:
+            if self.__fill() is False:
+                break
+        return self.__consume(size)
+
+    def readline(self):
+        """
+        This function reads a line from the opened file. The file must
+        be opened in 'r' or 'b' mode.
+
+        *No arguments.*
+
+        *Return [unicode|bytes]:*
+
+          The line (including the trailing newline, if any). An empty
+          string is returned at the end of file.
+        """
+        self.__check_read()
+
+        newline = "\n" if self.__mode == "r" else b"\n"
+
+        start = self.__offset
+        while True:
+            index = self.__pending.find(newline, start)
+            if index != -1:
+                return self.__consume(index + 1 - self.__offset)
+
+            start = len(self.__pending)
+            offset = self.__offset
+            if self.__fill() is False:
+                return self.__consume(self.__available())
+            start -= offset
+
+    def tell(self):
+        """
+        This function returns the current position in the opened file.
+
+        *No arguments.*
+
+        *Return [int]:*
+
+          The position, as a number of bytes from the beginning of the
+          file (bom excluded).
+        """
+        self.__check_read()
+
+        if self.__position is None:
+            return len(self.__map())
+
+        pending = self.__pending[self.__offset:]
+        if self.__mode == "r":
+            pending = pending.encode("utf-8") + self.__decoder.getstate()[0]
+        return self.__position - len(pending)
+
+    def seek(self, offset, whence=0):
+        """
+        This function changes the current position in the opened file.
+
+        *Arguments:*
+
+        - **offset [int]** -- the position (in bytes, bom excluded).
+          In 'r' mode, the position must be the beginning of a
+          character (e.g. a value returned by 'tell').
+
+        - **whence [int]** -- 0: from the beginning of the file
+          (default); 1: from the current position; 2: from the end of
+          the file.
+
+        *Return [int]:*
+
+          The new position.
+        """
+        self.__check_read()
+
+        if whence == 1:
+            offset += self.tell()
+        elif whence == 2:
+            offset += len(self.__map())
+        elif whence != 0:
+            raise UnitexException("Wrong value for the 'whence' argument. 0, 1 or 2 required.")
+
+        position = max(0, min(offset, len(self.__map())))
+        self.__reset(position)
+
+        return position
+
+    def __flush(self):
+        # In 'w' mode, the first flush creates (or truncates) the file
+        # even if there is nothing to write.
+        if not self.__pending_writes and (self.__written or self.__mode == "a"):
+            return
+
+        data = bytes(self.__pending_writes)
+
+        if self.__mode == "w" and self.__written is False:
+            bom = 1 if self.__use_bom is True else 0
+            ret = _unitex.unitex_write_file(self.__path, data, bom)
+        else:
+            ret = _unitex.unitex_append_to_file(self.__path, data)
+        if ret is False:
+            raise UnitexException("Unable to write file '%s'..." % self.__path)
+
+        self.__pending_writes = bytearray()
+        self.__written = True
+
     def write(self, data):
         """
         This function writes/append data to the opened file. The file
@@ -219,7 +640,10 @@ class UnitexFile(object):
 
         *Arguments:*
 
-        - **data [unicode]** -- the content to write.
+        - **data [unicode|bytes-like]** -- the content to write. Any
+          object supporting the buffer protocol (bytes, bytearray,
+          memoryview, mmap...) is written as is and must be UTF-8
+          encoded.
 
         *No return.*
         """
@@ -228,29 +652,52 @@ class UnitexFile(object):
         if self.__mode not in ("w", "a"):
             raise UnitexException("File '%s' is opened in read mode..." % self.__path)
 
+        if self.__buffering > 0:
+            if isinstance(data, type("")):
+                data = data.encode("utf-8")
+            self.__pending_writes += data
+            if len(self.__pending_writes) >= self.__buffering:
+                self.__flush()
+            return
+
         if self.__mode == "w":
             bom = 1 if self.__use_bom is True else 0
             _unitex.unitex_write_file(self.__path, data, bom)
         else:
             _unitex.unitex_append_to_file(self.__path, data)
 
-    def read(self):
+    def flush(self):
         """
-        This function reads data from the opened file. The file must be
-        opened in 'r' mode.
+        This function writes the buffered data (cf. the 'buffering'
+        argument of 'open'). It has no effect on unbuffered files.
 
         *No arguments.*
 
-        *Return [unicode]:*
-
-          The data read are returned as a unicode string.
+        *No return.*
         """
         if self.__path is None:
-            raise UnitexException("You must open a file before reading...")
-        if self.__mode not in ["r", "b"]:
-            raise UnitexException("File '%s' is opened in write/append mode..." % self.__path)
+            raise UnitexException("You must open a file before writing...")
+        if self.__mode not in ("w", "a"):
+            raise UnitexException("File '%s' is opened in read mode..." % self.__path)
 
-        if self.__mode == "r":
-            return _unitex.unitex_read_file(self.__path)
-        elif self.__mode == "b":
-            return _unitex.unitex_read_binary_file(self.__path)
+        if self.__buffering > 0:
+            self.__flush()
+
+    def readbuffer(self):
+        """
+        This function gives access to the content of the opened file
+        without copying it: the returned view points directly to the
+        file mapped by Unitex (disk or virtual filesystem). The file
+        must be opened in 'r' or 'b' mode.
+
+        *No arguments.*
+
+        *Return [memoryview]:*
+
+          A read-only view of the raw (UTF-8) content, without the bom.
+          The file is unmapped as soon as the view is released (cf.
+          'memoryview.release') or garbage collected.
+        """
+        self.__check_read()
+
+        return memoryview(_unitex.unitex_read_buffer(self.__path))
@@ -0,0 +1,635 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, unicode_literals
+
+import itertools
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from unitex import *
+from unitex.processor import UnitexProcessor
+from unitex.resources import acquire_persistent_resource, release_persistent_resource
+
+_LOGGER = logging.getLogger(__name__)
+
+
+
+# The delay (in seconds) between two checks of the workers by the batch
+# processor when no result comes (cf. 'UnitexPool.lost').
+CHECK_INTERVAL = 5.0
+
+# Python 2 pools don't call any callback for the failed tasks.
+_ERROR_CALLBACK = sys.version_info >= (3,)
+
+# Processor of the current worker process and connection used to report
+# the started tasks to the parent (cf. '_initialize').
+_PROCESSOR = None
+_STARTED = None
+
+def _initialize(config, started):
+    global _PROCESSOR, _STARTED
+
+    _STARTED = started
+
+    # The resources persisted by the parent are inherited (the registry
+    # included): the worker processor acquires them without reloading.
+    _PROCESSOR = UnitexProcessor(config)
+    _PROCESSOR.preload()
+
+    _LOGGER.info("Worker %d ready." % os.getpid())
+
+def _run(task):
+    identifier, function, args = task
+    if identifier is not None:
+        # The parent knows which worker runs the task: if this worker
+        # dies, the task is reported as lost (cf. 'UnitexPool.lost').
+        _STARTED.send((identifier, os.getpid()))
+    return function(_PROCESSOR, *args)
+
+def _name(document):
+    if isinstance(document, tuple):
+        return document[0]
+    return os.path.splitext(os.path.basename(document))[0]
+
+def _process(processor, index, document, grammars, options):
+    """
+    This function processes a document of a batch (cf.
+    'UnitexBatchProcessor') in a worker.
+    """
+    result = {"index": index,
+              "document": None,
+              "pid": os.getpid(),
+              "matches": None,
+              "outputs": None,
+              "time": 0.0,
+              "error": None}
+
+    start = time.time()
+
+    kwargs = {}
+    kwargs["mode"] = options["mode"]
+    kwargs["tagged"] = options["tagged"]
+
+    name = _name(document)
+    if isinstance(document, tuple):
+        kwargs["name"], kwargs["text"] = document
+    else:
+        kwargs["path"] = document
+    result["document"] = name
+
+    try:
+        with processor.session(**kwargs):
+            if options["output"] is None:
+                result["matches"] = [list(processor.iter(g, **options["kwargs"])) for g in grammars]
+            else:
+                extension = "xml" if options["kwargs"].get("xml", False) is True else "txt"
+
+                result["outputs"] = []
+                for grammar, label in zip(grammars, options["labels"]):
+                    if label is None:
+                        output = os.path.join(options["output"], "%s.%s" % (name, extension))
+                    else:
+                        output = os.path.join(options["output"], "%s-%s.%s" % (name, label, extension))
+
+                    processor.tag(grammar, output, **options["kwargs"])
+                    result["outputs"].append(output)
+    except Exception as e:
+        result["error"] = "%s" % e
+
+    result["time"] = time.time() - start
+
+    if options["single"] is True:
+        result["matches"] = result["matches"][0] if result["matches"] else result["matches"]
+        result["outputs"] = result["outputs"][0] if result["outputs"] else result["outputs"]
+
+    return result
+
+
+
+class UnitexPool(object):
+    """
+    This class runs a set of worker processes sharing the persistent
+    resources of a parent process. The resources are persisted once,
+    in the current process, and the workers are forked: they inherit
+    the persistent space copy-on-write (i.e. the dictionaries are not
+    loaded again and their memory is shared between the workers).
+
+    Each worker owns a UnitexProcessor built from the configuration.
+    The tasks are functions receiving this processor as first argument
+    (they must be defined at module level). The workers which die are
+    replaced automatically, but the task they were running is lost: its
+    result never comes (cf. 'lost' to detect these tasks).
+
+    **WARNING: the workers are forked, this class is only available on
+    POSIX systems.**
+    """
+
+    def __init__(self, config, processes=None, maxtasksperchild=None):
+        """
+        *Arguments:*
+
+        - **config [UnitexConfig]** -- the processor configuration. The
+          persistence is required to share the resources.
+
+        - **processes [int]** -- the number of workers (default: the
+          number of CPUs).
+
+        - **maxtasksperchild [int]** -- the number of tasks a worker
+          completes before being replaced (default: no limit).
+        """
+        if not hasattr(os, "fork"):
+            raise UnitexException("Worker pools require 'fork' (POSIX systems only)...")
+        if config["persistence"] is False:
+            _LOGGER.warning("Persistence disabled: each worker will load its own resources...")
+
+        # The loading threads are stopped before forking (cf.
+        # 'preload_persistent_resources').
+        self.__processor = UnitexProcessor(config)
+        self.__processor.preload(wait=True)
+
+        try:
+            context = multiprocessing.get_context("fork")
+        except AttributeError:
+            # Python 2: the workers are always forked on POSIX systems.
+            context = multiprocessing
+
+        # The started tasks (cf. 'apply_async' and 'lost').
+        self.__lock = threading.Lock()
+        self.__tasks = {}
+        self.__counter = itertools.count()
+
+        self.__started, self.__writer = context.Pipe(False)
+
+        self.__pool = context.Pool(processes, _initialize, (config, self.__writer), maxtasksperchild)
+
+        self.__stopped = threading.Event()
+
+        self.__monitor = threading.Thread(target=self.__receive)
+        self.__monitor.daemon = True
+        self.__monitor.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def __receive(self):
+        # The reports are read continuously: the workers never block on
+        # a full pipe.
+        while self.__stopped.is_set() is False:
+            try:
+                if self.__started.poll(0.5) is False:
+                    continue
+                identifier, pid = self.__started.recv()
+            except (EOFError, IOError, OSError):
+                return
+
+            with self.__lock:
+                task = self.__tasks.get(identifier)
+                if task is not None:
+                    task["pid"] = pid
+
+    def __forget(self, identifier):
+        with self.__lock:
+            self.__tasks.pop(identifier, None)
+
+    def __stop(self):
+        self.__stopped.set()
+        self.__monitor.join()
+
+        self.__started.close()
+        self.__writer.close()
+
+    def apply(self, function, *args):
+        """
+        This function runs a task in a worker and waits for its result.
+
+        *Arguments:*
+
+        - **function [callable]** -- the task, called with the worker
+          processor followed by 'args'.
+
+        *Return [object]:*
+
+          The task result.
+        """
+        return self.__pool.apply(_run, ((None, function, args),))
+
+    def apply_async(self, function, *args, **kwargs):
+        """
+        This function runs a task in a worker without waiting for its
+        result.
+
+        *Arguments:*
+
+        - **function [callable]** -- the task, called with the worker
+          processor followed by 'args'.
+
+        *Keyword arguments:*
+
+        - **callback [callable]** -- called (in the parent process) with
+          the task result as soon as it is available.
+
+        - **error_callback [callable]** -- called (in the parent process)
+          with the exception if the task fails (Python 3 only, cf.
+          'lost').
+
+        *Return [multiprocessing.pool.AsyncResult]:*
+
+          The task result ('ready', 'wait' and 'get' methods).
+        """
+        callback = kwargs.get("callback")
+        error_callback = kwargs.get("error_callback")
+
+        identifier = next(self.__counter)
+
+        def done(value):
+            self.__forget(identifier)
+            if callback is not None:
+                callback(value)
+
+        def failed(error):
+            self.__forget(identifier)
+            if error_callback is not None:
+                error_callback(error)
+
+        callbacks = {"callback": done}
+        if _ERROR_CALLBACK is True:
+            callbacks["error_callback"] = failed
+
+        with self.__lock:
+            result = self.__pool.apply_async(_run, ((identifier, function, args),), **callbacks)
+            self.__tasks[identifier] = {"result": result, "pid": None}
+        return result
+
+    def lost(self, delay=1.0):
+        """
+        This function returns the tasks (cf. 'apply_async') which will
+        never complete: the tasks running in a worker which died (the
+        pool replaces the worker but not its task) and, with Python 2,
+        the failed tasks. The returned tasks are no more tracked.
+
+        *Argument:*
+
+        - **delay [float]** -- the time (in seconds) given to the result
+          of a task whose worker has exited before it is considered as
+          lost (the result is sent before the worker exits).
+
+        *Return [list(multiprocessing.pool.AsyncResult)]:*
+
+          The lost tasks.
+        """
+        alive = set(p.pid for p in multiprocessing.active_children())
+
+        with self.__lock:
+            tasks = list(self.__tasks.items())
+
+        lost = []
+        for identifier, task in tasks:
+            result = task["result"]
+            if result.ready() is False:
+                if task["pid"] is None or task["pid"] in alive:
+                    continue
+                result.wait(delay)
+
+            if result.ready() is True and result.successful() is True:
+                continue
+
+            self.__forget(identifier)
+            lost.append(result)
+        return lost
+
+    def map(self, function, iterable, chunksize=None):
+        """
+        This function runs a task for each item of 'iterable'.
+
+        *Arguments:*
+
+        - **function [callable]** -- the task, called with the worker
+          processor and an item.
+
+        - **iterable [iterable]** -- the task arguments (e.g. a list of
+          file paths).
+
+        - **chunksize [int]** -- the number of items sent at once to a
+          worker.
+
+        *Return [list]:*
+
+          The task results (in the input order).
+        """
+        return self.__pool.map(_run, [(None, function, (item,)) for item in iterable], chunksize)
+
+    def imap_unordered(self, function, iterable, chunksize=1):
+        """
+        This function runs a task for each item of 'iterable' and
+        yields the results as soon as they are available (cf. 'map').
+
+        *Return [iterator]:*
+
+          The task results (in completion order).
+        """
+        return self.__pool.imap_unordered(_run, ((None, function, (item,)) for item in iterable), chunksize)
+
+    def close(self):
+        """
+        This function waits for the pending tasks, stops the workers and
+        releases the persistent resources.
+
+        *No arguments.*
+
+        *No return.*
+        """
+        self.__pool.close()
+        self.__pool.join()
+        self.__stop()
+
+        self.__processor.close(clean=False, free=True)
+
+    def terminate(self):
+        """
+        This function stops the workers immediately (pending tasks are
+        lost) and releases the persistent resources.
+
+        *No arguments.*
+
+        *No return.*
+        """
+        self.__pool.terminate()
+        self.__pool.join()
+        self.__stop()
+
+        self.__processor.close(clean=False, free=True)
+
+
+
+class UnitexBatchProcessor(object):
+    """
+    This class applies one or several grammars to a stream of documents
+    with a pool of worker processes (cf. 'UnitexPool'). Each worker
+    keeps its UnitexProcessor (and the persisted resources) between the
+    documents, which removes most of the per-document overhead on small
+    texts.
+
+    The documents are either file paths or (name, text) tuples for
+    in-memory texts (cf. 'UnitexProcessor.open_text'). For each
+    document, the grammar matches (cf. 'UnitexProcessor.iter') or the
+    tagged files (cf. 'UnitexProcessor.tag') are returned.
+    """
+
+    def __init__(self, config, grammars, processes=None, inflight=None, ordered=True,
+                 mode="srtl", tagged=False, output=None, **kwargs):
+        """
+        *Arguments:*
+
+        - **config [UnitexConfig]** -- the processor configuration.
+
+        - **grammars [str|list(str)]** -- the fst2 grammar(s) applied to
+          each document. The grammars are persisted once for all the
+          workers (if the persistence is activated).
+
+        - **processes [int]** -- the number of workers (default: the
+          number of CPUs).
+
+        - **inflight [int]** -- the maximum number of documents sent to
+          the workers and not yet returned (default: twice the number of
+          workers). It bounds the memory used by the pending documents
+          and results.
+
+        - **ordered [bool]** -- if True (default), the results are
+          returned in the input order. Otherwise, they are returned as
+          soon as they are available.
+
+        - **mode [str]** -- the pre-processing operations (cf.
+          'UnitexProcessor.open').
+
+        - **tagged [bool]** -- cf. 'UnitexProcessor.open'.
+
+        - **output [str]** -- if set, the documents are tagged in this
+          directory ('<name>.txt' or '<name>.xml', suffixed by the
+          grammar name if there are several grammars) instead of
+          returning the matches.
+
+        *Keyword arguments:*
+
+          The 'UnitexProcessor.iter' (or 'UnitexProcessor.tag') options
+          (e.g. 'match_mode', 'output_mode' or 'xml').
+        """
+        single = not isinstance(grammars, (list, tuple))
+        if single is True:
+            grammars = [grammars]
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if inflight is None:
+            inflight = 2 * processes
+        if inflight < 1:
+            raise UnitexException("The number of in-flight documents must be positive...")
+
+        self.__inflight = inflight
+        self.__ordered = ordered
+
+        # The grammars are persisted before the workers are forked.
+        self.__persisted = []
+        if config["persistence"] is True:
+            self.__persisted = [acquire_persistent_resource(UnitexConstants.RESOURCE_GRAMMAR, g) for g in grammars]
+
+        labels = [None] if single is True else [os.path.splitext(os.path.basename(g))[0] for g in grammars]
+
+        self.__grammars = self.__persisted or grammars
+        self.__options = {"mode": mode,
+                          "tagged": tagged,
+                          "output": output,
+                          "labels": labels,
+                          "single": single,
+                          "kwargs": kwargs}
+
+        self.__stats = {}
+
+        try:
+            self.__pool = UnitexPool(config, processes=processes)
+        except Exception:
+            self.__release()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def __release(self):
+        persisted, self.__persisted = self.__persisted, []
+        for grammar in persisted:
+            release_persistent_resource(grammar)
+
+    def __account(self, result):
+        stats = self.__stats.setdefault(result["pid"], {"documents": 0, "errors": 0, "time": 0.0})
+
+        stats["documents"] += 1
+        stats["time"] += result["time"]
+        if result["error"] is not None:
+            stats["errors"] += 1
+
+    def __failure(self, index, document, error):
+        return {"index": index,
+                "document": _name(document),
+                "pid": None,
+                "matches": None,
+                "outputs": None,
+                "time": 0.0,
+                "error": "%s" % error}
+
+    def process(self, documents):
+        """
+        This function processes a set of documents.
+
+        *Arguments:*
+
+        - **documents [iterable]** -- the documents: file paths or
+          (name, text) tuples. The iterable is consumed lazily (at most
+          'inflight' documents are pending).
+
+        *Return [iterator(dict)]:*
+
+          The document results:
+
+          - **index [int]** -- the document position in 'documents';
+          - **document [str]** -- the document name;
+          - **pid [int]** -- the worker process identifier;
+          - **matches [list]** -- the grammar matches (one list per
+            grammar if several grammars are applied);
+          - **outputs [str|list(str)]** -- the tagged files (if 'output'
+            is set);
+          - **time [float]** -- the processing duration (in seconds);
+          - **error [str]** -- the error message if the processing
+            failed (including the documents lost by a worker which
+            died), None otherwise.
+        """
+        results = queue.Queue()
+        tasks = {}
+
+        documents = iter(documents)
+        exhausted = False
+
+        submitted = 0
+        pending = 0
+
+        buffered = {}
+        expected = 0
+
+        while True:
+            while exhausted is False and pending < self.__inflight:
+                try:
+                    document = next(documents)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                def failed(error, index=submitted, document=document):
+                    results.put(self.__failure(index, document, error))
+
+                task = self.__pool.apply_async(_process, submitted, document, self.__grammars, self.__options,
+                                               callback=results.put, error_callback=failed)
+                tasks[submitted] = (task, document)
+
+                submitted += 1
+                pending += 1
+
+            if pending == 0:
+                break
+
+            try:
+                result = results.get(timeout=CHECK_INTERVAL)
+            except queue.Empty:
+                # The documents of the dead workers never come back.
+                lost = self.__pool.lost()
+                for index, (task, document) in list(tasks.items()):
+                    if task not in lost:
+                        continue
+
+                    error = "worker died"
+                    if task.ready() is True:
+                        # Python 2: the task failed without callback.
+                        try:
+                            task.get()
+                        except Exception as e:
+                            error = e
+                    results.put(self.__failure(index, document, error))
+                continue
+
+            # A document can't be returned twice (e.g. reported as lost
+            # and completed afterwards).
+            if tasks.pop(result["index"], None) is None:
+                continue
+
+            self.__account(result)
+
+            if self.__ordered is False:
+                pending -= 1
+                yield result
+                continue
+
+            # The results received in advance are kept (and still count
+            # as in-flight documents) until their turn comes.
+            buffered[result["index"]] = result
+            while expected in buffered:
+                pending -= 1
+                expected += 1
+                yield buffered.pop(expected - 1)
+
+    def stats(self):
+        """
+        This function returns the statistics of the workers.
+
+        *No arguments.*
+
+        *Return [dict]:*
+
+          The statistics indexed by worker process identifier (None for
+          the documents which failed outside of a worker, cf. 'process'):
+          the number of processed 'documents', the number of 'errors' and
+          the total processing 'time' (in seconds).
+        """
+        return dict((pid, dict(stats)) for pid, stats in self.__stats.items())
+
+    def close(self):
+        """
+        This function waits for the pending documents, stops the workers
+        and releases the persistent resources.
+
+        *No arguments.*
+
+        *No return.*
+        """
+        self.__pool.close()
+        self.__release()
+
+    def terminate(self):
+        """
+        This function stops the workers immediately and releases the
+        persistent resources.
+
+        *No arguments.*
+
+        *No return.*
+        """
+        self.__pool.terminate()
+        self.__release()
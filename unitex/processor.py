@@ -3,20 +3,37 @@
 
 from __future__ import absolute_import, unicode_literals
 
+import array
+import bisect
+import codecs
+import collections
+import itertools
+import json
 import logging
 import os
 import re
+import shutil
+import tempfile
+import threading
+
+from contextlib import contextmanager
 
 # Compatibility Python 2/3
 from io import open
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 from xml.sax.saxutils import escape
 
 from unitex import *
+from unitex.cache import PreprocessingCache, text_key
 from unitex.io import *
 from unitex.resources import *
 from unitex.tools import *
-from unitex.utils.formats import TextFST
+from unitex.utils.formats import ConcordIndexParser, TextFST
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,104 +49,291 @@ def escape(sequence):
 
 
 
+RESOURCE_TYPES = collections.OrderedDict()
+RESOURCE_TYPES["alphabet"] = UnitexConstants.RESOURCE_ALPHABET
+RESOURCE_TYPES["alphabet-sorted"] = UnitexConstants.RESOURCE_ALPHABET
+RESOURCE_TYPES["sentence"] = UnitexConstants.RESOURCE_GRAMMAR
+RESOURCE_TYPES["replace"] = UnitexConstants.RESOURCE_GRAMMAR
+RESOURCE_TYPES["dictionaries"] = UnitexConstants.RESOURCE_DICTIONARY
+
+# Each virtualized document is processed in its own namespace (i.e. a
+# unique virtual directory, cf. 'UnitexProcessor.namespace'): documents
+# with the same name never share their files.
+SESSION_DIRECTORY = "unitex-session"
+SESSION_COUNTER = itertools.count()
+
+# The virtual filesystem usage (cf. 'unitex.io.usage', which lists all
+# the virtual files) is measured at most once every QUOTA_SAMPLING quota
+# checks (cf. the 'vfs_quota' global option). In between, the size of
+# the documents opened since the last measure is added to it.
+QUOTA_SAMPLING = 16
+
+_QUOTA_LOCK = threading.Lock()
+_QUOTA_USAGE = {"bytes": 0, "checks": None}
+
+# The processors with a resource budget (cf. the 'resource_budget'
+# global option) share a resource cache per budget.
+RESOURCE_CACHES = {}
+RESOURCE_CACHES_LOCK = threading.Lock()
+
+# Maximum number of index chunks (cf. 'UnitexFile.CHUNK_SIZE') waiting
+# to be parsed by 'UnitexProcessor.iter': Locate is paused when the
+# matches are consumed slower than they are produced.
+CAPTURE_QUEUE_SIZE = 64
+
+# The documents of a batch (cf. 'UnitexProcessor.open_batch') are joined
+# by this Unitex reserved tag, which can't be matched by any grammar.
+BATCH_SEPARATOR = "{STOP}"
+
+
+
 class UnitexProcessor(object):
     """
     This class hides most of the Unitex (pre-)processing in order to
     facilitate his usage.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, matches=None):
+        """
+        *Arguments:*
+
+        - **config [UnitexConfig]** -- the processor configuration.
+
+        - **matches [MatchCache]** -- if set, the results of 'iter' and
+          'tag' are memoized in this cache (cf. 'unitex.cache').
+        """
         self.__config = config
 
-        self.__persisted_objects = None
+        # Persistent paths of the resources already used (cf. '_resource').
+        self.__persisted_objects = {}
+        self.__generation = persistent_generation()
+        self.__lock = threading.Lock()
+
+        # The resources are acquired through a shared cache if they have
+        # a memory budget (cf. '_resource').
+        self.__resources = None
+
+        budget = self.__config["resource_budget"]
+        if self.__config["persistence"] is True and budget is not None:
+            with RESOURCE_CACHES_LOCK:
+                if budget not in RESOURCE_CACHES:
+                    RESOURCE_CACHES[budget] = ResourceCache(budget)
+                self.__resources = RESOURCE_CACHES[budget]
 
         self.__txt = None
         self.__snt = None
         self.__dir = None
 
+        self.__virtualized = False
+        self.__namespace = None
+        self.__scratch = None
+
+        # Token positions of the batch separators (cf. 'open_batch').
+        self.__batch = None
+
+        self.__cache = None
+        if self.__config["cache"] is not None:
+            self.__cache = PreprocessingCache(self.__config["cache"])
+
+        # Key of the opened (preprocessed) text (cf. 'text_key').
+        self.__key = None
+        self.__matches = matches
+
+        # Locate always writes the same index ('concord.ind'), which is
+        # captured during an iteration (cf. '_iter').
+        self.__iterating = False
+
         verbose = self.__config["verbose"]
         debug = self.__config["debug"]
         log = self.__config["log"]
 
         init_log_system(verbose, debug, log)
 
-        self._load()
-
     def __del__(self):
         self._free()
 
-    def _load(self):
-        if self.__config["persistence"] is False:
-            return
-        self.__persisted_objects = []
+    def _acquire(self, _type, path):
+        if self.__resources is not None:
+            return self.__resources.acquire(_type, path)
+        return acquire_persistent_resource(_type, path)
+
+    def _resource(self, name):
+        # If the persistence is activated, the resources are persisted
+        # the first time a stage needs them (cf. 'preload') and shared
+        # with the other processors (cf. 'acquire_persistent_resource').
+        # With a resource budget, they are kept by the shared cache
+        # after the document is closed, until they are evicted.
+        path = self.__config["resources"][name]
+        if path is None or self.__config["persistence"] is False:
+            return path
+
+        with self.__lock:
+            _object = self.__persisted_objects.get(name)
+        if _object is not None:
+            return _object
+
+        _type = RESOURCE_TYPES[name]
+        if name == "dictionaries":
+            # The dictionaries already acquired are released if one of
+            # them fails (nothing is registered).
+            _object = []
+            try:
+                for d in path:
+                    _object.append(self._acquire(_type, d))
+            except Exception:
+                for persistent in _object:
+                    release_persistent_resource(persistent)
+                raise
+        else:
+            _object = self._acquire(_type, path)
 
-        if self.__config["resources"]["alphabet"] is not None:
-            _type = UnitexConstants.RESOURCE_ALPHABET
-            _object = load_persistent_alphabet(self.__config["resources"]["alphabet"])
+        return self._register(name, _object)
 
-            self.__persisted_objects.append((_type, _object))
-            self.__config["resources"]["alphabet"] = _object
+    def _register(self, name, _object):
+        with self.__lock:
+            if name not in self.__persisted_objects:
+                self.__persisted_objects[name] = _object
+                return _object
+            # Already registered (e.g. by a background 'preload').
+            registered = self.__persisted_objects[name]
 
-        if self.__config["resources"]["alphabet-sorted"] is not None:
-            _type = UnitexConstants.RESOURCE_ALPHABET
-            _object = load_persistent_alphabet(self.__config["resources"]["alphabet-sorted"])
+        for persistent in (_object if name == "dictionaries" else [_object]):
+            release_persistent_resource(persistent)
+        return registered
 
-            self.__persisted_objects.append((_type, _object))
-            self.__config["resources"]["alphabet-sorted"] = _object
+    def _free(self):
+        with self.__lock:
+            persisted_objects, self.__persisted_objects = self.__persisted_objects, {}
 
-        if self.__config["resources"]["sentence"] is not None:
-            _type = UnitexConstants.RESOURCE_GRAMMAR
-            _object = load_persistent_fst2(self.__config["resources"]["sentence"])
+        for name, _object in persisted_objects.items():
+            if name == "dictionaries":
+                for d in _object:
+                    release_persistent_resource(d)
+            else:
+                release_persistent_resource(_object)
+
+    def _refresh(self):
+        # A resource has been reloaded (cf. 'ResourceWatcher'): the
+        # resources are acquired again (the unchanged ones are only
+        # shared once more) and the previous versions are released.
+        generation = persistent_generation()
+        if generation == self.__generation:
+            return
 
-            self.__persisted_objects.append((_type, _object))
-            self.__config["resources"]["sentence"] = _object
+        with self.__lock:
+            persisted_objects, self.__persisted_objects = self.__persisted_objects, {}
+            self.__generation = generation
 
-        if self.__config["resources"]["replace"] is not None:
-            _type = UnitexConstants.RESOURCE_GRAMMAR
-            _object = load_persistent_fst2(self.__config["resources"]["replace"])
+        for name in persisted_objects:
+            self._resource(name)
 
-            self.__persisted_objects.append((_type, _object))
-            self.__config["resources"]["replace"] = _object
+        for name, _object in persisted_objects.items():
+            for persistent in (_object if name == "dictionaries" else [_object]):
+                release_persistent_resource(persistent)
 
-        if self.__config["resources"]["dictionaries"] is not None:
-            _objects = []
+    def preload(self, wait=True, workers=None):
+        """
+        This function persists all the resources of the configuration
+        (if the persistence is activated). Otherwise, each resource is
+        persisted the first time it is needed (e.g. the dictionaries are
+        loaded by the first 'open' with the 'l' mode). This function
+        should be used to avoid latency peaks at the first processing.
 
-            _type = UnitexConstants.RESOURCE_DICTIONARY
-            for dictionary in self.__config["resources"]["dictionaries"]:
-                _object = load_persistent_dictionary(dictionary)
+        The resources are loaded in parallel (one thread per resource by
+        default).
 
-                self.__persisted_objects.append((_type, _object))
-                _objects.append(_object)
+        *Arguments:*
 
-            self.__config["resources"]["dictionaries"] = _objects
+        - **wait [bool]** -- if False, the function returns immediately
+          and the resources are loaded in background. The processor can
+          be used in the meantime (default: True).
 
-    def _free(self):
-        if self.__persisted_objects is None:
-            return
+        - **workers [int]** -- the number of loading threads.
 
-        for _type, _object in self.__persisted_objects:
-            if _type == UnitexConstants.RESOURCE_GRAMMAR:
-                free_persistent_fst2(_object)
-            elif _type == UnitexConstants.RESOURCE_DICTIONARY:
-                free_persistent_dictionary(_object)
-            elif _type == UnitexConstants.RESOURCE_ALPHABET:
-                free_persistent_alphabet(_object)
+        *Return [list(dict)|multiprocessing.pool.AsyncResult]:*
+
+          The loading reports (cf. 'preload_persistent_resources') or,
+          if 'wait' is False, the loading result ('ready', 'wait' and
+          'get' methods) giving access to them.
+        """
+        with self.__lock:
+            registered = set(self.__persisted_objects)
+
+        resources = []
+        if self.__config["persistence"] is True:
+            for name, _type in RESOURCE_TYPES.items():
+                path = self.__config["resources"][name]
+                if path is None or name in registered:
+                    continue
+                for p in (path if name == "dictionaries" else [path]):
+                    resources.append((name, _type, p))
+
+        def register(reports):
+            failed = [r for r in reports if r["error"] is not None]
+
+            objects = {}
+            for (name, _type, path), report in zip(resources, reports):
+                objects.setdefault(name, []).append(report["persistent"])
+
+            for name, _objects in objects.items():
+                if any(o is None for o in _objects):
+                    for o in _objects:
+                        if o is not None:
+                            release_persistent_resource(o)
+                    continue
+                self._register(name, _objects if name == "dictionaries" else _objects[0])
+
+            if failed:
+                _LOGGER.error("%d resource(s) not preloaded!" % len(failed))
+
+        result = preload_persistent_resources([(t, p) for n, t, p in resources],
+                                              workers=workers, callback=register, wait=wait,
+                                              acquire=self._acquire)
+        if wait is False:
+            return result
+
+        reports = result.get()
+
+        failed = [r for r in reports if r["error"] is not None]
+        if failed:
+            raise UnitexException("Resource preloading failed (%s)!" % ", ".join(r["path"] for r in failed))
+
+        return reports
 
     def _clean(self):
         if self.__txt is None:
             _LOGGER.error("Unable to clean processor. No file opened!")
             return
 
-        if self.__config["virtualization"] is True:
-            if self.__dir is not None:
-                for vf in ls("%s%s" % (UnitexConstants.VFS_PREFIX, self.__dir)):
-                    rm(vf)
-            rm(self.__snt)
-            rm(self.__txt)
+        if self.__virtualized is True:
+            rm_prefix("%s%s" % (UnitexConstants.VFS_PREFIX, os.path.join(self.__namespace, "")))
         else:
             rm(self.__snt)
+            rmdir(self.__dir)
+
+        if self.__scratch is not None:
+            shutil.rmtree(self.__scratch, ignore_errors=True)
+
+    def _session(self):
+        self.__namespace = "%s/%d-%d" % (SESSION_DIRECTORY, os.getpid(), next(SESSION_COUNTER))
+        return self.__namespace
 
-        rmdir(self.__dir)
+    def _overquota(self, size):
+        quota = self.__config["vfs_quota"]
+        if quota is None:
+            return False
+
+        with _QUOTA_LOCK:
+            if _QUOTA_USAGE["checks"] is None or _QUOTA_USAGE["checks"] >= QUOTA_SAMPLING:
+                _QUOTA_USAGE["bytes"] = usage()["bytes"]
+                _QUOTA_USAGE["checks"] = 0
+            _QUOTA_USAGE["checks"] += 1
+
+            if _QUOTA_USAGE["bytes"] + size > quota:
+                return True
+
+            _QUOTA_USAGE["bytes"] += size
+            return False
 
     def _normalize(self):
         kwargs = self.__config["tools"]["normalize"]
@@ -139,11 +343,11 @@ class UnitexProcessor(object):
             raise UnitexException("Text normalization failed!")
 
     def _segment(self):
-        grammar = self.__config["resources"]["sentence"]
+        grammar = self._resource("sentence")
         if grammar is None:
             raise UnitexException("Unable to segment text. No sentence grammar provided.")
 
-        alphabet = self.__config["resources"]["alphabet"]
+        alphabet = self._resource("alphabet")
         if alphabet is None:
             raise UnitexException("Unable to segment text. No alphabet file provided.")
 
@@ -157,11 +361,11 @@ class UnitexProcessor(object):
             raise UnitexException("Text segmentation failed!")
 
     def _replace(self):
-        grammar = self.__config["resources"]["replace"]
+        grammar = self._resource("replace")
         if grammar is None:
             raise UnitexException("Unable to normalize text. No replace grammar provided.")
 
-        alphabet = self.__config["resources"]["alphabet"]
+        alphabet = self._resource("alphabet")
         if alphabet is None:
             raise UnitexException("Unable to normalize text. No alphabet file provided.")
 
@@ -175,7 +379,7 @@ class UnitexProcessor(object):
             raise UnitexException("Text normalization failed!")
 
     def _tokenize(self):
-        alphabet = self.__config["resources"]["alphabet"]
+        alphabet = self._resource("alphabet")
         if alphabet is None:
             raise UnitexException("Unable to tokenize text. No alphabet file provided.")
 
@@ -186,11 +390,11 @@ class UnitexProcessor(object):
             raise UnitexException("Text tokenization failed!")
 
     def _lexicalize(self):
-        dictionaries = self.__config["resources"]["dictionaries"]
+        dictionaries = self._resource("dictionaries")
         if not dictionaries:
             raise UnitexException("Unable to lexicalize text. No dictionaries provided.")
 
-        alphabet = self.__config["resources"]["alphabet"]
+        alphabet = self._resource("alphabet")
         if alphabet is None:
             raise UnitexException("Unable to tokenize text. No alphabet file provided.")
 
@@ -200,8 +404,74 @@ class UnitexProcessor(object):
         if ret is False:
             raise UnitexException("Text lexicalization failed!")
 
-    def _locate(self, grammar, match_mode, output_mode):
-        alphabet = self.__config["resources"]["alphabet"]
+    def _index(self):
+        # Locate writes the index in the text directory, which it derives
+        # from the '.snt' path (extension removed, '_snt' and the path
+        # separator added). The path is built the same way: a capture
+        # (cf. 'iter') only catches this exact path.
+        base = self.__snt
+        for i in range(len(base) - 1, -1, -1):
+            if base[i] in "/\\":
+                break
+            if base[i] == ".":
+                base = base[:i]
+                break
+        return "%s_snt%sconcord.ind" % (base, os.sep)
+
+    def _separators(self):
+        tokens = os.path.join(self.__dir, "tokens.txt")
+        cod = os.path.join(self.__dir, "text.cod")
+        if self.__virtualized is True:
+            tokens = "%s%s" % (UnitexConstants.VFS_PREFIX, tokens)
+            cod = "%s%s" % (UnitexConstants.VFS_PREFIX, cod)
+
+        # The first line of 'tokens.txt' is the number of tokens, then
+        # the token of code i is on the line i+1.
+        code = None
+
+        f = UnitexFile()
+        f.open(tokens, "r")
+        f.readline()
+        for i, token in enumerate(f):
+            if token.rstrip("\r\n") == BATCH_SEPARATOR:
+                code = i
+                break
+        f.close()
+
+        if code is None:
+            return []
+
+        # 'text.cod' is the sequence of the token codes (int32).
+        f = UnitexFile()
+        f.open(cod, "b")
+        content = f.read()
+        f.close()
+
+        codes = array.array("i")
+        if hasattr(codes, "frombytes"):
+            codes.frombytes(content)
+        else:
+            codes.fromstring(content)
+
+        return [position for position, c in enumerate(codes) if c == code]
+
+    def _rebase(self, offset):
+        # Offsets are given in tokens, optionally followed by the offset
+        # in characters (e.g. '12.3.0'): only the token part is rebased.
+        token, sep, rest = offset.partition(".")
+        token = int(token)
+
+        document = bisect.bisect_left(self.__batch, token)
+        if document > 0:
+            token -= self.__batch[document-1] + 1
+
+        return document, "%d%s%s" % (token, sep, rest)
+
+    def _locate(self, grammar, match_mode, output_mode, captured=False):
+        if captured is False and self.__iterating is True:
+            raise UnitexException("Unable to locate pattern during an iteration (cf. 'iter')...")
+
+        alphabet = self._resource("alphabet")
         if alphabet is None:
             raise UnitexException("Unable to locate pattern. No alphabet file provided.")
 
@@ -236,16 +506,17 @@ class UnitexProcessor(object):
         if ret is False:
             raise UnitexException("Locate failed!")
 
-        index = os.path.join(self.__dir, "concord.ind")
-        if self.__config["virtualization"] is True:
-            index = "%s%s" % (UnitexConstants.VFS_PREFIX, index)
+        # The index is sent to the 'capture' callback (cf. 'iter').
+        index = self._index()
+        if captured is True:
+            return index
 
         if exists(index) is False:
             raise UnitexException("Locate failed! No index produced.")
         return index
 
     def _concord(self, index, merge=False, output=None):
-        alphabet = self.__config["resources"]["alphabet"]
+        alphabet = self._resource("alphabet")
         if alphabet is None:
             raise UnitexException("Unable to build concordance. No alphabet file provided.")
 
@@ -279,7 +550,7 @@ class UnitexProcessor(object):
             kwargs["only_matches"] = False
 
             result = os.path.join(self.__dir, "concord.txt")
-            if self.__config["virtualization"] is True:
+            if self.__virtualized is True:
                 result = "%s%s" % (UnitexConstants.VFS_PREFIX, result)
 
         ret = concord(index, alphabet, **kwargs)
@@ -290,6 +561,80 @@ class UnitexProcessor(object):
             raise UnitexException("Concord failed! No concordances produced.")
         return result
 
+    def _fingerprint(self, mode, tagged):
+        # The resources and the options of the stages actually applied.
+        names = ["alphabet"]
+        tools = ["normalize"]
+        if tagged is False and "s" in mode:
+            names.append("sentence")
+            tools.append("fst2txt")
+        if tagged is False and "r" in mode:
+            names.append("replace")
+            tools.append("fst2txt")
+        if "t" in mode:
+            tools.append("tokenize")
+        if "l" in mode:
+            names.append("dictionaries")
+            tools.append("dico")
+
+        resources = []
+        for name in names:
+            path = self.__config["resources"][name]
+            if path is None:
+                continue
+            for p in (path if name == "dictionaries" else [path]):
+                resources.append(resource_fingerprint(RESOURCE_TYPES[name], p))
+
+        options = {"mode": sorted(set(mode)), "tagged": tagged}
+        for tool in tools:
+            options[tool] = self.__config["tools"][tool]
+
+        return text_key(self.__txt, resources, options)
+
+    def _memo(self, operation, grammar, *options):
+        # The key of a grammar application (cf. 'MatchCache'), None if
+        # the results are not memoized.
+        if self.__matches is None or self.__key is None:
+            return None
+
+        alphabet = self._resource("alphabet")
+        if alphabet is not None:
+            alphabet = resource_fingerprint(UnitexConstants.RESOURCE_ALPHABET, alphabet)
+
+        grammar = resource_fingerprint(UnitexConstants.RESOURCE_GRAMMAR, grammar)
+
+        return self.__matches.key(operation, self.__key, alphabet, grammar, self.__config["tools"]["locate"], *options)
+
+    def _preprocess(self, mode, tagged):
+        key = None
+        if self.__cache is not None or self.__matches is not None:
+            key = self._fingerprint(mode, tagged)
+        self.__key = key
+
+        directory = self.__dir
+        if self.__virtualized is True:
+            directory = "%s%s" % (UnitexConstants.VFS_PREFIX, directory)
+
+        if self.__cache is not None:
+            if self.__cache.restore(key, self.__snt, directory) is True:
+                return
+
+        self._normalize()
+
+        if tagged is False:
+            if "s" in mode:
+                self._segment()
+            if "r" in mode:
+                self._replace()
+
+        if "t" in mode:
+            self._tokenize()
+        if "l" in mode:
+            self._lexicalize()
+
+        if self.__cache is not None:
+            self.__cache.store(key, self.__snt, directory)
+
     def open(self, path, mode="srtl", tagged=False):
         """
         This function opens the text in a Unitex way. It means that it
@@ -319,32 +664,143 @@ class UnitexProcessor(object):
         directory, filename = os.path.split(path)
         name, extension = os.path.splitext(filename)
 
+        self._refresh()
+
+        self.__virtualized = self.__config["virtualization"]
+        if self.__virtualized is True and self._overquota(os.path.getsize(path)) is True:
+            # The document is processed on the disk (cf. 'virtualized').
+            self.__virtualized = False
+
+            self.__scratch = tempfile.mkdtemp(prefix="unitex-", dir=self.__config["scratch"])
+            _LOGGER.warning("VFS quota reached, processing '%s' in '%s'..." % (path, self.__scratch))
+
+            directory = self.__scratch
+
+            cp(path, os.path.join(directory, filename))
+            path = os.path.join(directory, filename)
+
         self.__txt = path
-        self.__snt = os.path.join(directory, "%s.snt" % name)
-        self.__dir = os.path.join(directory, "%s_snt" % name)
 
-        if self.__config["virtualization"] is True:
-            txt = "%s%s" % (UnitexConstants.VFS_PREFIX, self.__txt)
+        if self.__virtualized is True:
+            directory = self._session()
+
+            txt = "%s%s" % (UnitexConstants.VFS_PREFIX, os.path.join(directory, filename))
             cp(self.__txt, txt)
 
             self.__txt = txt
+
+        self.__snt = os.path.join(directory, "%s.snt" % name)
+        self.__dir = os.path.join(directory, "%s_snt" % name)
+
+        if self.__virtualized is True:
             self.__snt = "%s%s" % (UnitexConstants.VFS_PREFIX, self.__snt)
+        elif os.path.exists(self.__dir) is False:
+            mkdir(self.__dir)
+
+        self._preprocess(mode, tagged)
+
+    def open_text(self, text, name=None, mode="srtl", tagged=False):
+        """
+        This function opens an in-memory text (cf. 'open'). If the
+        virtualization is activated, the text is written directly to the
+        document namespace (cf. 'namespace') and processed without any
+        disk access. Otherwise (or if the 'vfs_quota' is reached),
+        it is written to a temporary directory of the 'scratch'
+        directory.
+
+        *Arguments:*
+
+        - **text [unicode|bytes-like]** -- the input text (bytes-like
+          objects must be UTF-8 encoded).
+
+        - **name [str]** -- the document name used to build the file
+          names (default: 'text').
+
+        - **mode [str]** -- the pre-processing operations (cf. 'open').
 
-        if os.path.exists(self.__dir) is False:
+        - **tagged [bool]** -- this parameter specifies if the input text
+          is tagged or not (cf. 'open').
+
+        *No return.*
+        """
+        if name is None:
+            name = "text"
+
+        if isinstance(text, type("")):
+            text = text.encode("utf-8")
+
+        self._refresh()
+
+        self.__virtualized = self.__config["virtualization"]
+        if self.__virtualized is True and self._overquota(len(text)) is True:
+            self.__virtualized = False
+            _LOGGER.warning("VFS quota reached, processing '%s' on the disk..." % name)
+
+        if self.__virtualized is True:
+            directory = self._session()
+        else:
+            self.__scratch = tempfile.mkdtemp(prefix="unitex-", dir=self.__config["scratch"])
+            directory = self.__scratch
+
+        self.__txt = os.path.join(directory, "%s.txt" % name)
+        self.__snt = os.path.join(directory, "%s.snt" % name)
+        self.__dir = os.path.join(directory, "%s_snt" % name)
+
+        if self.__virtualized is True:
+            self.__txt = "%s%s" % (UnitexConstants.VFS_PREFIX, self.__txt)
+            self.__snt = "%s%s" % (UnitexConstants.VFS_PREFIX, self.__snt)
+        else:
             mkdir(self.__dir)
 
-        self._normalize()
+        f = UnitexFile()
+        f.open(self.__txt, mode="w")
+        f.write(text)
+        f.close()
 
-        if tagged is False:
-            if "s" in mode:
-                self._segment()
-            if "r" in mode:
-                self._replace()
+        self._preprocess(mode, tagged)
 
-        if "t" in mode:
-            self._tokenize()
-        if "l" in mode:
-            self._lexicalize()
+    def open_batch(self, texts, mode="srtl", tagged=False):
+        """
+        This function opens a batch of small in-memory texts (e.g.
+        sentences or short messages) as a single document, in order to
+        run the Unitex pipeline once for all of them. The texts are
+        joined by the '{STOP}' tag, which prevents the matches across
+        two texts, and the matches returned by 'iter' are split back to
+        each text: they get a 'document' key (the text index in
+        'texts') and their offsets are rebased to the beginning of the
+        text.
+
+        **WARNING: the texts must be tokenized (mode 't') and must not
+        contain the '{STOP}' tag. The sentence segmentation is applied
+        to the whole batch: a sentence tag may be inserted at the
+        boundary between two texts.**
+
+        *Arguments:*
+
+        - **texts [list(unicode)]** -- the input texts.
+
+        - **mode [str]** -- the pre-processing operations (cf. 'open').
+
+        - **tagged [bool]** -- this parameter specifies if the input texts
+          are tagged or not (cf. 'open').
+
+        *No return.*
+        """
+        if "t" not in mode:
+            raise UnitexException("Batches must be tokenized ('t' mode required)...")
+        if not texts:
+            raise UnitexException("Empty batch...")
+
+        texts = [t.decode("utf-8") if isinstance(t, bytes) else t for t in texts]
+        for text in texts:
+            if BATCH_SEPARATOR in text:
+                raise UnitexException("Batch texts can't contain the '%s' separator..." % BATCH_SEPARATOR)
+
+        self.open_text(BATCH_SEPARATOR.join(texts), name="batch", mode=mode, tagged=tagged)
+
+        self.__batch = self._separators()
+        if len(self.__batch) != len(texts) - 1:
+            raise UnitexException("Batch splitting failed (%d separators for %d texts)!" % (len(self.__batch), len(texts)))
 
     def close(self, clean=True, free=False):
         """
@@ -361,22 +817,92 @@ class UnitexProcessor(object):
           (default: **True**)
 
         - **free [bool]** -- if persistence is activated, by setting this
-          option to True, all the persisted resources will be freed
-          from memory. You should use this option when all your corpus
-          are processed. (default: **False**)
+          option to True, all the persisted resources will be released
+          (i.e. freed from memory if no other processor uses them).
+          You should use this option when all your corpus are
+          processed. (default: **False**) With a resource budget (cf.
+          the 'resource_budget' global option), the resources are
+          always released by the processor and kept by the shared
+          cache until they are evicted.
 
         *No return.*
         """
         if clean is True:
             self._clean()
 
-        if free is True:
+        if free is True or self.__resources is not None:
             self._free()
 
         self.__txt = None
         self.__snt = None
         self.__dir = None
 
+        self.__virtualized = False
+        self.__namespace = None
+        self.__scratch = None
+
+        self.__batch = None
+        self.__key = None
+
+    @contextmanager
+    def session(self, path=None, text=None, name=None, mode="srtl", tagged=False):
+        """
+        This function (context manager) opens a document, from a file
+        (cf. 'open') or from memory (cf. 'open_text'), and guarantees
+        that its files are removed when the context exits, even if the
+        processing fails.
+
+        *Arguments:*
+
+        - **path [str]** -- the input corpus file path.
+
+        - **text [unicode|bytes-like]** -- the input text (if no 'path'
+          is given).
+
+        - **name [str]** -- the document name ('text' only).
+
+        - **mode [str]** -- the pre-processing operations (cf. 'open').
+
+        - **tagged [bool]** -- this parameter specifies if the input text
+          is tagged or not (cf. 'open').
+
+        *Return [UnitexProcessor]:*
+
+          The processor itself, with the document opened.
+        """
+        if (path is None) == (text is None):
+            raise UnitexException("You must provide either a path or a text...")
+
+        try:
+            if path is not None:
+                self.open(path, mode=mode, tagged=tagged)
+            else:
+                self.open_text(text, name=name, mode=mode, tagged=tagged)
+            yield self
+        finally:
+            if self.__txt is not None:
+                self.close(clean=True, free=False)
+
+    @property
+    def namespace(self):
+        """
+        The virtual directory of the opened document. Each virtualized
+        document gets its own namespace, so that processors (or threads)
+        working on documents with the same name don't share any file.
+        It is **None** if the document is processed on the disk.
+        """
+        return self.__namespace
+
+    @property
+    def virtualized(self):
+        """
+        **True** if the opened text is processed on the virtual
+        filesystem. It may be **False** even if the virtualization is
+        activated: when the 'vfs_quota' global option is reached, the
+        text is processed on the disk (in the 'scratch' directory).
+        """
+        return self.__virtualized
+
     def tofst(self):
         """
         This function build the text automaton.
@@ -389,7 +915,7 @@ class UnitexProcessor(object):
         """
         kwargs = self.__config["tools"]["normalize"]
 
-        alphabet = self.__config["resources"]["alphabet"]
+        alphabet = self._resource("alphabet")
         if alphabet is None:
             raise UnitexException("Unable to segment text. No alphabet file provided.")
 
@@ -399,21 +925,21 @@ class UnitexProcessor(object):
 
         # To avoid the copy process, the UnitexFile must be modified!
 #        tfst = os.path.join(self.__dir, "text.tfst")
-#        if self.__config["virtualization"] is True:
+#        if self.__virtualized is True:
 #            _tfst = "%s%s" % (UnitexConstants.VFS_PREFIX, tfst)
 #            mv(_tfst, tfst)
 #
 #        tind = os.path.join(self.__dir, "text.tind")
-#        if self.__config["virtualization"] is True:
+#        if self.__virtualized is True:
 #            _tind = "%s%s" % (UnitexConstants.VFS_PREFIX, tind)
 #            mv(_tind, tind)
 
         tfst = os.path.join(self.__dir, "text.tfst")
-        if self.__config["virtualization"] is True:
+        if self.__virtualized is True:
             tfst = "%s%s" % (UnitexConstants.VFS_PREFIX, tfst)
 
         tind = os.path.join(self.__dir, "text.tind")
-        if self.__config["virtualization"] is True:
+        if self.__virtualized is True:
             tind = "%s%s" % (UnitexConstants.VFS_PREFIX, tind)
 
         fst = TextFST()
@@ -440,9 +966,11 @@ class UnitexProcessor(object):
           - UnitexConstants.OUTPUT_MODE_IGNORE
           - UnitexConstants.OUTPUT_MODE_REPLACE
 
-        *Return [iterator(str)]:*
+        *Return [iterator(dict)]:*
 
-          The function returns an iterator over the grammar matches.
+          The function returns an iterator over the grammar matches
+          ('offsets' and 'match' keys, plus 'document' for batches, cf.
+          'open_batch').
         """
         match_mode = kwargs.get("match_mode", UnitexConstants.MATCH_MODE_LONGEST)
         if match_mode not in (UnitexConstants.MATCH_MODE_LONGEST, UnitexConstants.MATCH_MODE_SHORTEST):
@@ -452,28 +980,108 @@ class UnitexProcessor(object):
         if output_mode not in (UnitexConstants.OUTPUT_MODE_MERGE, UnitexConstants.OUTPUT_MODE_IGNORE, UnitexConstants.OUTPUT_MODE_REPLACE):
             raise UnitexException("Invalid output mode '%s'...")
 
-        index = self._locate(grammar, match_mode, output_mode)
-
-        matches = UnitexFile()
-        matches.open(index, "r")
-        content = matches.read()
-        matches.close()
-
-        ind = re.compile(r"([^\s]+) ([^\s]+)(?: (.*))?")
-
-        lines = content.split("\n")
-        for line in lines[1:]:
-            line = line.rstrip()
-            if not line:
-                continue
+        key = self._memo("iter", grammar, match_mode, output_mode)
+        if key is None:
+            for match in self._iter(grammar, match_mode, output_mode):
+                yield match
+            return
 
-            match = ind.search(line)
+        cached = self.__matches.get(key)
+        if cached is not None:
+            for match in json.loads(cached.decode("utf-8")):
+                match["offsets"] = tuple(match["offsets"])
+                yield match
+            return
 
-            groups = match.groups()
-            if output_mode == UnitexConstants.OUTPUT_MODE_IGNORE:
-                yield {"offsets": (groups[0], groups[1]), "match": ""}
-            else:
-                yield {"offsets": (groups[0], groups[1]), "match": groups[2]}
+        # The matches are stored only if the iteration completes.
+        matches = []
+        for match in self._iter(grammar, match_mode, output_mode):
+            matches.append(match)
+            yield match
+
+        self.__matches.put(key, json.dumps(matches).encode("utf-8"))
+
+    def _iter(self, grammar, match_mode, output_mode):
+        # The captured index can't be shared: the grammars can't be
+        # applied (i.e. 'iter' or 'tag' without cached result) while the
+        # matches of another grammar are consumed.
+        if self.__iterating is True:
+            raise UnitexException("Nested iterations are not supported (cf. 'iter')...")
+        self.__iterating = True
+
+        # Locate runs in a thread and the index chunks are parsed as soon
+        # as they are written (the index is never stored). The queue is
+        # bounded, so the memory used doesn't depend on the number of
+        # matches: Locate waits for the consumer, which can't apply
+        # another grammar meanwhile (see above).
+        chunks = queue.Queue(CAPTURE_QUEUE_SIZE)
+        stopped = threading.Event()
+        errors = []
+
+        captured = [0]
+
+        def put(chunk):
+            captured[0] += len(chunk)
+            if stopped.is_set() is False:
+                chunks.put(chunk)
+
+        def run():
+            try:
+                index = self._index()
+                with capture(index, put):
+                    self._locate(grammar, match_mode, output_mode, captured=True)
+
+                # Locate always writes the index header: an empty capture
+                # means that the index has been written elsewhere.
+                if captured[0] == 0:
+                    raise UnitexException("Locate index not captured ('%s')..." % index)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                chunks.put(None)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+
+        ended = threading.Event()
+
+        def read():
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    ended.set()
+                    break
+                yield chunk
+
+        try:
+            parser = ConcordIndexParser()
+            for start, end, output in parser.parse(read()):
+                if output_mode == UnitexConstants.OUTPUT_MODE_IGNORE:
+                    result = {"offsets": (start, end), "match": ""}
+                else:
+                    result = {"offsets": (start, end), "match": output}
+
+                if self.__batch is not None:
+                    document, start = self._rebase(start)
+                    document, end = self._rebase(end)
+
+                    result["document"] = document
+                    result["offsets"] = (start, end)
+
+                yield result
+        finally:
+            # The iteration has been interrupted: the remaining chunks are
+            # dropped to let Locate finish.
+            if ended.is_set() is False:
+                stopped.set()
+                while chunks.get() is not None:
+                    pass
+            thread.join()
+
+            self.__iterating = False
+
+        if errors:
+            raise errors[0]
 
     def tag(self, grammar, output, **kwargs):
         """
@@ -506,6 +1114,35 @@ class UnitexProcessor(object):
                                UnitexConstants.OUTPUT_MODE_REPLACE):
             raise UnitexException("Wrong value for the 'output_mode' option. UnitexConstants.OUTPUT_MODE_X required.")
 
+        key = self._memo("tag", grammar, match_mode, output_mode, xml, grammar if xml is True else None)
+        if key is not None:
+            cached = self.__matches.get(key)
+            if cached is not None:
+                # The output is restored byte for byte (bom included).
+                bom = cached.startswith(codecs.BOM_UTF8)
+
+                f = UnitexFile()
+                f.open(output, "w", use_bom=bom)
+                f.write(cached[len(codecs.BOM_UTF8):] if bom is True else cached)
+                f.close()
+                return True
+
+        self._tag(grammar, output, xml, match_mode, output_mode)
+
+        if key is not None:
+            f = UnitexFile()
+            f.open(output, "b")
+            content = f.read()
+            f.close()
+
+            # The 'b' mode skips the bom, which is stored with the output.
+            if stat(output)["size"] != len(content):
+                content = codecs.BOM_UTF8 + content
+            self.__matches.put(key, content)
+
+        return True
+
+    def _tag(self, grammar, output, xml, match_mode, output_mode):
         index = self._locate(grammar, match_mode, output_mode)
 
         if xml is False:
@@ -515,7 +1152,7 @@ class UnitexProcessor(object):
             return True
 
         _output = os.path.join(self.__dir, "concord-merge-temp.txt")
-        if self.__config["virtualization"] is True:
+        if self.__virtualized is True:
             _output = "%s%s" % (UnitexConstants.VFS_PREFIX, _output)
 
         self._concord(index, merge=True, output=_output)
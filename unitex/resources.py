@@ -3,16 +3,78 @@
 
 from __future__ import unicode_literals
 
+import collections
+import hashlib
 import logging
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 
 import _unitex
 
 from unitex import *
+from unitex.io import cp, cp_many, exists, rm, stat
 
 _LOGGER = logging.getLogger(__name__)
 
 
 
+# Statistics of the resources loaded in persistent space, indexed by
+# persistent path (cf. 'persistent_stats'). The Unitex persistence API
+# doesn't expose the allocated memory: the resident size is estimated
+# from the size of the loaded files.
+_STATS_LOCK = threading.Lock()
+_STATS = {}
+
+def _sizeof(_type, path):
+    size = stat(path)["size"] if exists(path) else 0
+    if _type == UnitexConstants.RESOURCE_DICTIONARY:
+        inf = "%s.inf" % os.path.splitext(path)[0]
+        if exists(inf):
+            size += stat(inf)["size"]
+    return size
+
+def _load(_type, load, path):
+    start = time.time()
+    persistent = load(path)
+
+    stats = {"persistent": persistent,
+             "type": _type,
+             "path": path,
+             "bytes": _sizeof(_type, path),
+             "time": time.time() - start,
+             "uses": 0}
+
+    with _STATS_LOCK:
+        _STATS[persistent] = stats
+    return persistent
+
+def _unload(free, persistent):
+    with _STATS_LOCK:
+        _STATS.pop(persistent, None)
+    free(persistent)
+
+def _count_uses(command):
+    """
+    This function increments the usage counter of the persistent
+    resources given as arguments of a Unitex command (cf.
+    'unitex.tools').
+    """
+    with _STATS_LOCK:
+        if not _STATS:
+            return
+        for argument in command:
+            if argument.startswith("-"):
+                argument = argument.split("=", 1)[-1]
+            stats = _STATS.get(argument)
+            if stats is not None:
+                stats["uses"] += 1
+
+
+
 def load_persistent_dictionary(path):
     """
     This function loads a dictionary in persistent space.
@@ -29,7 +91,7 @@ def load_persistent_dictionary(path):
       the unitex tools and the 'free_persistent_dictionary' function.
     """
     _LOGGER.info("Load persistent dictionary '%s'..." % path)
-    return _unitex.unitex_load_persistent_dictionary(path)
+    return _load(UnitexConstants.RESOURCE_DICTIONARY, _unitex.unitex_load_persistent_dictionary, path)
 
 def is_persistent_dictionary(path):
     """
@@ -58,7 +120,7 @@ def free_persistent_dictionary(path):
     *No return.*
     """
     _LOGGER.info("Free persistent dictionary '%s'..." % path)
-    _unitex.unitex_free_persistent_dictionary(path)
+    _unload(_unitex.unitex_free_persistent_dictionary, path)
 
 
 
@@ -78,7 +140,7 @@ def load_persistent_fst2(path):
       the unitex tools and the 'free_persistent_fst2' function.
     """
     _LOGGER.info("Load persistent fst2 '%s'..." % path)
-    return _unitex.unitex_load_persistent_fst2(path)
+    return _load(UnitexConstants.RESOURCE_GRAMMAR, _unitex.unitex_load_persistent_fst2, path)
 
 def is_persistent_fst2(path):
     """
@@ -106,7 +168,7 @@ def free_persistent_fst2(path):
     *No return.*
     """
     _LOGGER.info("Free persistent fst2 '%s'..." % path)
-    _unitex.unitex_free_persistent_fst2(path)
+    _unload(_unitex.unitex_free_persistent_fst2, path)
 
 
 
@@ -126,7 +188,7 @@ def load_persistent_alphabet(path):
       the unitex tools and the 'free_persistent_alphabet' function.
     """
     _LOGGER.info("Load persistent alphabet '%s'..." % path)
-    return _unitex.unitex_load_persistent_alphabet(path)
+    return _load(UnitexConstants.RESOURCE_ALPHABET, _unitex.unitex_load_persistent_alphabet, path)
 
 def is_persistent_alphabet(path):
     """
@@ -155,4 +217,842 @@ def free_persistent_alphabet(path):
     *No return.*
     """
     _LOGGER.info("Free persistent alphabet '%s'..." % path)
-    _unitex.unitex_free_persistent_alphabet(path)
+    _unload(_unitex.unitex_free_persistent_alphabet, path)
+
+
+
+# The persistent resources are shared between all the users of the
+# process (processors, threads...): they are indexed by type and file
+# content (i.e. the same dictionary under different paths, symbolic
+# links or copies, is loaded once) and unloaded when the last user
+# releases them.
+_REGISTRY_LOCK = threading.Lock()
+_REGISTRY = {}
+_PERSISTED = {}
+
+# Content digests indexed by file identity (device, inode, size and
+# modification time): an unchanged file is hashed only once.
+_DIGESTS = {}
+
+# Hot reload (cf. 'ResourceWatcher'): the new version of a modified
+# resource is copied to a versioned virtual path and the following
+# acquisitions of the original path are redirected to this copy. The
+# generation is incremented at each reload.
+_REDIRECTS = {}
+_VERSIONED = {}
+_GENERATION = [0]
+
+# The versioned copies are named after the process and a counter (cf.
+# '_versioned_copy').
+_VERSION = [0]
+_RELOAD_DIRECTORY = "%sunitex-reload" % UnitexConstants.VFS_PREFIX
+
+_LOADERS = {
+    UnitexConstants.RESOURCE_DICTIONARY: (load_persistent_dictionary, free_persistent_dictionary),
+    UnitexConstants.RESOURCE_GRAMMAR: (load_persistent_fst2, free_persistent_fst2),
+    UnitexConstants.RESOURCE_ALPHABET: (load_persistent_alphabet, free_persistent_alphabet),
+}
+
+def _reset_registry():
+    """
+    This function resets the registry lock in a forked process and
+    drops the resources which were loading in another thread (these
+    threads don't exist anymore). The loaded resources are inherited
+    (cf. 'unitex.pool').
+    """
+    global _REGISTRY_LOCK, _STATS_LOCK
+
+    _REGISTRY_LOCK = threading.Lock()
+    _STATS_LOCK = threading.Lock()
+
+    for key, entry in list(_REGISTRY.items()):
+        if entry["ready"].is_set() is False:
+            del _REGISTRY[key]
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_registry)
+
+def _source(_type, path):
+    if path.startswith(UnitexConstants.VFS_PREFIX) is False:
+        path = os.path.abspath(path)
+    return (_type, path)
+
+def _digest(path):
+    status = os.stat(path)
+
+    key = (status.st_dev, status.st_ino, status.st_size, status.st_mtime)
+    with _REGISTRY_LOCK:
+        digest = _DIGESTS.get(key)
+    if digest is not None:
+        return digest
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1048576), b""):
+            digest.update(block)
+    digest = digest.hexdigest()
+
+    with _REGISTRY_LOCK:
+        _DIGESTS[key] = digest
+    return digest
+
+def _files(_type, path):
+    # A compressed dictionary is loaded with its '.inf' file.
+    files = [path]
+    if _type == UnitexConstants.RESOURCE_DICTIONARY:
+        inf = "%s.inf" % os.path.splitext(path)[0]
+        if exists(inf):
+            files.append(inf)
+    return files
+
+def _versioned_copy(_type, path):
+    """
+    This function copies the files of a resource to a new versioned
+    virtual directory. The Unitex persistent paths are derived from the
+    file names: the copy can be loaded next to the original version.
+    """
+    with _REGISTRY_LOCK:
+        _VERSION[0] += 1
+        version = _VERSION[0]
+    directory = "%s/%d-%d" % (_RELOAD_DIRECTORY, os.getpid(), version)
+
+    copies = [(f, "%s/%s" % (directory, os.path.basename(f))) for f in _files(_type, path)]
+    if cp_many(copies) is False:
+        raise UnitexException("Unable to copy resource '%s'..." % path)
+    return [target for source, target in copies]
+
+def _identity(_type, path):
+    if path.startswith(UnitexConstants.VFS_PREFIX):
+        return (_type, path)
+
+    try:
+        return (_type,) + tuple(_digest(f) for f in _files(_type, path))
+    except (IOError, OSError):
+        return (_type, os.path.abspath(path))
+
+def resource_fingerprint(_type, path):
+    """
+    This function identifies the content of a resource (e.g. to check
+    if a result computed with this resource is still valid).
+
+    *Arguments:*
+
+    - **_type [str]** -- the resource type (UnitexConstants.RESOURCE_X).
+
+    - **path [str]** -- the resource file path (or persistent path).
+
+    *Return [list(str)]:*
+
+      The fingerprint: the resource type followed by the SHA-1 of its
+      files (or the path of a virtual resource). The persistent paths
+      returned by 'acquire_persistent_resource' have the fingerprint
+      of their source file.
+    """
+    with _REGISTRY_LOCK:
+        key = _PERSISTED.get(path)
+    if key is not None:
+        return list(key)
+    return list(_identity(_type, path))
+
+def acquire_persistent_resource(_type, path):
+    """
+    This function loads a resource in persistent space, or gives access
+    to the already loaded copy, and increments its reference count.
+    Resources are shared by content (SHA-1 of the files): the same
+    resource under different paths (copies, symbolic links) is loaded
+    once. Since the persistent paths are derived from the file names, a
+    file modified while its previous version is still acquired is loaded
+    from a versioned virtual copy: both versions coexist until the last
+    user of the previous one releases it. The virtual files are
+    identified by path (a modified virtual file is not loaded again).
+
+    *Arguments:*
+
+    - **_type [str]** -- the resource type. Possible values are:
+
+      - UnitexConstants.RESOURCE_DICTIONARY;
+      - UnitexConstants.RESOURCE_GRAMMAR;
+      - UnitexConstants.RESOURCE_ALPHABET.
+
+    - **path [str]** -- the exisent file path in filespace (hard disk or
+      virtual file system).
+
+    *Return [str]:*
+
+      The persistent file path. This path must be used by the unitex
+      tools and the 'release_persistent_resource' function.
+    """
+    if _type not in _LOADERS:
+        raise UnitexException("Unknown resource type '%s'..." % _type)
+    load, free = _LOADERS[_type]
+
+    # The last reloaded version, if any (cf. 'ResourceWatcher').
+    path = _REDIRECTS.get(_source(_type, path), path)
+
+    source = _source(_type, path)
+    key = _identity(_type, path)
+
+    # The resources are loaded outside of the lock (the native loading
+    # releases the GIL): independent resources are loaded in parallel
+    # and the concurrent users of a loading resource wait for it.
+    with _REGISTRY_LOCK:
+        entry = _REGISTRY.get(key)
+
+        loader = entry is None
+        if loader is True:
+            # Another version of this file is loaded under the same
+            # persistent path: the new one is loaded from a copy.
+            versioned = any(source in e["sources"] for e in _REGISTRY.values())
+
+            entry = {"persistent": None, "users": 0, "ready": threading.Event(), "error": None,
+                     "sources": set()}
+            _REGISTRY[key] = entry
+        entry["sources"].add(source)
+        entry["users"] += 1
+
+    if loader is True:
+        copies = []
+        try:
+            if versioned is True:
+                copies = _versioned_copy(_type, path)
+                _LOGGER.info("Resource '%s' modified, loading a new version ('%s')..." % (path, copies[0]))
+
+            persistent = load(copies[0] if copies else path)
+
+            with _REGISTRY_LOCK:
+                if persistent in _PERSISTED:
+                    # Never overwrite (and later free) the persistent
+                    # path of another resource.
+                    raise UnitexException("Persistent path '%s' already used by another resource..." % persistent)
+
+                entry["persistent"] = persistent
+                _PERSISTED[persistent] = key
+                if copies:
+                    _VERSIONED[persistent] = copies
+        except Exception as e:
+            with _REGISTRY_LOCK:
+                del _REGISTRY[key]
+            entry["error"] = e
+            entry["ready"].set()
+
+            for f in copies:
+                rm(f)
+            raise
+
+        entry["ready"].set()
+    else:
+        entry["ready"].wait()
+        if entry["error"] is not None:
+            raise UnitexException("Loading resource '%s' failed (%s)..." % (path, entry["error"]))
+
+    _LOGGER.debug("Persistent resource '%s' acquired (%d users)." % (entry["persistent"], entry["users"]))
+    return entry["persistent"]
+
+def _retain(path):
+    """
+    This function increments the reference count of an already acquired
+    resource (cf. 'acquire_persistent_resource') without resolving its
+    source again: the caller gets exactly the same persistent path.
+    """
+    with _REGISTRY_LOCK:
+        key = _PERSISTED.get(path)
+        if key is None:
+            raise UnitexException("Resource '%s' is not registered..." % path)
+        _REGISTRY[key]["users"] += 1
+    return path
+
+def release_persistent_resource(path):
+    """
+    This function decrements the reference count of a resource acquired
+    with 'acquire_persistent_resource' and unloads it from persistent
+    space when it is no more used.
+
+    *Argument:*
+
+    - **path [str]** -- the persistent file path returned by the
+      'acquire_persistent_resource' function.
+
+    *Return [bool]:*
+
+      **True** if the resource has been unloaded, **False** otherwise.
+    """
+    with _REGISTRY_LOCK:
+        key = _PERSISTED.get(path)
+        if key is None:
+            raise UnitexException("Resource '%s' is not registered..." % path)
+
+        entry = _REGISTRY[key]
+        entry["users"] -= 1
+
+        _LOGGER.debug("Persistent resource '%s' released (%d users)." % (path, entry["users"]))
+        if entry["users"] > 0:
+            return False
+
+        del _REGISTRY[key]
+        del _PERSISTED[path]
+
+        versioned = _VERSIONED.pop(path, [])
+
+        load, free = _LOADERS[key[0]]
+        free(path)
+
+    # The versioned copy of a reloaded resource is no more needed.
+    for f in versioned:
+        rm(f)
+
+    return True
+
+def persistent_generation():
+    """
+    This function returns the number of resource reloads (cf.
+    'ResourceWatcher'). The users keeping persistent paths can compare
+    it to a previous value to know if they should acquire the resources
+    again.
+
+    *No arguments.*
+
+    *Return [int]:*
+
+      The reload generation.
+    """
+    return _GENERATION[0]
+
+def persistent_stats():
+    """
+    This function lists the resources loaded in persistent space (cf.
+    'load_persistent_X' and 'acquire_persistent_resource'). It can be
+    used to check the memory footprint of the resources and to find the
+    ones which are loaded but never used.
+
+    *No arguments.*
+
+    *Return [list(dict)]:*
+
+      The resource statistics (sorted by decreasing size):
+
+      - **persistent [str]** -- the persistent file path;
+      - **type [str]** -- the resource type (UnitexConstants.RESOURCE_X);
+      - **path [str]** -- the source file path;
+      - **bytes [int]** -- the resident size (estimated from the size
+        of the loaded files);
+      - **time [float]** -- the loading duration (in seconds);
+      - **uses [int]** -- the number of Unitex commands which used the
+        resource;
+      - **users [int]** -- the number of users holding the resource
+        (cf. 'acquire_persistent_resource').
+    """
+    with _STATS_LOCK:
+        stats = [dict(s) for s in _STATS.values()]
+
+    with _REGISTRY_LOCK:
+        for s in stats:
+            key = _PERSISTED.get(s["persistent"])
+            s["users"] = _REGISTRY[key]["users"] if key in _REGISTRY else 0
+
+    return sorted(stats, key=lambda s: s["bytes"], reverse=True)
+
+def preload_persistent_resources(resources, workers=None, callback=None, wait=False, acquire=None):
+    """
+    This function acquires (cf. 'acquire_persistent_resource') a list
+    of resources in parallel, in background threads. It allows, for
+    instance, a service to start while its dictionaries are loading.
+
+    *Arguments:*
+
+    - **resources [list(tuple(str, str))]** -- the (type, path) of the
+      resources (cf. 'acquire_persistent_resource').
+
+    - **workers [int]** -- the number of loading threads (default: one
+      per resource).
+
+    - **callback [callable]** -- a function called (from a background
+      thread) with the loading reports when all the resources are
+      loaded.
+
+    - **wait [bool]** -- if True, the function returns when the
+      resources are loaded and the loading threads are stopped (e.g.
+      before forking the process, cf. 'unitex.pool'). Default: False.
+
+    - **acquire [callable]** -- the acquisition function (default:
+      'acquire_persistent_resource'), e.g. 'ResourceCache.acquire'.
+
+    *Return [multiprocessing.pool.AsyncResult]:*
+
+      The loading result ('ready', 'wait' and 'get' methods). Its value
+      is the list of the loading reports (in the input order). A report
+      is a dictionary with the keys 'type', 'path', 'persistent' (the
+      persistent path or None if the loading failed), 'time' (the
+      loading time in seconds) and 'error' (None or the exception
+      raised).
+    """
+    if acquire is None:
+        acquire = acquire_persistent_resource
+
+    def load(resource):
+        _type, path = resource
+
+        report = {"type": _type, "path": path, "persistent": None, "time": None, "error": None}
+
+        start = time.time()
+        try:
+            report["persistent"] = acquire(_type, path)
+        except Exception as e:
+            _LOGGER.error("Loading resource '%s' failed (%s)!" % (path, e))
+            report["error"] = e
+        report["time"] = time.time() - start
+
+        _LOGGER.info("Resource '%s' loaded in %.3f seconds." % (path, report["time"]))
+        return report
+
+    pool = ThreadPool(workers or max(len(resources), 1))
+
+    result = pool.map_async(load, resources, callback=callback)
+    pool.close()
+
+    if wait is True:
+        pool.join()
+
+    return result
+
+
+
+class ResourceCache(object):
+    """
+    This class manages a set of persistent resources within a memory
+    budget. The resources are persisted the first time they are asked
+    (cf. 'get' and 'use') and the least recently used ones are unloaded
+    when the budget is exceeded. Core resources (e.g. the alphabet or
+    the sentence grammar) can be pinned to never be evicted.
+
+    The resources are shared through the persistent resource registry
+    (cf. 'acquire_persistent_resource'): an evicted resource stays
+    loaded as long as someone else (a processor, a running tool) uses
+    it. They are accounted by content: the same resource under
+    different paths is loaded and counted once.
+
+    The 'UnitexProcessor' uses a shared cache when the 'resource_budget'
+    global option is set (cf. 'unitex.processor.RESOURCE_CACHES').
+    """
+
+    def __init__(self, budget=None):
+        """
+        *Argument:*
+
+        - **budget [int]** -- the memory budget in bytes (estimated from
+          the file sizes). If None (default), the resources are never
+          evicted.
+        """
+        self.__budget = budget
+
+        self.__lock = threading.RLock()
+
+        self.__entries = collections.OrderedDict()
+        self.__size = 0
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __del__(self):
+        # The module globals may already be gone at interpreter exit.
+        try:
+            self.clear()
+        except Exception:
+            pass
+
+    def __evict(self, keep=None):
+        if self.__budget is None:
+            return
+
+        for key in list(self.__entries.keys()):
+            if self.__size <= self.__budget:
+                break
+            if key == keep:
+                continue
+
+            entry = self.__entries[key]
+            if entry["pinned"] is True:
+                continue
+
+            _LOGGER.info("Evicting persistent resource '%s' (%d bytes)..." % (entry["path"], entry["size"]))
+            release_persistent_resource(entry["persistent"])
+
+            del self.__entries[key]
+            self.__size -= entry["size"]
+            self.__evictions += 1
+
+    def __lookup(self, _type, path, pin, retain):
+        # The entries are indexed by content (cf. '_identity'): the same
+        # resource under different paths is accounted once.
+        key = _identity(_type, path)
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__hits += 1
+                del self.__entries[key]
+                self.__entries[key] = entry
+                return self.__use(key, entry, pin, retain)
+
+        # The resources are loaded outside of the lock (cf.
+        # 'acquire_persistent_resource').
+        persistent = acquire_persistent_resource(_type, path)
+
+        with self.__lock:
+            self.__misses += 1
+
+            entry = self.__entries.get(key)
+            if entry is not None:
+                # Loaded by another thread in the meantime.
+                release_persistent_resource(persistent)
+            else:
+                entry = {"persistent": persistent, "path": path, "size": _sizeof(_type, path), "pinned": False}
+
+                self.__entries[key] = entry
+                self.__size += entry["size"]
+            return self.__use(key, entry, pin, retain)
+
+    def __use(self, key, entry, pin, retain):
+        if pin is True:
+            entry["pinned"] = True
+
+        # The caller reference is taken before any eviction: the path
+        # returned is the one accounted (and pinned).
+        persistent = entry["persistent"]
+        if retain is True:
+            _retain(persistent)
+
+        # The resource just asked is kept even if it doesn't fit.
+        self.__evict(keep=key)
+
+        return persistent
+
+    def get(self, _type, path, pin=False):
+        """
+        This function returns the persistent path of a resource and
+        loads it if needed.
+
+        *Arguments:*
+
+        - **_type [str]** -- the resource type (UnitexConstants.RESOURCE_X).
+
+        - **path [str]** -- the resource file path.
+
+        - **pin [bool]** -- if True, the resource is never evicted
+          (default: False).
+
+        *Return [str]:*
+
+          The persistent file path. **WARNING: the resource may be
+          evicted as soon as another one is loaded, use 'acquire' or
+          'use' to protect it while a tool is running.**
+        """
+        return self.__lookup(_type, path, pin, False)
+
+    def acquire(self, _type, path, pin=False):
+        """
+        This function returns the persistent path of a resource, loads
+        it if needed and increments its reference count: the resource
+        is not unloaded, even if it's evicted, until the caller releases
+        it (cf. 'release_persistent_resource').
+
+        *Arguments:*
+
+        - **_type [str]** -- the resource type (UnitexConstants.RESOURCE_X).
+
+        - **path [str]** -- the resource file path.
+
+        - **pin [bool]** -- if True, the resource is never evicted
+          (default: False).
+
+        *Return [str]:*
+
+          The persistent file path.
+        """
+        return self.__lookup(_type, path, pin, True)
+
+    @contextmanager
+    def use(self, _type, path):
+        """
+        This function (context manager) gives access to a resource
+        (cf. 'acquire') and prevents its unloading until the context
+        exits.
+
+        *Arguments:*
+
+        - **_type [str]** -- the resource type (UnitexConstants.RESOURCE_X).
+
+        - **path [str]** -- the resource file path.
+
+        *Return [str]:*
+
+          The persistent file path.
+        """
+        persistent = self.acquire(_type, path)
+        try:
+            yield persistent
+        finally:
+            release_persistent_resource(persistent)
+
+    def pin(self, _type, path):
+        """
+        This function loads (if needed) and pins a resource.
+
+        *Arguments:*
+
+        - **_type [str]** -- the resource type (UnitexConstants.RESOURCE_X).
+
+        - **path [str]** -- the resource file path.
+
+        *Return [str]:*
+
+          The persistent file path.
+        """
+        return self.get(_type, path, pin=True)
+
+    def unpin(self, _type, path):
+        """
+        This function makes a pinned resource evictable again.
+
+        *Arguments:*
+
+        - **_type [str]** -- the resource type (UnitexConstants.RESOURCE_X).
+
+        - **path [str]** -- the resource file path.
+
+        *No return.*
+        """
+        key = _identity(_type, path)
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                entry["pinned"] = False
+            self.__evict()
+
+    def clear(self):
+        """
+        This function releases all the resources (pinned or not).
+
+        *No arguments.*
+
+        *No return.*
+        """
+        with self.__lock:
+            for entry in self.__entries.values():
+                release_persistent_resource(entry["persistent"])
+
+            self.__entries.clear()
+            self.__size = 0
+
+    def stats(self):
+        """
+        This function returns the cache statistics.
+
+        *No arguments.*
+
+        *Return [dict]:*
+
+          A dictionary with the keys 'resources' (number of loaded
+          resources), 'bytes' (their estimated size), 'budget', 'hits',
+          'misses' and 'evictions'.
+        """
+        with self.__lock:
+            return {"resources": len(self.__entries),
+                    "bytes": self.__size,
+                    "budget": self.__budget,
+                    "hits": self.__hits,
+                    "misses": self.__misses,
+                    "evictions": self.__evictions}
+
+
+
+class ResourceWatcher(object):
+    """
+    This class reloads the persistent resources when their files are
+    modified, without stopping the processing. The modified files are
+    detected by modification time and size (or by content checksum)
+    and their new version is copied to a versioned virtual path and
+    persisted next to the old one. The following acquisitions (cf.
+    'acquire_persistent_resource') get the new version; the old one is
+    freed when its last user releases it (e.g. when a processor starts
+    its next document, cf. 'persistent_generation').
+    """
+
+    RELOAD_DIRECTORY = _RELOAD_DIRECTORY
+
+    def __init__(self, interval=5.0, checksum=False):
+        """
+        *Arguments:*
+
+        - **interval [float]** -- the delay (in seconds) between two
+          checks of the background thread (cf. 'start').
+
+        - **checksum [bool]** -- if True, the files are compared by
+          content (SHA-1) instead of modification time and size.
+        """
+        self.__interval = interval
+        self.__checksum = checksum
+
+        self.__lock = threading.Lock()
+        self.__watched = {}
+
+        self.__thread = None
+        self.__stopped = threading.Event()
+
+    def __signature(self, _type, path):
+        signature = []
+        for f in _files(_type, path):
+            if self.__checksum is True:
+                digest = hashlib.sha1()
+                with open(f, "rb") as _file:
+                    for block in iter(lambda: _file.read(1048576), b""):
+                        digest.update(block)
+                signature.append(digest.hexdigest())
+            else:
+                status = os.stat(f)
+                signature.append((status.st_mtime, status.st_size))
+        return signature
+
+    def watch(self, _type, path):
+        """
+        This function adds a resource (disk file) to the watch list.
+
+        *Arguments:*
+
+        - **_type [str]** -- the resource type (UnitexConstants.RESOURCE_X).
+
+        - **path [str]** -- the resource file path (as used in the
+          configuration).
+
+        *No return.*
+        """
+        if path.startswith(UnitexConstants.VFS_PREFIX):
+            raise UnitexException("Virtual resources can't be watched ('%s')..." % path)
+
+        with self.__lock:
+            self.__watched[_source(_type, path)] = {"type": _type,
+                                                    "path": path,
+                                                    "signature": self.__signature(_type, path),
+                                                    "persistent": None}
+
+    def unwatch(self, _type, path):
+        """
+        This function removes a resource from the watch list. The
+        following acquisitions get the original file again.
+
+        *Arguments:*
+
+        - **_type [str]** -- the resource type (UnitexConstants.RESOURCE_X).
+
+        - **path [str]** -- the resource file path.
+
+        *No return.*
+        """
+        key = _source(_type, path)
+
+        with self.__lock:
+            watched = self.__watched.pop(key, None)
+        if watched is None:
+            return
+
+        with _REGISTRY_LOCK:
+            _REDIRECTS.pop(key, None)
+            _GENERATION[0] += 1
+
+        if watched["persistent"] is not None:
+            release_persistent_resource(watched["persistent"])
+
+    def check(self):
+        """
+        This function checks the watched resources once and reloads the
+        modified ones.
+
+        *No arguments.*
+
+        *Return [list(str)]:*
+
+          The paths of the reloaded resources.
+        """
+        reloaded = []
+
+        with self.__lock:
+            for key, watched in list(self.__watched.items()):
+                _type, path = watched["type"], watched["path"]
+
+                try:
+                    signature = self.__signature(_type, path)
+                except (IOError, OSError) as e:
+                    _LOGGER.warning("Unable to check resource '%s' (%s)..." % (path, e))
+                    continue
+                if signature == watched["signature"]:
+                    continue
+
+                # The new version gets its own (persistent) name.
+                try:
+                    copies = _versioned_copy(_type, path)
+                except UnitexException:
+                    _LOGGER.error("Unable to copy resource '%s' for reloading!" % path)
+                    continue
+
+                try:
+                    persistent = acquire_persistent_resource(_type, copies[0])
+                except Exception as e:
+                    _LOGGER.error("Unable to reload resource '%s' (%s)!" % (path, e))
+                    for f in copies:
+                        rm(f)
+                    continue
+
+                with _REGISTRY_LOCK:
+                    _VERSIONED[persistent] = copies
+                    _REDIRECTS[key] = copies[0]
+                    _GENERATION[0] += 1
+
+                previous = watched["persistent"]
+
+                watched["persistent"] = persistent
+                watched["signature"] = signature
+
+                if previous is not None:
+                    release_persistent_resource(previous)
+
+                _LOGGER.info("Resource '%s' reloaded ('%s')." % (path, persistent))
+                reloaded.append(path)
+
+        return reloaded
+
+    def start(self):
+        """
+        This function starts a background thread checking the watched
+        resources periodically (cf. 'check').
+
+        *No arguments.*
+
+        *No return.*
+        """
+        if self.__thread is not None:
+            return
+        self.__stopped.clear()
+
+        def run():
+            while self.__stopped.wait(self.__interval) is False:
+                self.check()
+
+        self.__thread = threading.Thread(target=run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """
+        This function stops the background thread.
+
+        *No arguments.*
+
+        *No return.*
+        """
+        if self.__thread is None:
+            return
+
+        self.__stopped.set()
+        self.__thread.join()
+        self.__thread = None
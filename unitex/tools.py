@@ -6,10 +6,16 @@
 from __future__ import unicode_literals
 
 import logging
+import os
+import re
+import threading
+
+from contextlib import contextmanager
 
 import _unitex
 
 from unitex import *
+from unitex import _flush_outputs
 from unitex.config import CheckDicOptions,\
                           CompressOptions,\
                           ConcordOptions,\
@@ -23,11 +29,103 @@ from unitex.config import CheckDicOptions,\
                           TokenizeOptions,\
                           Txt2TFstOptions
 from unitex.io import exists
+from unitex.resources import _count_uses
 
 _LOGGER = logging.getLogger(__name__)
 
 
 
+# The '_unitex.unitex_tool*' functions release the GIL, so the tools can be
+# called from several threads at the same time. Unitex tools are not
+# isolated from each other though: two commands working on the same text
+# write the same files in the same '*_snt' directory. The calls are then
+# serialized by 'workspace' (i.e. the directory or file a command writes
+# into) while calls on different workspaces run concurrently.
+_WORKSPACE_GUARD = threading.Lock()
+_WORKSPACE_LOCKS = {}
+
+def _reset_workspaces():
+    """
+    This function resets the workspace locks in a forked process: the
+    threads holding them don't exist anymore (cf. 'unitex.pool').
+    """
+    global _WORKSPACE_GUARD, _WORKSPACE_LOCKS
+
+    _WORKSPACE_GUARD = threading.Lock()
+    _WORKSPACE_LOCKS = {}
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_workspaces)
+
+def _workspace(text):
+    """
+    This function returns the working directory used by Unitex for a
+    given text (i.e. the '*_snt' directory).
+    """
+    directory, filename = os.path.split(text)
+    name, extension = os.path.splitext(filename)
+    return os.path.join(directory, "%s_snt" % name)
+
+@contextmanager
+def _isolated(workspace):
+    """
+    This context manager ensures that only one Unitex command at a time
+    works on a given workspace. The locks are created on demand and
+    dropped as soon as no thread uses them anymore.
+    """
+    workspace = os.path.normpath(workspace)
+
+    with _WORKSPACE_GUARD:
+        entry = _WORKSPACE_LOCKS.get(workspace)
+        if entry is None:
+            entry = [threading.Lock(), 0]
+            _WORKSPACE_LOCKS[workspace] = entry
+        entry[1] += 1
+
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _WORKSPACE_GUARD:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _WORKSPACE_LOCKS[workspace]
+
+def _run(command):
+    """
+    This function launches a Unitex command and counts the persistent
+    resources it uses (cf. 'unitex.resources.persistent_stats'). The
+    end of the redirected outputs is flushed when the command ends.
+    """
+    _count_uses(command)
+    try:
+        return _unitex.unitex_tool_argv(command)
+    finally:
+        _flush_outputs()
+
+
+
+def _check_dic_command(dictionary, dtype, alphabet, options):
+    command = ["UnitexTool", "CheckDic"]
+
+    if dtype == UnitexConstants.DELAF:
+        command.append("--delaf")
+    elif dtype == UnitexConstants.DELAS:
+        command.append("--delas")
+
+    if options["strict"] is True:
+        command.append("--strict")
+    if options["no_space_warning"] is True:
+        command.append("--no_space_warning")
+
+    command .append("--alphabet=%s" % alphabet)
+
+    command.append(dictionary)
+
+    command.append("-qutf8-no-bom")
+
+    return command
+
 def check_dic(dictionary, dtype, alphabet, **kwargs):
     """
     This function checks the format of <dela> and produces a file named
@@ -62,32 +160,37 @@ def check_dic(dictionary, dtype, alphabet, **kwargs):
     if exists(dictionary) is False:
         raise UnitexException("[CHECKDIC] Dictionary file '%s' doesn't exists" % dictionary)
 
-    command = ["UnitexTool", "CheckDic"]
+    command = _check_dic_command(dictionary, dtype, alphabet, options)
 
-    if dtype == UnitexConstants.DELAF:
-        command.append("--delaf")
-    elif dtype == UnitexConstants.DELAS:
-        command.append("--delas")
+    _LOGGER.info("Checking dic '%s'" % dictionary)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(os.path.dirname(dictionary)):
+        ret = _run(command)
 
-    if options["strict"] is True:
-        command.append("--strict")
-    if options["no_space_warning"] is True:
-        command.append("--no_space_warning")
+    return ret
 
-    command .append("--alphabet=%s" % alphabet)
 
-    command.append(dictionary)
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
+def _compress_command(dictionary, options):
+    command = ["UnitexTool", "Compress"]
 
-    _LOGGER.info("Checking dic '%s'" % dictionary)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+    if options["output"] is not None:
+        command.append("--output=%s" % options["output"])
+    if options["flip"] is True:
+        command.append("--flip")
+    if options["semitic"] is True:
+        command.append("--semitic")
 
-    return ret
+    if options["version"] == UnitexConstants.DICTIONARY_VERSION_1:
+        command.append("--v1")
+    elif options["version"] == UnitexConstants.DICTIONARY_VERSION_2:
+        command.append("--v2")
+
+    command.append(dictionary)
 
+    command.append("-qutf8-no-bom")
 
+    return command
 
 def compress(dictionary, **kwargs):
     """
@@ -137,32 +240,85 @@ def compress(dictionary, **kwargs):
     if exists(dictionary) is False:
         raise UnitexException("[COMPRESS] Dictionary file '%s' doesn't exists" % dictionary)
 
-    command = ["UnitexTool", "Compress"]
+    command = _compress_command(dictionary, options)
 
-    if options["output"] is not None:
-        command.append("--output=%s" % options["output"])
-    if options["flip"] is True:
-        command.append("--flip")
-    if options["semitic"] is True:
-        command.append("--semitic")
+    _LOGGER.info("Compressing dic '%s'" % dictionary)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(dictionary):
+        ret = _run(command)
 
-    if options["version"] == UnitexConstants.DICTIONARY_VERSION_1:
-        command.append("--v1")
-    elif options["version"] == UnitexConstants.DICTIONARY_VERSION_2:
-        command.append("--v2")
+    return ret
 
-    command.append(dictionary)
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
 
-    _LOGGER.info("Compressing dic '%s'" % dictionary)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+def _concord_command(index, alphabet, options):
+    command = ["UnitexTool", "Concord"]
 
-    return ret
+    if options["font"] is not None:
+        command.append("--font=%s" % options["font"])
+    if options["fontsize"] is not None:
+        command.append("--fontsize=%s" % options["fontsize"])
+    if options["only_ambiguous"] is True:
+        command.append("--only_ambiguous")
+    if options["only_matches"] is True:
+        command.append("--only_matches")
+
+    command.append("--left=%s" % options["left"])
+    command.append("--right=%s" % options["right"])
+
+    if options["sort"] == UnitexConstants.SORT_TEXT_ORDER:
+        command.append("--TO")
+    elif options["sort"] == UnitexConstants.SORT_LEFT_CENTER:
+        command.append("--LC")
+    elif options["sort"] == UnitexConstants.SORT_LEFT_RIGHT:
+        command.append("--LR")
+    elif options["sort"] == UnitexConstants.SORT_CENTER_LEFT:
+        command.append("--CL")
+    elif options["sort"] == UnitexConstants.SORT_CENTER_RIGHT:
+        command.append("--CR")
+    elif options["sort"] == UnitexConstants.SORT_RIGHT_LEFT:
+        command.append("--RL")
+    elif options["sort"] == UnitexConstants.SORT_RIGHT_CENTER:
+        command.append("--RC")
+
+    if options["format"] == UnitexConstants.FORMAT_HTML:
+        command.append("--html")
+    elif options["format"] == UnitexConstants.FORMAT_TEXT:
+        command.append("--text")
+    elif options["format"] == UnitexConstants.FORMAT_GLOSSANET:
+        command.append("--glossanet=%s" % options["script"])
+    elif options["format"] == UnitexConstants.FORMAT_SCRIPT:
+        command.append("--script=%s" % options["script"])
+    elif options["format"] == UnitexConstants.FORMAT_INDEX:
+        command.append("--index")
+    elif options["format"] == UnitexConstants.FORMAT_UIMA:
+        command.append("--uima=%s" % options["offsets"])
+    elif options["format"] == UnitexConstants.FORMAT_PRLG:
+        command.append("--PRLG=%s,%s" % (options["unxmlize"], options["offsets"]))
+    elif options["format"] == UnitexConstants.FORMAT_XML:
+        command.append("--xml")
+    elif options["format"] == UnitexConstants.FORMAT_XML_WITH_HEADERS:
+        command.append("--xml-with-header")
+    elif options["format"] == UnitexConstants.FORMAT_AXIS:
+        command.append("--axis")
+    elif options["format"] == UnitexConstants.FORMAT_XALIGN:
+        command.append("--xalign")
+    elif options["format"] == UnitexConstants.FORMAT_MERGE:
+        command.append("--merge=%s" % options["output"])
+
+    if options["directory"] is not None:
+        command.append("--directory=%s" % options["directory"])
+
+    command.append("--alphabet=%s" % alphabet)
+
+    if options["thai"] is True:
+        command.append("--thai")
+
+    command.append(index)
 
+    command.append("-qutf8-no-bom")
 
+    return command
 
 def concord(index, alphabet, **kwargs):
     """
@@ -340,80 +496,39 @@ def concord(index, alphabet, **kwargs):
     if exists(alphabet) is False:
         raise UnitexException("[CONCORD] Alphabet file '%s' doesn't exists" % alphabet)
 
-    command = ["UnitexTool", "Concord"]
+    command = _concord_command(index, alphabet, options)
 
-    if options["font"] is not None:
-        command.append("--font=%s" % options["font"])
-    if options["fontsize"] is not None:
-        command.append("--fontsize=%s" % options["fontsize"])
-    if options["only_ambiguous"] is True:
-        command.append("--only_ambiguous")
-    if options["only_matches"] is True:
-        command.append("--only_matches")
+    _LOGGER.info("Create concordance for '%s'" % index)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(options["directory"] or os.path.dirname(index)):
+        ret = _run(command)
 
-    command.append("--left=%s" % options["left"])
-    command.append("--right=%s" % options["right"])
+    return ret
 
-    if options["sort"] == UnitexConstants.SORT_TEXT_ORDER:
-        command.append("--TO")
-    elif options["sort"] == UnitexConstants.SORT_LEFT_CENTER:
-        command.append("--LC")
-    elif options["sort"] == UnitexConstants.SORT_LEFT_RIGHT:
-        command.append("--LR")
-    elif options["sort"] == UnitexConstants.SORT_CENTER_LEFT:
-        command.append("--CL")
-    elif options["sort"] == UnitexConstants.SORT_CENTER_RIGHT:
-        command.append("--CR")
-    elif options["sort"] == UnitexConstants.SORT_RIGHT_LEFT:
-        command.append("--RL")
-    elif options["sort"] == UnitexConstants.SORT_RIGHT_CENTER:
-        command.append("--RC")
 
-    if options["format"] == UnitexConstants.FORMAT_HTML:
-        command.append("--html")
-    elif options["format"] == UnitexConstants.FORMAT_TEXT:
-        command.append("--text")
-    elif options["format"] == UnitexConstants.FORMAT_GLOSSANET:
-        command.append("--glossanet=%s" % options["script"])
-    elif options["format"] == UnitexConstants.FORMAT_SCRIPT:
-        command.append("--script=%s" % options["script"])
-    elif options["format"] == UnitexConstants.FORMAT_INDEX:
-        command.append("--index")
-    elif options["format"] == UnitexConstants.FORMAT_UIMA:
-        command.append("--uima=%s" % options["offsets"])
-    elif options["format"] == UnitexConstants.FORMAT_PRLG:
-        command.append("--PRLG=%s,%s" % options["unxmlize"], options["offsets"])
-    elif options["format"] == UnitexConstants.FORMAT_XML:
-        command.append("--xml")
-    elif options["format"] == UnitexConstants.FORMAT_XML_WITH_HEADERS:
-        command.append("--xml-with-header")
-    elif options["format"] == UnitexConstants.FORMAT_AXIS:
-        command.append("--axis")
-    elif options["format"] == UnitexConstants.FORMAT_XALIGN:
-        command.append("--xalign")
-    elif options["format"] == UnitexConstants.FORMAT_MERGE:
-        command.append("--merge=%s" % options["output"])
 
-    if options["directory"] is not None:
-        command.append("--directory=%s" % options["directory"])
+def _dico_command(dictionaries, text, alphabet, options):
+    command = ["UnitexTool", "Dico"]
 
+    command.append("--text=%s" % text)
     command.append("--alphabet=%s" % alphabet)
 
-    if options["thai"] is not True:
-        command.append("--thai")
+    if options["morpho"] is not None:
+        command.append("--morpho=%s" % ",".join(options["morpho"]))
+    if options["korean"] is True:
+        command.append("--korean")
+    if options["semitic"] is True:
+        command.append("--semitic")
+    if options["arabic_rules"] is not None:
+        command.append("--arabic_rules=%s" % options["arabic_rules"])
+    if options["raw"] is not None:
+        command.append("--raw=%s" % options["raw"])
 
-    command.append(index)
+    command += dictionaries
 
     command.append("-qutf8-no-bom")
-    command = " ".join(command)
-
-    _LOGGER.info("Create concordance for '%s'" % index)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
-
-    return ret
-
 
+    return command
 
 def dico(dictionaries, text, alphabet, **kwargs):
     """
@@ -479,34 +594,33 @@ def dico(dictionaries, text, alphabet, **kwargs):
     if exists(alphabet) is False:
         raise UnitexException("[DICO] Alphabet file '%s' doesn't exists" % alphabet)
 
-    command = ["UnitexTool", "Dico"]
+    command = _dico_command(dictionaries, text, alphabet, options)
 
-    command.append("--text=%s" % text)
-    command.append("--alphabet=%s" % alphabet)
+    _LOGGER.info("Applying dictionaries")
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(_workspace(text)):
+        ret = _run(command)
 
-    if options["morpho"] is not None:
-        command.append("--morpho=%s" % ",".join(options["morpho"]))
-    if options["korean"] is True:
-        command.append("--korean")
-    if options["semitic"] is True:
-        command.append("--semitic")
-    if options["arabic_rules"] is not None:
-        command.append("--arabic_rules=%s" % options["arabic_rules"])
-    if options["raw"] is not None:
-        command.append("--raw=%s" % raw)
+    return ret
 
-    command += dictionaries
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
 
-    _LOGGER.info("Applying dictionaries")
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+def _extract_command(text, output, index, options):
+    command = ["UnitexTool", "Extract"]
 
-    return ret
+    if options["non_matching_sentences"] is False:
+        command.append("--yes")
+    else:
+        command.append("--no")
+
+    command.append("--output=%s" % output)
+    command.append("--index=%s" % index)
+
+    command.append(text)
 
+    command.append("-qutf8-no-bom")
 
+    return command
 
 def extract(text, output, index, **kwargs):
     """
@@ -541,28 +655,43 @@ def extract(text, output, index, **kwargs):
     if exists(index) is False:
         raise UnitexException("[EXTRACT] Index file '%s' doesn't exists" % index)
 
-    command = ["UnitexTool", "Extract"]
+    command = _extract_command(text, output, index, options)
 
-    if options["non_matching_sentences"] is False:
-        command.append("--yes")
-    else:
-        command.append("--no")
+    _LOGGER.info("Extracting sentences")
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(_workspace(text)):
+        ret = _run(command)
 
-    command.append("--output=%s" % output)
-    command.append("--index=%s" % index)
+    return ret
 
-    command.append(text)
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
 
-    _LOGGER.info("Extracting sentences")
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+def _fst2txt_command(grammar, text, alphabet, options):
+    command = ["UnitexTool", "Fst2Txt"]
 
-    return ret
+    command.append("--text=%s" % text)
+    command.append("--alphabet=%s" % alphabet)
+
+    if options["start_on_space"] is False:
+        command.append("--dont_start_on_space")
+    else:
+        command.append("--start_on_space")
+
+    if options["char_by_char"] is False:
+        command.append("--word_by_word")
+    else:
+        command.append("--char_by_char")
+
+    if options["merge"] is True:
+        command.append("--merge")
+    else:
+        command.append("--replace")
 
+    command.append(grammar)
+
+    command.append("-qutf8-no-bom")
 
+    return command
 
 def fst2txt(grammar, text, alphabet, **kwargs):
     """
@@ -609,38 +738,49 @@ def fst2txt(grammar, text, alphabet, **kwargs):
     if exists(alphabet) is False:
         raise UnitexException("[FST2TXT] Alphabet file '%s' doesn't exists" % alphabet)
 
-    command = ["UnitexTool", "Fst2Txt"]
+    command = _fst2txt_command(grammar, text, alphabet, options)
 
-    command.append("--text=%s" % text)
-    command.append("--alphabet=%s" % alphabet)
+    _LOGGER.info("Applying grammar '%s'..." % grammar)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(_workspace(text)):
+        ret = _run(command)
 
-    if options["start_on_space"] is False:
-        command.append("--dont_start_on_space")
-    else:
-        command.append("--start_on_space")
+    return ret
 
-    if options["char_by_char"] is False:
-        command.append("--word_by_word")
-    else:
-        command.append("--char_by_char")
 
-    if options["merge"] is True:
-        command.append("--merge")
-    else:
-        command.append("--replace")
 
-    command.append(grammar)
+def _grf2fst2_command(grammar, alphabet, options):
+    command = ["UnitexTool", "Grf2Fst2"]
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
+    if options["loop_check"] is False:
+        command.append("--no_loop_check")
+    else:
+        command.append("--loop_check")
 
-    _LOGGER.info("Applying grammar '%s'..." % grammar)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+    command.append("--alphabet=%s" % alphabet)
 
-    return ret
+    if options["char_by_char"] is True:
+        command.append("--char_by_char")
+    if options["pkgdir"] is not None:
+        command.append("--pkgdir=%s" % options["pkgdir"])
+    if options["no_empty_graph_warning"] is True:
+        command.append("--no_empty_graph_warning")
+    if options["tfst_check"] is True:
+        command.append("--tfst_check")
+    if options["silent_grf_name"] is True:
+        command.append("--silent_grf_name")
+    if options["named_repositories"] is not None:
+        command.append("--named_repositories=%s" % ";".join(options["named_repositories"]))
+    if options["debug"] is True:
+        command.append("--debug")
+    if options["check_variables"] is True:
+        command.append("--check_variables")
 
+    command.append(grammar)
+
+    command.append("-qutf8-no-bom")
 
+    return command
 
 def grf2fst2(grammar, alphabet, **kwargs):
     """
@@ -705,44 +845,93 @@ def grf2fst2(grammar, alphabet, **kwargs):
     if exists(alphabet) is False:
         raise UnitexException("[GRF2FST2] Alphabet file '%s' doesn't exists" % alphabet)
 
-    command = ["UnitexTool", "Grf2Fst2"]
+    command = _grf2fst2_command(grammar, alphabet, options)
+
+    _LOGGER.info("Compiling grammar '%s'..." % grammar)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(grammar):
+        ret = _run(command)
+
+    return ret
 
-    if options["loop_check"] is False:
-        command.append("--no_loop_check")
-    else:
-        command.append("--loop_check")
 
+
+def _locate_command(grammar, text, alphabet, options):
+    command = ["UnitexTool", "Locate"]
+
+    command.append("--text=%s" % text)
     command.append("--alphabet=%s" % alphabet)
 
-    if options["char_by_char"] is True:
+    if options["morpho"] is not None:
+        command.append("--morpho=%s" % ",".join(options["morpho"]))
+
+    if options["start_on_space"] is False:
+        command.append("--dont_start_on_space")
+    else:
+        command.append("--start_on_space")
+
+    if options["char_by_char"] is False:
+        command.append("--word_by_word")
+    else:
         command.append("--char_by_char")
-    if options["pkgdir"] is not None:
-        command.append("--pkgdir=%s" % options["pkgdir"])
-    if options["no_empty_graph_warning"] is True:
-        command.append("--no_empty_graph_warning")
-    if options["tfst_check"] is True:
-        command.append("--tfst_check")
-    if options["silent_grf_name"] is True:
-        command.append("--silent_grf_name")
-    if options["named_repositories"] is not None:
-        command.append("--named_repositories=%s" % ";".join(options["named_repositories"]))
-    if options["debug"] is True:
-        command.append("--debug")
-    if options["check_variables"] is True:
-        command.append("--check_variables")
 
-    command.append(grammar)
+    if options["sntdir"] is not None:
+        command.append("--sntdir=%s" % options["sntdir"])
+    if options["korean"] is True:
+        command.append("--korean")
+    if options["arabic_rules"] is not None:
+        command.append("--arabic_rules=%s" % options["arabic_rules"])
+    if options["negation_operator"] is not None:
+        command.append("--negation_operator=%s" % options["negation_operator"])
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
+    if options["number_of_matches"] is None:
+        command.append("--all")
+    else:
+        command.append("--number_of_matches=%s" % options["number_of_matches"])
 
-    _LOGGER.info("Compiling grammar '%s'..." % grammar)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+    if options["stop_token_count"] is not None:
+        if options["stop_token_count"][0] is None:
+            command.append("--stop_token_count=%s" % options["stop_token_count"][1])
+        else:
+            command.append("--stop_token_count=%s,%s" % (options["stop_token_count"][0], options["stop_token_count"][1]))
 
-    return ret
+    if options["match_mode"] == UnitexConstants.MATCH_MODE_LONGEST:
+        command.append("--longest_matches")
+    elif options["match_mode"] == UnitexConstants.MATCH_MODE_SHORTEST:
+        command.append("--shortest_matches")
+    elif options["match_mode"] == UnitexConstants.MATCH_MODE_ALL:
+        command.append("--all_matches")
+
+    if options["output_mode"] == UnitexConstants.OUTPUT_MODE_IGNORE:
+        command.append("--ignore")
+    elif options["output_mode"] == UnitexConstants.OUTPUT_MODE_MERGE:
+        command.append("--merge")
+    elif options["output_mode"] == UnitexConstants.OUTPUT_MODE_REPLACE:
+        command.append("--replace")
+
+    if options["protect_dic_chars"] is True:
+        command.append("--protect_dic_chars")
 
+    if options["variable"] is not None:
+        command.append("--variable=%s=%s" % (options["variable"][0], options["variable"][1]))
+
+    if options["ambiguous_outputs"] is True:
+        command.append("--ambiguous_outputs")
+    else:
+        command.append("--no_ambiguous_outputs")
+
+    if options["variable_error"] == UnitexConstants.ON_ERROR_IGNORE:
+        command.append("--ignore_variable_error")
+    elif options["variable_error"] == UnitexConstants.ON_ERROR_EXIT:
+        command.append("--exit_on_variable_error")
+    elif options["variable_error"] == UnitexConstants.ON_ERROR_BACKTRACK:
+        command.append("--backtrack_on_variable_error")
+
+    command.append(grammar)
 
+    command.append("-qutf8-no-bom")
+
+    return command
 
 def locate(grammar, text, alphabet, **kwargs):
     """
@@ -857,88 +1046,39 @@ def locate(grammar, text, alphabet, **kwargs):
     if exists(alphabet) is False:
         raise UnitexException("[LOCATE] Alphabet file '%s' doesn't exists" % alphabet)
 
-    command = ["UnitexTool", "Locate"]
-
-    command.append("--text=%s" % text)
-    command.append("--alphabet=%s" % alphabet)
-
-    if options["morpho"] is not None:
-        command.append("--morpho=%s" % ",".join(options["morpho"]))
-
-    if options["start_on_space"] is False:
-        command.append("--dont_start_on_space")
-    else:
-        command.append("--start_on_space")
+    command = _locate_command(grammar, text, alphabet, options)
 
-    if options["char_by_char"] is False:
-        command.append("--word_by_word")
-    else:
-        command.append("--char_by_char")
+    _LOGGER.info("Locating pattern '%s'..." % grammar)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(options["sntdir"] or _workspace(text)):
+        ret = _run(command)
 
-    if options["sntdir"] is not None:
-        command.append("--sntdir=%s" % options["sntdir"])
-    if options["korean"] is True:
-        command.append("--korean")
-    if options["arabic_rules"] is not None:
-        command.append("--arabic_rules=%s" % options["arabic_rules"])
-    if options["negation_operator"] is not None:
-        command.append("--negation_operator=%s" % options["negation_operator"])
+    return ret
 
-    if options["number_of_matches"] is None:
-        command.append("--all")
-    else:
-        command.append("--number_of_matches=%s" % options["number_of_matches"])
 
-    if options["stop_token_count"] is not None:
-        if options["stop_token_count[0]"] is None:
-            command.append("--stop_token_count=%s" % stop_token_count[1])
-        else:
-            command.append("--stop_token_count=%s,%s" % (stop_token_count[0], stop_token_count[1]))
 
-    if options["match_mode"] == UnitexConstants.MATCH_MODE_LONGEST:
-        command.append("--longest_matches")
-    elif options["match_mode"] == UnitexConstants.MATCH_MODE_SHORTEST:
-        command.append("--shortest_matches")
-    elif options["match_mode"] == UnitexConstants.MATCH_MODE_ALL:
-        command.append("--all_matches")
-
-    if options["output_mode"] == UnitexConstants.OUTPUT_MODE_IGNORE:
-        command.append("--ignore")
-    elif options["output_mode"] == UnitexConstants.OUTPUT_MODE_MERGE:
-        command.append("--merge")
-    elif options["output_mode"] == UnitexConstants.OUTPUT_MODE_REPLACE:
-        command.append("--replace")
+def _normalize_command(text, options):
+    command = ["UnitexTool", "Normalize"]
 
-    if options["protect_dic_chars"] is True:
-        command.append("--protect_dic_chars")
+    if options["no_carriage_return"] is True:
+        command.append("--no_carriage_return")
 
-    if options["variable"] is not None:
-        command.append("--variable=%s=%s" % (options["variable"][0], options["variable"][1]))
+    if options["input_offsets"] is not None:
+        command.append("--input_offsets=%s" % options["input_offsets"])
+    if options["output_offsets"] is not None:
+        command.append("--output_offsets=%s" % options["output_offsets"])
 
-    if options["ambiguous_outputs"] is True:
-        command.append("--ambiguous_outputs")
-    else:
-        command.append("--no_ambiguous_outputs")
+    if options["replacement_rules"] is not None:
+        command.append("--replacement_rules=%s" % options["replacement_rules"])
 
-    if options["variable_error"] == UnitexConstants.ON_ERROR_IGNORE:
-        command.append("--ignore_variable_error")
-    elif options["variable_error"] == UnitexConstants.ON_ERROR_EXIT:
-        command.append("--exit_on_variable_error")
-    elif options["variable_error"] == UnitexConstants.ON_ERROR_BACKTRACK:
-        command.append("--backtrack_on_variable_error")
+    if options["no_separator_normalization"] is True:
+        command.append("--no_separator_normalization")
 
-    command.append(grammar)
+    command.append(text)
 
     command.append("-qutf8-no-bom")
-    command = " ".join(command)
-
-    _LOGGER.info("Locating pattern '%s'..." % grammar)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
-
-    return ret
-
 
+    return command
 
 def normalize(text, **kwargs):
     """
@@ -991,34 +1131,41 @@ def normalize(text, **kwargs):
     if exists(text) is False:
         raise UnitexException("[NORMALIZE] Text file '%s' doesn't exists" % text)
 
-    command = ["UnitexTool", "Normalize"]
+    command = _normalize_command(text, options)
 
-    if options["no_carriage_return"] is True:
-        command.append("--no_carriage_return")
+    _LOGGER.info("Normalizing text '%s'..." % text)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(_workspace(text)):
+        ret = _run(command)
 
-    if options["input_offsets"] is not None:
-        command.append("--input_offsets=%s" % options["input_offsets"])
-    if options["output_offsets"] is not None:
-        command.append("--output_offsets=%s" % options["output_offsets"])
+    return ret
 
-    if options["replacement_rules"] is not None:
-        command.append("--replacement_rules=%s" % options["replacement_rules"])
 
-    if options["no_separator_normalization"] is True:
-        command.append("--no_separator_normalization")
 
-    command.append(text)
+def _sort_txt_command(text, options):
+    command = ["UnitexTool", "SortTxt"]
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
+    if options["duplicates"] is False:
+        command.append("--no_duplicates")
+    else:
+        command.append("--duplicates")
 
-    _LOGGER.info("Normalizing text '%s'..." % text)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+    if options["reverse"] is True:
+        command.append("--reverse")
+    if options["sort_order"] is not None:
+        command.append("--sort_order=%s" % options["sort_order"])
+    if options["line_info"] is not None:
+        command.append("--line_info=%s" % options["line_info"])
+    if options["thai"] is True:
+        command.append("--thai")
+    if options["factorize_inflectional_codes"] is True:
+        command.append("--factorize_inflectional_codes")
 
-    return ret
+    command.append(text)
 
+    command.append("-qutf8-no-bom")
 
+    return command
 
 def sort_txt(text, **kwargs):
     """
@@ -1063,36 +1210,40 @@ def sort_txt(text, **kwargs):
     if exists(text) is False:
         raise UnitexException("[SORTTXT] Text file '%s' doesn't exists" % text)
 
-    command = ["UnitexTool", "SortTxt"]
+    command = _sort_txt_command(text, options)
 
-    if options["duplicates"] is False:
-        command.append("--no_duplicates")
-    else:
-        command.append("--duplicates")
+    _LOGGER.info("Sorting file '%s'..." % text)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(text):
+        ret = _run(command)
 
-    if options["reverse"] is True:
-        command.append("--reverse")
-    if options["sort_order"] is None:
-        command.append("--sort_order=%s" % options["sort_order"])
-    if options["line_info"] is None:
-        command.append("--line_info=%s" % options["line_info"])
-    if options["thai"] is True:
-        command.append("--thai")
-    if options["factorize_inflectional_codes"] is True:
-        command.append("--factorize_inflectional_codes")
+    return ret
 
-    command.append(text)
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
 
-    _LOGGER.info("Sorting file '%s'..." % text)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+def _tokenize_command(text, alphabet, options):
+    command = ["UnitexTool", "Tokenize"]
 
-    return ret
+    command.append("--alphabet=%s" % alphabet)
 
+    if options["char_by_char"] is True:
+        command.append("--char_by_char")
+    else:
+        command.append("--word_by_word")
+
+    if options["tokens"] is not None:
+        command.append("--tokens=%s" % options["tokens"])
+
+    if options["input_offsets"] is not None:
+        command.append("--input_offsets=%s" % options["input_offsets"])
+    if options["output_offsets"] is not None:
+        command.append("--output_offsets=%s" % options["output_offsets"])
+
+    command.append(text)
+
+    command.append("-qutf8-no-bom")
 
+    return command
 
 def tokenize(text, alphabet, **kwargs):
     """
@@ -1162,35 +1313,36 @@ def tokenize(text, alphabet, **kwargs):
     if exists(alphabet) is False:
         raise UnitexException("[TOKENIZE] Alphabet file '%s' doesn't exists" % alphabet)
 
-    command = ["UnitexTool", "Tokenize"]
+    command = _tokenize_command(text, alphabet, options)
 
-    command.append("--alphabet=%s" % alphabet)
+    _LOGGER.info("Tokenizing file '%s'..." % text)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(_workspace(text)):
+        ret = _run(command)
 
-    if options["char_by_char"] is True:
-        command.append("--char_by_char")
-    else:
-        command.append("--word_by_word")
+    return ret
 
-    if options["tokens"] is not None:
-        command.append("--tokens=%s" % options["tokens"])
 
-    if options["input_offsets"] is not None:
-        command.append("--input_offsets=%s" % options["input_offsets"])
-    if options["output_offsets"] is not None:
-        command.append("--output_offsets=%s" % options["output_offsets"])
 
-    command.append(text)
+def _txt2tfst_command(text, alphabet, options):
+    command = ["UnitexTool", "Txt2Tfst"]
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
+    command.append("--alphabet=%s" % alphabet)
 
-    _LOGGER.info("Tokenizing file '%s'..." % text)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+    if options["clean"] is not False:
+        command.append("--clean")
+    if options["normalization_grammar"] is not None:
+        command.append("--normalization_grammar=%s" % options["normalization_grammar"])
+    if options["tagset"] is not None:
+        command.append("--tagset=%s" % options["tagset"])
+    if options["korean"] is not False:
+        command.append("--korean")
 
-    return ret
+    command.append(text)
 
+    command.append("-qutf8-no-bom")
 
+    return command
 
 def txt2tfst(text, alphabet, **kwargs):
     """
@@ -1237,26 +1389,188 @@ def txt2tfst(text, alphabet, **kwargs):
     if exists(alphabet) is False:
         raise UnitexException("[TXT2TFST] Alphabet file '%s' doesn't exists" % alphabet)
 
-    command = ["UnitexTool", "Txt2Tfst"]
+    command = _txt2tfst_command(text, alphabet, options)
 
-    command.append("--alphabet=%s" % alphabet)
+    _LOGGER.info("Building text automaton for '%s'..." % text)
+    _LOGGER.debug("Command: %s", command)
+    with _isolated(_workspace(text)):
+        ret = _run(command)
 
-    if options["clean"] is not False:
-        command.append("--clean")
-    if options["normalization_grammar"] is not None:
-        command.append("--normalization_grammar=%s" % options["normalization_grammar"])
-    if options["tagset"] is not None:
-        command.append("--tagset=%s" % options["tagset"])
-    if options["korean"] is not False:
-        command.append("--korean")
+    return ret
 
-    command.append(text)
 
-    command.append("-qutf8-no-bom")
-    command = " ".join(command)
 
-    _LOGGER.info("Building text automaton for '%s'..." % text)
-    _LOGGER.debug("Command: %s", command)
-    ret = _unitex.unitex_tool(command)
+_SLOT = re.compile(r"\x00(\w+)\x00")
+
+# For each tool: the options class, the command builder, the positions
+# of the arguments which must point to existing files and the workspace
+# used to isolate the calls (cf. '_isolated').
+_PLANS = {
+    "check_dic": (CheckDicOptions, _check_dic_command, (0,),
+                  lambda args, options: os.path.dirname(args[0])),
+    "compress": (CompressOptions, _compress_command, (0,),
+                 lambda args, options: args[0]),
+    "concord": (ConcordOptions, _concord_command, (0, 1),
+                lambda args, options: options["directory"] or os.path.dirname(args[0])),
+    "dico": (DicoOptions, _dico_command, (0, 1, 2),
+             lambda args, options: _workspace(args[1])),
+    "extract": (ExtractOptions, _extract_command, (0, 2),
+                lambda args, options: _workspace(args[0])),
+    "fst2txt": (Fst2TxtOptions, _fst2txt_command, (0, 1, 2),
+                lambda args, options: _workspace(args[1])),
+    "grf2fst2": (Grf2Fst2Options, _grf2fst2_command, (0, 1),
+                 lambda args, options: args[0]),
+    "locate": (LocateOptions, _locate_command, (0, 1, 2),
+               lambda args, options: options["sntdir"] or _workspace(args[1])),
+    "normalize": (NormalizeOptions, _normalize_command, (0,),
+                  lambda args, options: _workspace(args[0])),
+    "sort_txt": (SortTxtOptions, _sort_txt_command, (0,),
+                 lambda args, options: args[0]),
+    "tokenize": (TokenizeOptions, _tokenize_command, (0, 1),
+                 lambda args, options: _workspace(args[0])),
+    "txt2tfst": (Txt2TFstOptions, _txt2tfst_command, (0, 1),
+                 lambda args, options: _workspace(args[0])),
+}
+
+def slot(name):
+    """
+    This function returns a placeholder for a per-document argument of
+    a command plan (see the 'CommandPlan' class).
 
-    return ret
+    *Argument:*
+
+    - **name [str]** -- the placeholder name. The actual value is given
+      to the 'CommandPlan.run' function with this keyword.
+
+    *Return [str]:*
+
+      The placeholder.
+    """
+    if re.match(r"^\w+$", name) is None:
+        raise UnitexException("[PLAN] Wrong slot name '%s'. Alphanumeric characters required." % name)
+    return "\x00%s\x00" % name
+
+def _fill(value, paths):
+    if isinstance(value, list):
+        return [_fill(v, paths) for v in value]
+    if value is None or "\x00" not in value:
+        return value
+    return _SLOT.sub(lambda match: paths[match.group(1)], value)
+
+
+
+class CommandPlan(object):
+    """
+    The CommandPlan class compiles a Unitex command once: the options
+    are validated, the (fixed) resources are checked and the argument
+    list is built. Running the plan only substitutes the per-document
+    paths (declared with the 'slot' function) and passes the argument
+    list as is to Unitex. There is no command line to join and
+    re-tokenize, which also means that paths containing spaces are
+    supported.
+
+    The per-document paths are not checked. If a file is missing, the
+    Unitex command fails and the plan returns **False**.
+
+    *Example:*
+
+    ::
+
+        plan = CommandPlan(locate, grammar, slot("text"), alphabet, **kwargs)
+        for text in texts:
+            plan.run(text=text)
+    """
+
+    def __init__(self, tool, *args, **kwargs):
+        """
+        *Arguments:*
+
+        - **tool [function|str]** -- the tool function (or its name) of
+          the 'unitex.tools' module (e.g. 'locate').
+
+        - **args** -- the positional arguments of the tool function.
+          Any of them (or any keyword argument value) can be a
+          placeholder returned by the 'slot' function.
+
+        *Keyword arguments:*
+
+          The keyword arguments of the tool function.
+        """
+        name = getattr(tool, "__name__", tool)
+        if name not in _PLANS:
+            raise UnitexException("[PLAN] Unknown tool '%s'." % name)
+        _options, builder, checks, workspace = _PLANS[name]
+
+        options = _options()
+        options.load(kwargs)
+
+        for position in checks:
+            paths = args[position]
+            if isinstance(paths, list) is False:
+                paths = [paths]
+            for path in paths:
+                if _SLOT.search(path) is None and exists(path) is False:
+                    raise UnitexException("[PLAN] File '%s' doesn't exists" % path)
+
+        self.__name = name
+        self.__args = args
+        self.__options = options
+        self.__workspace = workspace
+
+        self.__command = builder(*(tuple(args) + (options,)))
+        self.__slots = [(i, a) for i, a in enumerate(self.__command) if _SLOT.search(a) is not None]
+
+        self.__names = set()
+        for i, a in self.__slots:
+            self.__names.update(_SLOT.findall(a))
+
+    @property
+    def slots(self):
+        """
+        The names of the per-document arguments.
+        """
+        return sorted(self.__names)
+
+    def command(self, **paths):
+        """
+        This function returns the argument list for the given
+        per-document paths.
+
+        *Keyword arguments:*
+
+          The value of each slot declared in the plan.
+
+        *Return [list(str)]:*
+
+          The Unitex command as an argument list.
+        """
+        missing = self.__names.difference(paths)
+        if missing:
+            raise UnitexException("[PLAN] Missing value(s) for slot(s): %s" % ", ".join(sorted(missing)))
+
+        command = list(self.__command)
+        for i, template in self.__slots:
+            command[i] = _fill(template, paths)
+        return command
+
+    def run(self, **paths):
+        """
+        This function runs the plan on a document.
+
+        *Keyword arguments:*
+
+          The value of each slot declared in the plan.
+
+        *Return [bool]:*
+
+          **True** if it succeeds, **False** otherwise.
+        """
+        command = self.command(**paths)
+        args = [_fill(a, paths) for a in self.__args]
+
+        _LOGGER.info("Running '%s' plan..." % self.__name)
+        _LOGGER.debug("Command: %s", command)
+        with _isolated(_fill(self.__workspace(args, self.__options), paths)):
+            ret = _run(command)
+
+        return ret
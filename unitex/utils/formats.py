@@ -4,6 +4,7 @@
 from __future__ import unicode_literals
 
 import array
+import codecs
 import logging
 import re
 import struct
@@ -652,3 +653,95 @@ class TextFST:
                 self.__tind.append(position)
             position = self.__tfst.tell()
             line = self.__tfst.readline()
+
+
+
+class ConcordIndexParser:
+    """
+    This class parses a concordance index ('concord.ind') incrementally:
+    the index is given by chunks (e.g. read by 'UnitexFile' or captured
+    while Locate writes it, cf. 'unitex.io.capture') and the matches are
+    returned as soon as their line is complete. The memory used only
+    depends on the chunk size, not on the number of matches.
+    """
+
+    def __init__(self):
+        self.__decoder = codecs.getincrementaldecoder("utf-8")()
+
+        self.__header = True
+        self.__pending = ""
+
+    def __parse(self, lines):
+        matches = []
+        for line in lines:
+            # The first line is the index header (e.g. '#M').
+            if self.__header is True:
+                self.__header = False
+                continue
+
+            line = line.rstrip()
+            if not line:
+                continue
+
+            # <start> <end>[ <output>]
+            fields = line.split(" ", 2)
+            if len(fields) < 2:
+                raise UnitexException("Concordance index is corrupted ('%s')..." % line)
+            if len(fields) == 2:
+                fields.append(None)
+
+            matches.append(tuple(fields))
+        return matches
+
+    def feed(self, chunk):
+        """
+        This function parses a chunk of the index.
+
+        *Argument:*
+
+        - **chunk [bytes]** -- the next (UTF-8) bytes of the index.
+
+        *Return [list(tuple)]:*
+
+          The (start, end, output) tuples of the lines completed by this
+          chunk ('output' is None if the line has no output).
+        """
+        lines = (self.__pending + self.__decoder.decode(chunk)).split("\n")
+        self.__pending = lines.pop()
+
+        return self.__parse(lines)
+
+    def close(self):
+        """
+        This function parses the last line of the index (if it doesn't
+        end with a newline).
+
+        *No arguments.*
+
+        *Return [list(tuple)]:*
+
+          The remaining (start, end, output) tuples.
+        """
+        lines = [self.__pending + self.__decoder.decode(b"", True)]
+        self.__pending = ""
+
+        return self.__parse(lines)
+
+    def parse(self, chunks):
+        """
+        This function parses an index given as an iterable of chunks.
+
+        *Argument:*
+
+        - **chunks [iterable(bytes)]** -- the index chunks.
+
+        *Return [iterator(tuple)]:*
+
+          The (start, end, output) tuples.
+        """
+        for chunk in chunks:
+            for match in self.feed(chunk):
+                yield match
+
+        for match in self.close():
+            yield match